@@ -0,0 +1,77 @@
+"""Compare the parsing time of the VCR cassette bodies with a new namedtuple class per JSON
+object (previous behaviour), with the record classes shared by CBWRecordTypes and with
+each installed JSON backend decoding the raw bytes
+
+Usage: python3 benchmarks/bench_parser.py [ROUNDS]
+PyYAML, used to read the cassettes, is installed with `pip3 install cbw-api-toolbox[benchmarks]`
+"""
+
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import yaml
+
+from cbw_api_toolbox.cbw_parser import CBWRecordTypes, JSON_BACKENDS, get_json_backend
+
+CASSETTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spec', 'fixtures', 'vcr_cassettes')
+
+
+def load_bodies():
+    """Return the JSON bodies of every response recorded in the cassettes"""
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(CASSETTES, '*.yaml'))):
+        with open(path, encoding='utf-8') as cassette:
+            interactions = yaml.safe_load(cassette)['interactions']
+        for interaction in interactions:
+            body = interaction['response']['body']['string']
+            if isinstance(body, str):
+                body = body.encode('utf8')
+            if 'gzip' in interaction['response']['headers'].get('Content-Encoding', []):
+                body = gzip.decompress(body)
+            text = body.decode('utf8')
+            if text.startswith(('{', '[')):
+                bodies.append(text)
+    return bodies
+
+
+def namedtuple_per_object(dictionary):
+    """Previous object_hook of CBWApi._cbw_parser"""
+    return namedtuple('cbw_object', dictionary.keys())(*dictionary.values())
+
+
+def main():
+    """Parse every body ROUNDS times with both object hooks"""
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    bodies = load_bodies()
+    print("{} bodies, {} KB".format(len(bodies), sum(len(body) for body in bodies) // 1024))
+
+    for name, object_hook in (("namedtuple per object", namedtuple_per_object),
+                              ("CBWRecordTypes", CBWRecordTypes().object_hook)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for body in bodies:
+                json.loads(body, object_hook=object_hook)
+        elapsed = time.perf_counter() - start
+        print("{:<24} {:>8.1f} ms/round".format(name, elapsed * 1000 / rounds))
+
+    contents = [body.encode('utf8') for body in bodies]
+    for name in JSON_BACKENDS:
+        try:
+            backend = get_json_backend(name)
+        except ImportError:
+            continue
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for content in contents:
+                backend.loads(content)
+        elapsed = time.perf_counter() - start
+        print("{:<24} {:>8.1f} ms/round".format("backend " + name, elapsed * 1000 / rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare the calls/sec of one request per connection against the pooled session of CBWApi
+
+A local stand-in of the Cyberwatch API is started on a random port, then the same
+`server(id)` call is issued through a fresh `requests.request` (previous behaviour)
+and through the persistent session owned by CBWApi. The stand-in speaks plain HTTP on the
+loopback, so only the TCP setup is saved here: against a TLS instance the handshake
+saved on every call widens the gap.
+
+Usage: python3 benchmarks/bench_session.py [CALLS]
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import requests
+
+from cbw_api_toolbox.__routes__ import ROUTE_SERVERS
+from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_auth import CBWAuth
+
+BODY = json.dumps({"id": 1, "hostname": "server01.example.com", "status": "server_update_init",
+                   "os": {"key": "debian_10_64", "name": "Debian 10"}, "groups": []}).encode("utf8")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answer every GET with the same server payload, keeping the connection alive"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send the server payload"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server"""
+    daemon_threads = True
+
+
+def per_call_request(api_url, calls):
+    """Previous behaviour: a new connection and a new CBWAuth for every call"""
+    for _ in range(calls):
+        requests.request("GET", api_url + ROUTE_SERVERS + "/1", auth=CBWAuth("key", "secret"), verify=False,
+                         timeout=10)
+
+
+def pooled_session(api_url, calls):
+    """Current behaviour: every call goes through the connection pool of the client"""
+    with CBWApi(api_url, "key", "secret") as client:
+        for _ in range(calls):
+            client.server("1")
+
+
+def main():
+    """Run both scenarios and print the calls/sec"""
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    for name, scenario in (("requests.request per call", per_call_request), ("CBWApi pooled session", pooled_session)):
+        start = time.perf_counter()
+        scenario(api_url, calls)
+        elapsed = time.perf_counter() - start
+        print("{:<28} {:>8.1f} calls/sec".format(name, calls / elapsed))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
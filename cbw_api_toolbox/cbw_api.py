@@ -3,12 +3,15 @@
 import json
 import logging
 import sys
+import time
 
-from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 from urllib.parse import parse_qs
 import requests
-from requests.exceptions import ProxyError, SSLError, RetryError, InvalidHeader, MissingSchema
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ProxyError, SSLError, RetryError, InvalidHeader, MissingSchema, Timeout
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from urllib3.exceptions import NewConnectionError, MaxRetryError
 
 from cbw_api_toolbox.__routes__ import ROUTE_AGENTS
@@ -23,83 +26,159 @@ from cbw_api_toolbox.__routes__ import ROUTE_SECURITY_ISSUES
 from cbw_api_toolbox.__routes__ import ROUTE_SERVERS
 from cbw_api_toolbox.__routes__ import ROUTE_USERS
 from cbw_api_toolbox.cbw_auth import CBWAuth
-
-class CBWApi: # pylint: disable=R0904
-    """Class used to communicate with the CBW API"""
-
-    def __init__(self, api_url, api_key, secret_key, verify_ssl=False):
+from cbw_api_toolbox.cbw_bulk import iter_bulk, run_bulk
+from cbw_api_toolbox.cbw_cache import MISSING
+from cbw_api_toolbox.cbw_parser import get_json_backend
+from cbw_api_toolbox.cbw_retry import CBWRetryPolicy
+from cbw_api_toolbox.cbw_singleflight import CBWSingleFlight
+
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# Errors raised by a request which did not get a response
+REQUEST_ERRORS = (ConnectionError, RequestsConnectionError, Timeout, NewConnectionError, RetryError,
+                  InvalidHeader, MaxRetryError)
+
+# Routes of the paginated collections
+COLLECTION_ROUTES = {
+    'agents': ROUTE_AGENTS,
+    'cve_announcements': ROUTE_CVE_ANNOUNCEMENTS,
+    'groups': ROUTE_GROUPS,
+    'hosts': ROUTE_HOSTS,
+    'nodes': ROUTE_NODES,
+    'remote_accesses': ROUTE_REMOTE_ACCESSES,
+    'security_issues': ROUTE_SECURITY_ISSUES,
+    'servers': ROUTE_SERVERS,
+    'users': ROUTE_USERS,
+}
+
+
+class CBWPageError(Exception):
+    """Raised by the iter_* methods when a page could not be fetched, the records of the previous pages
+    having already been yielded"""
+
+    def __init__(self, route, page):
+        super().__init__("Page {} of {} could not be fetched".format(page, route))
+        self.route = route
+        self.page = page
+
+
+class CBWBaseApi:
+    """Logic shared by CBWApi and AsyncCBWApi which does not depend on how the requests are sent:
+    routes, pagination parameters and parsing of the responses"""
+
+    def __init__(self, api_url, json_backend=None):
         self.api_url = api_url
-        self.api_key = api_key
-        self.secret_key = secret_key
-
-        self.verify_ssl = verify_ssl
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.json_backend = get_json_backend(json_backend)
 
     def _build_route(self, params):
         return "{0}{1}".format(self.api_url, '/'.join(params))
 
     def _cbw_parser(self, response):
-        """Parse the response text of an API request"""
+        """Parse the raw body of an API response"""
         try:
-            result = json.loads(response.text, object_hook=lambda d: namedtuple('cbw_object', d.keys())(*d.values()))
+            result = self.json_backend.loads(response.content)
         except TypeError:
             self.logger.error("An error occurred while parsing response")
         return result
 
-    def _request(self, verb, payloads, body_params=None):
-        route = self._build_route(payloads)
+    def _parse_response(self, response, error_message="Error::{}", status_code=200):
+        """Return the parsed body of a response having the expected status, None otherwise"""
+        if response.status_code != status_code:
+            logging.error(error_message.format(response.text))
+            return None
+        return self._cbw_parser(response)
 
-        if body_params is not None:
-            body_params = json.dumps(body_params)
+    @staticmethod
+    def _page_params(params):
+        """Return a copy of the parameters of a paginated request, 100 records per page by default"""
+        params = dict(params or {})
+        params.setdefault('per_page', 100)
+        return params
 
-        try:
-            return requests.request(
-                verb,
-                route,
-                data=body_params,
-                auth=CBWAuth(self.api_key, self.secret_key),
-                verify=self.verify_ssl)
-
-        except (ConnectionError, ProxyError, SSLError, NewConnectionError, RetryError,
-                InvalidHeader, MaxRetryError):
-            self.logger.exception("An error occurred when requesting {}".format(route))
-
-        except MissingSchema:
-            self.logger.error("An error occurred, please check your API_URL.")
-            sys.exit(-1)
-
-    def _get_pages(self, verb, route, params):
-        """ Get one or more pages for a method using api v3 pagination """
-        response_list = []
+    @staticmethod
+    def _next_page(response):
+        """Return the number of the next page announced by a paginated response, None on the last page"""
+        if 'next' not in response.links:
+            return None
+        next_url = urlparse(response.links['next']['url'])
+        return parse_qs(next_url.query)['page'][0]
 
-        if params is None:
-            params = {}
-            params['per_page'] = 100
+    @staticmethod
+    def _last_page(response):
+        """Return the number of the last page announced by a paginated response, None if unknown"""
+        if 'last' in response.links:
+            last_url = urlparse(response.links['last']['url'])
+            return int(parse_qs(last_url.query)['page'][0])
 
-        if 'per_page' not in params:
-            params['per_page'] = 100
+        if 'next' not in response.links:
+            return 1
 
-        if 'page' in params:
-            response = self._request(verb, route, params)
-            if response.status_code != 200:
-                logging.error("Error::{}".format(response.text))
-                return None
-            return self._cbw_parser(response)
+        total = response.headers.get('X-Total')
+        per_page = response.headers.get('X-Per-Page')
+        if total and per_page and int(per_page) > 0:
+            return -(-int(total) // int(per_page))
 
-        response = self._request(verb, route, params)
+        return None
 
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
+    @staticmethod
+    def _record_key(record):
+        """Return the identifier of a record, None if it has none"""
+        for field in ('id', 'cve_code'):
+            if hasattr(record, field):
+                return getattr(record, field)
+        return None
+
+    @classmethod
+    def _merge_pages(cls, pages):
+        """Concatenate the records of pages in page order without the records returned twice"""
+        response_list = []
+        seen = set()
+        for page in pages:
+            for record in page:
+                key = cls._record_key(record)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                response_list.append(record)
+        return response_list
 
-        response_list.extend(self._cbw_parser(response))
+    def _iteration_step(self, response, params, single_page, count, limit):
+        """Return the records of a page to yield after `count` records, at most `limit` in all, and whether
+        the iteration goes on, params being set to request the next page"""
+        records = self._cbw_parser(response)
+        if limit is not None:
+            records = records[:limit - count]
+        next_page = self._next_page(response)
+        if single_page or next_page is None:
+            return records, False
+        params['page'] = next_page
+        return records, True
 
-        while 'next' in response.links:
-            next_url = urlparse(response.links['next']['url'])
-            params['page'] = parse_qs(next_url .query)['page'][0]
-            response = self._request(verb, route, params)
-            response_list.extend(self._cbw_parser(response))
-        return response_list
+    @staticmethod
+    def _remote_access_body(info):
+        """Return the body of the creation of a remote access"""
+        return {
+            "type": info["type"],
+            "address": info["address"],
+            "port": info["port"],
+            "login": info["login"],
+            "password": info.get("auth_password") or info.get("password"),
+            "key": info.get("priv_password") or info.get("key"),
+            "node_id": info["node_id"],
+            "server_groups" : info.get("server_groups", "")
+        }
+
+    def _created_remote_access(self, info, response):
+        """Return the remote access created by a response, False if its creation failed"""
+        logging.debug("Create connexion remote access::{}".format(response.text))
+        if self.verif_response(response):
+            logging.info('remote access successfully created {}'.format(info["address"]))
+            return self._cbw_parser(response)
+
+        logging.error("Error create connection remote access")
+        return False
 
     @staticmethod
     def verif_response(response):
@@ -111,6 +190,275 @@ class CBWApi: # pylint: disable=R0904
         logging.error("response server KO::{}".format(response.text))
         return False
 
+
+class CBWApi(CBWBaseApi): # pylint: disable=R0904
+    """Class used to communicate with the CBW API"""
+
+    def __init__(self, api_url, api_key, secret_key, verify_ssl=False, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, keep_alive=True, json_backend=None, retry_policy=None, read_limiter=None,
+                 write_limiter=None, cache=None, response_cache=None, conditional_cache=None,
+                 coalesce_requests=False):
+        super().__init__(api_url, json_backend)
+        self.api_key = api_key
+        self.secret_key = secret_key
+
+        self.verify_ssl = verify_ssl
+
+        self.auth = CBWAuth(api_key, secret_key)
+        self.session = self._build_session(pool_connections, pool_maxsize, pool_block, keep_alive)
+        self.retry_policy = retry_policy if retry_policy is not None else CBWRetryPolicy()
+        self.read_limiter = read_limiter
+        self.write_limiter = write_limiter
+        self.cache = cache
+        self.response_cache = response_cache
+        self.conditional_cache = conditional_cache
+        self.single_flight = CBWSingleFlight() if coalesce_requests else None
+        self.logger.debug("Parsing responses with the {} backend".format(self.json_backend.name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _build_session(pool_connections, pool_maxsize, pool_block, keep_alive):
+        """Build the HTTP session whose connection pool is shared by every request of the client.
+        pool_connections is the number of per-host pools kept, pool_maxsize the number of connections
+        kept alive per host and pool_block forbids opening more than pool_maxsize connections to a host"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """Close the connections kept alive by the client"""
+        self.session.close()
+
+    def _request(self, verb, payloads, body_params=None, retry_budget=None, headers=None):
+        """Send a request, retrying it according to the retry policy when it fails because of a
+        connection error or a transient status. retry_budget is shared by the requests of a crawl"""
+        if verb.upper() == "GET" and self.response_cache is not None:
+            return self._cached_get(payloads, body_params, retry_budget, headers)
+
+        if verb.upper() in READ_METHODS or (self.cache is None and self.response_cache is None):
+            return self._send_with_retries(verb, payloads, body_params, retry_budget, headers)
+
+        try:
+            return self._send_with_retries(verb, payloads, body_params, retry_budget, headers)
+        finally:
+            self._invalidate(payloads)
+
+    def _cached_get(self, payloads, body_params, retry_budget, headers=None):
+        """GET request served from the response cache when the route is cached and its response still fresh"""
+        entity_type = self._entity_type(payloads[0])
+        if not self.response_cache.caches(entity_type):
+            return self._send_with_retries("GET", payloads, body_params, retry_budget, headers)
+
+        route = self._build_route(payloads)
+        params = json.dumps(body_params, sort_keys=True) if body_params is not None else None
+        response = self.response_cache.get(self.api_key, route, params, entity_type)
+        if response is not None:
+            return response
+
+        response = self._send_with_retries("GET", payloads, body_params, retry_budget, headers)
+        if response.status_code == 200:
+            self.response_cache.set(self.api_key, route, params, entity_type, response)
+        return response
+
+    def _send_with_retries(self, verb, payloads, body_params, retry_budget, headers=None):
+        route = self._build_route(payloads)
+
+        if body_params is not None:
+            body_params = json.dumps(body_params)
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(verb, route, body_params, headers)
+
+            except MissingSchema:
+                self.logger.error("An error occurred, please check your API_URL.")
+                sys.exit(-1)
+
+            except REQUEST_ERRORS as error:
+                if isinstance(error, (SSLError, ProxyError, InvalidHeader)) \
+                        or not self.retry_policy.can_retry(verb, attempt, retry_budget):
+                    self.logger.exception("An error occurred when requesting {}".format(route))
+                    raise
+                delay = self.retry_policy.delay(attempt)
+
+            else:
+                if response.status_code not in self.retry_policy.statuses \
+                        or not self.retry_policy.can_retry(verb, attempt, retry_budget):
+                    return response
+                delay = self.retry_policy.delay(attempt, response)
+
+            self.logger.warning("Retrying {} {} in {:.1f}s (attempt {})".format(verb, route, delay, attempt + 1))
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _entity_type(route):
+        """Return the type of the entities of a route, e.g. 'servers' for /api/v3/servers"""
+        return route.rsplit('/', 1)[-1]
+
+    def _invalidate(self, payloads):
+        """Remove from the caches every entity named in the payloads of a write request,
+        e.g. the server and the cve_announcement of /api/v3/servers/3/cve_announcements/CVE-2019-14869.
+        The response cache drops every response of the entity types written, lists included"""
+        for index in range(0, len(payloads), 2):
+            entity_type = self._entity_type(payloads[index])
+            if self.response_cache is not None:
+                self.response_cache.invalidate(entity_type)
+            if self.cache is not None and index + 1 < len(payloads):
+                self.cache.invalidate(entity_type, payloads[index + 1])
+
+    def _get_entity(self, route, entity_id, error_message="Error::{}"):
+        """GET request to route/entity_id, served from the entity cache when it holds the entity and
+        shared with the identical requests in flight when requests are coalesced"""
+        entity_type = self._entity_type(route)
+        if self.cache is not None:
+            entity = self.cache.get(entity_type, entity_id)
+            if entity is not MISSING:
+                return entity
+
+        if self.single_flight is None:
+            return self._fetch_entity(route, entity_id, error_message)
+        return self.single_flight.do((route, str(entity_id)), self._fetch_entity, route, entity_id, error_message)
+
+    def _fetch_entity(self, route, entity_id, error_message):
+        """GET request to route/entity_id, revalidated with a conditional request when the conditional
+        cache holds the validators of the entity"""
+        entity_type = self._entity_type(route)
+        url = self._build_route([route, entity_id])
+        headers = self.conditional_cache.headers(url) if self.conditional_cache is not None else None
+        response = self._request("GET", [route, entity_id], headers=headers)
+
+        if response.status_code == 304 and headers:
+            entity = self.conditional_cache.revalidated(url)
+            if entity is not MISSING:
+                return self._cache_entity(entity_type, entity_id, entity)
+            # the entity was evicted while the request was in flight
+            response = self._request("GET", [route, entity_id])
+
+        if response.status_code != 200:
+            logging.error(error_message.format(response.text))
+            return None
+
+        entity = self._cbw_parser(response)
+        if self.conditional_cache is not None:
+            self.conditional_cache.store(url, response, entity)
+        return self._cache_entity(entity_type, entity_id, entity)
+
+    def _cache_entity(self, entity_type, entity_id, entity):
+        """Store an entity in the entity cache when there is one and return it"""
+        if self.cache is not None:
+            self.cache.set(entity_type, entity_id, entity)
+        return entity
+
+    def _send(self, verb, route, body_params, headers=None):
+        """Send a request through the rate limiter of its kind, reads or writes"""
+        limiter = self.read_limiter if verb.upper() in READ_METHODS else self.write_limiter
+        if limiter is None:
+            return self.session.request(verb, route, data=body_params, headers=headers, auth=self.auth,
+                                        verify=self.verify_ssl)
+
+        with limiter.limit():
+            return self.session.request(verb, route, data=body_params, headers=headers, auth=self.auth,
+                                        verify=self.verify_ssl)
+
+    def _get_pages(self, verb, route, params, concurrency=None):
+        """ Get one or more pages for a method using api v3 pagination """
+        if self.single_flight is None:
+            return self._crawl_pages(verb, route, params, concurrency)
+        key = (verb, tuple(route), json.dumps(params, sort_keys=True))
+        return self.single_flight.do(key, self._crawl_pages, verb, route, params, concurrency)
+
+    def _crawl_pages(self, verb, route, params, concurrency=None):
+        """Request every page of a paginated route, or the one page given in params"""
+        response_list = []
+        params = self._page_params(params)
+        retry_budget = self.retry_policy.crawl_budget()
+
+        response = self._get_page(verb, route, params, retry_budget)
+        if response is None:
+            return None
+        if 'page' in params:
+            return self._cbw_parser(response)
+
+        response_list.extend(self._cbw_parser(response))
+
+        last_page = self._last_page(response)
+        if concurrency is not None and concurrency > 1 and last_page is not None:
+            return self._get_pages_concurrently(verb, route, params, response_list, last_page, concurrency,
+                                                retry_budget)
+
+        next_page = self._next_page(response)
+        while next_page is not None:
+            params['page'] = next_page
+            response = self._get_page(verb, route, params, retry_budget)
+            if response is None:
+                return None
+            response_list.extend(self._cbw_parser(response))
+            next_page = self._next_page(response)
+        if concurrency is not None and concurrency > 1:
+            # sequential fallback of a concurrent crawl, giving the same results
+            return self._merge_pages([response_list])
+        return response_list
+
+    def _get_page(self, verb, route, params, retry_budget=None):
+        """Request one page of a paginated route, return None if it could not be fetched"""
+        try:
+            response = self._request(verb, route, params, retry_budget)
+        except REQUEST_ERRORS:
+            logging.error("Error::no response for page {}".format(params.get('page', 1)))
+            return None
+        if response.status_code != 200:
+            logging.error("Error page {}::{}".format(params.get('page', 1), response.text))
+            return None
+        return response
+
+    def _iter_pages(self, verb, route, params, limit=None):
+        """Yield the records of one or more pages using api v3 pagination, the next page being
+        requested only once the records of the current one have been consumed.
+        Raise CBWPageError when a page could not be fetched"""
+        params = self._page_params(params)
+        single_page = 'page' in params
+        retry_budget = self.retry_policy.crawl_budget()
+        count = 0
+
+        while limit is None or count < limit:
+            response = self._get_page(verb, route, params, retry_budget)
+            if response is None:
+                raise CBWPageError(self._build_route(route), params.get('page', 1))
+
+            records, more = self._iteration_step(response, params, single_page, count, limit)
+            yield from records
+            count += len(records)
+            if not more:
+                return
+
+    def _get_pages_concurrently(self, verb, route, params, first_page, last_page, concurrency, retry_budget=None):
+        """Fetch the pages following the first one with at most `concurrency` requests in flight,
+        then reassemble them in page order without the records returned twice"""
+
+        def get_page(page):
+            response = self._get_page(verb, route, dict(params, page=str(page)), retry_budget)
+            if response is None:
+                return None
+            return self._cbw_parser(response)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pages = list(executor.map(get_page, range(2, last_page + 1)))
+
+        if any(page is None for page in pages):
+            return None
+        return self._merge_pages([first_page] + pages)
+
     def ping(self):
         """GET request to /api/v3/ping then check uuid value"""
         response = self._request("GET", [ROUTE_PING])
@@ -121,20 +469,39 @@ class CBWApi: # pylint: disable=R0904
         logging.error("FAILED")
         return False
 
-    def servers(self, params=None):
+    def count(self, collection, params=None):
+        """GET request for one record of a paginated collection ('servers', 'cve_announcements', ...)
+        to read its number of records from the X-Total header, None if it is unknown"""
+        params = dict(params or {}, page="1", per_page=1)
+        response = self._get_page("GET", [COLLECTION_ROUTES[collection]], params)
+        if response is None or 'X-Total' not in response.headers:
+            return None
+        return int(response.headers['X-Total'])
+
+    def servers(self, params=None, concurrency=None):
         """GET request to /api/v3/servers to get all servers"""
-        response = self._get_pages("GET", [ROUTE_SERVERS], params)
+        response = self._get_pages("GET", [ROUTE_SERVERS], params, concurrency)
 
         return response
 
+    def iter_servers(self, params=None, limit=None):
+        """GET request to /api/v3/servers to iterate over all servers, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_SERVERS], params, limit)
+
     def server(self, server_id):
         """GET request to /api/v3/server/{server_id} to get all informations
         about a specific server"""
-        response = self._request("GET", [ROUTE_SERVERS, server_id])
-        if response.status_code != 200:
-            logging.error("Error server id::{}".format(response.text))
-            return None
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_SERVERS, server_id, "Error server id::{}")
+
+    def servers_details(self, server_ids, workers=10):
+        """GET request to /api/v3/servers/{server_id} for each server id with at most `workers` requests
+        in flight. Return a CBWBulkReport whose results follow the order of server_ids"""
+        return run_bulk(lambda server_id: self.server(str(server_id)), server_ids, workers)
+
+    def iter_servers_details(self, server_ids, workers=10):
+        """GET request to /api/v3/servers/{server_id} for each server id with at most `workers` requests
+        in flight, yielding a CBWBulkResult as soon as each server is fetched"""
+        return iter_bulk(lambda server_id: self.server(str(server_id)), server_ids, workers)
 
     def server_refresh(self, server_id):
         """PUT request to /api/v3/server/{server_id}/refresh to relaunch analysis
@@ -186,19 +553,19 @@ class CBWApi: # pylint: disable=R0904
 
         return self._cbw_parser(response)
 
-    def agents(self, params=None):
+    def agents(self, params=None, concurrency=None):
         """GET request to /api/v3/agents to get all agents"""
-        response = self._get_pages("GET", [ROUTE_AGENTS], params)
+        response = self._get_pages("GET", [ROUTE_AGENTS], params, concurrency)
         return response
 
+    def iter_agents(self, params=None, limit=None):
+        """GET request to /api/v3/agents to iterate over all agents, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_AGENTS], params, limit)
+
     def agent(self, agent_id):
         """GET request to /api/v3/agents/{agent_id} to get all informations
         about a specific agent"""
-        response = self._request("GET", [ROUTE_AGENTS, agent_id])
-        if response.status_code != 200:
-            logging.error("Error agent id::{}".format(response.text))
-            return None
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_AGENTS, agent_id, "Error agent id::{}")
 
     def delete_agent(self, agent_id):
         """DELETE request to /api/v3/agents/{agent_id} to delete a specific agent"""
@@ -210,44 +577,28 @@ class CBWApi: # pylint: disable=R0904
         logging.error("No agent id specific for delete")
         return False
 
-    def remote_accesses(self, params=None):
+    def remote_accesses(self, params=None, concurrency=None):
         """GET request to /api/v3/remote_accesses to get all servers"""
-        response = self._get_pages("GET", [ROUTE_REMOTE_ACCESSES], params)
+        response = self._get_pages("GET", [ROUTE_REMOTE_ACCESSES], params, concurrency)
 
         return response
 
+    def iter_remote_accesses(self, params=None, limit=None):
+        """GET request to /api/v3/remote_accesses to iterate over all remote accesses, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_REMOTE_ACCESSES], params, limit)
+
     def create_remote_access(self, info):
         """"POST request to /api/v3/remote_accesses to create a specific remote access"""
-        if info:
-            response = self._request("POST", [ROUTE_REMOTE_ACCESSES], {
-                "type": info["type"],
-                "address": info["address"],
-                "port": info["port"],
-                "login": info["login"],
-                "password": info.get("auth_password") or info.get("password"),
-                "key": info.get("priv_password") or info.get("key"),
-                "node_id": info["node_id"],
-                "server_groups" : info.get("server_groups", "")
-            })
-            logging.debug("Create connexion remote access::{}".format(response.text))
-
-        if self.verif_response(response):
-            logging.info('remote access successfully created {}'.format(info["address"]))
-            return self._cbw_parser(response)
-
-        logging.error("Error create connection remote access")
-        return False
+        if not info:
+            logging.error("Error create connection remote access")
+            return False
+        response = self._request("POST", [ROUTE_REMOTE_ACCESSES], self._remote_access_body(info))
+        return self._created_remote_access(info, response)
 
     def remote_access(self, remote_access_id):
         """GET request to /api/v3/remote_accesses/{remote_access_id} to get all informations
         about a specific remote access"""
-        response = self._request("GET", [ROUTE_REMOTE_ACCESSES, remote_access_id])
-
-        if response.status_code != 200:
-            logging.error("error remote_access_id::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_REMOTE_ACCESSES, remote_access_id, "error remote_access_id::{}")
 
     def delete_remote_access(self, remote_access_id):
         """DELETE request to /api/v3/remote_access/{remote_id} to delete a specific remote access"""
@@ -272,19 +623,18 @@ class CBWApi: # pylint: disable=R0904
     def cve_announcement(self, cve_code):
         """GET request to /api/v3/cve_announcements/{cve_code} to get all informations
         about a specific cve_announcement"""
-        response = self._request("GET", [ROUTE_CVE_ANNOUNCEMENTS, cve_code])
-        if response.status_code != 200:
-            logging.error("Error server id::{}".format(response.text))
-            return None
+        return self._get_entity(ROUTE_CVE_ANNOUNCEMENTS, cve_code, "Error server id::{}")
 
-        return self._cbw_parser(response)
-
-    def cve_announcements(self, params=None):
+    def cve_announcements(self, params=None, concurrency=None):
         """GET request to /api/v3/cve_announcements to get a list of cve_announcement"""
-        response = self._get_pages("GET", [ROUTE_CVE_ANNOUNCEMENTS], params)
+        response = self._get_pages("GET", [ROUTE_CVE_ANNOUNCEMENTS], params, concurrency)
 
         return response
 
+    def iter_cve_announcements(self, params=None, limit=None):
+        """GET request to /api/v3/cve_announcements to iterate over a list of cve_announcement, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_CVE_ANNOUNCEMENTS], params, limit)
+
     def update_cve_announcement(self, cve_code, params=None):
         """PUT request to /api/v3/cve_announcements/{cve_code} to update cvss_custom/score_custom informations
         about a specific cve_announcement"""
@@ -305,20 +655,19 @@ class CBWApi: # pylint: disable=R0904
 
         return self._cbw_parser(response)
 
-    def groups(self, params=None):
+    def groups(self, params=None, concurrency=None):
         """GET request to /api/v3/groups to get a list of groups"""
-        response = self._get_pages("GET", [ROUTE_GROUPS], params)
+        response = self._get_pages("GET", [ROUTE_GROUPS], params, concurrency)
 
         return response
 
+    def iter_groups(self, params=None, limit=None):
+        """GET request to /api/v3/groups to iterate over a list of groups, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_GROUPS], params, limit)
+
     def group(self, group_id):
         """GET request to /api/v3/groups/<group_id> to get a specific group"""
-        response = self._request("GET", [ROUTE_GROUPS, group_id])
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_GROUPS, group_id)
 
     def create_group(self, params):
         """POST request to /api/v3/groups to create a group"""
@@ -355,36 +704,33 @@ class CBWApi: # pylint: disable=R0904
             return None
         return self._cbw_parser(response)
 
-    def users(self, params=None):
+    def users(self, params=None, concurrency=None):
         """GET request to /api/v3/users to get a list of users"""
-        response = self._get_pages("GET", [ROUTE_USERS], params)
+        response = self._get_pages("GET", [ROUTE_USERS], params, concurrency)
 
         return response
 
+    def iter_users(self, params=None, limit=None):
+        """GET request to /api/v3/users to iterate over a list of users, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_USERS], params, limit)
+
     def user(self, user_id):
         """GET request to /api/v3/users/<id> to get a specific user"""
-        response = self._request("GET", [ROUTE_USERS, user_id])
-
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_USERS, user_id)
 
-    def nodes(self, params=None):
+    def nodes(self, params=None, concurrency=None):
         """GET request to /api/v3/nodes to get a list of all nodes"""
-        response = self._get_pages("GET", [ROUTE_NODES], params)
+        response = self._get_pages("GET", [ROUTE_NODES], params, concurrency)
 
         return response
 
+    def iter_nodes(self, params=None, limit=None):
+        """GET request to /api/v3/nodes to iterate over a list of all nodes, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_NODES], params, limit)
+
     def node(self, node_id):
         """GET request to /api/v3/nodes/<node_id> to get a list of all nodes"""
-        response = self._request("GET", [ROUTE_NODES, node_id])
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_NODES, node_id)
 
     def delete_node(self, node_id, new_node_id):
         """DELETE request to /api/v3/nodes/<node_id> to delete a node and transfer the data to another one"""
@@ -395,20 +741,19 @@ class CBWApi: # pylint: disable=R0904
 
         return self._cbw_parser(response)
 
-    def hosts(self, params=None):
+    def hosts(self, params=None, concurrency=None):
         """GET request to /api/v3/hosts to get a list of all hosts"""
-        response = self._get_pages("GET", [ROUTE_HOSTS], params)
+        response = self._get_pages("GET", [ROUTE_HOSTS], params, concurrency)
 
         return response
 
+    def iter_hosts(self, params=None, limit=None):
+        """GET request to /api/v3/hosts to iterate over a list of all hosts, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_HOSTS], params, limit)
+
     def host(self, host_id):
         """GET request to /api/v3/hosts/<host_id> to get a specific host"""
-        response = self._request("GET", [ROUTE_HOSTS, host_id])
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_HOSTS, host_id)
 
     def create_host(self, params):
         """POST request to /api/v3/hosts to create a host"""
@@ -437,20 +782,19 @@ class CBWApi: # pylint: disable=R0904
 
         return self._cbw_parser(response)
 
-    def security_issues(self, params=None):
+    def security_issues(self, params=None, concurrency=None):
         """GET request to /api/v3/security_issues to get a list of all security_issues"""
-        response = self._get_pages("GET", [ROUTE_SECURITY_ISSUES], params)
+        response = self._get_pages("GET", [ROUTE_SECURITY_ISSUES], params, concurrency)
 
         return response
 
+    def iter_security_issues(self, params=None, limit=None):
+        """GET request to /api/v3/security_issues to iterate over a list of all security_issues, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_SECURITY_ISSUES], params, limit)
+
     def security_issue(self, security_issue_id):
         """GET request to /api/v3/security_issues/<security_issue_id> to get a specific security_issue"""
-        response = self._request("GET", [ROUTE_SECURITY_ISSUES, security_issue_id])
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_SECURITY_ISSUES, security_issue_id)
 
     def create_security_issue(self, params=None):
         """POST request to /api/v3/security_issues to create a security_issue"""
@@ -490,12 +834,7 @@ class CBWApi: # pylint: disable=R0904
 
     def fetch_importer_script(self, script_id):
         """GET request to /api/v2/cbw_scans/scripts/{SCRIPT_ID} to get a specific Importer scanning script"""
-        response = self._request("GET", [ROUTE_IMPORTER, script_id])
-        if response.status_code != 200:
-            logging.error("Error::{}".format(response.text))
-            return None
-
-        return self._cbw_parser(response)
+        return self._get_entity(ROUTE_IMPORTER, script_id)
 
     def upload_importer_results(self, content):
         """POST request to /api/v2/cbw_scans/scripts to upload scanning script result"""
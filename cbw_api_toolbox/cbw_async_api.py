@@ -0,0 +1,500 @@
+"""Module used to communicate with the CBW API from an asyncio event loop"""
+
+import asyncio
+import json
+import logging
+import sys
+
+from urllib.parse import urlsplit
+import aiohttp  # pylint: disable=import-error
+
+from cbw_api_toolbox.__routes__ import ROUTE_AGENTS
+from cbw_api_toolbox.__routes__ import ROUTE_CVE_ANNOUNCEMENTS
+from cbw_api_toolbox.__routes__ import ROUTE_GROUPS
+from cbw_api_toolbox.__routes__ import ROUTE_HOSTS
+from cbw_api_toolbox.__routes__ import ROUTE_IMPORTER
+from cbw_api_toolbox.__routes__ import ROUTE_NODES
+from cbw_api_toolbox.__routes__ import ROUTE_PING
+from cbw_api_toolbox.__routes__ import ROUTE_REMOTE_ACCESSES
+from cbw_api_toolbox.__routes__ import ROUTE_SECURITY_ISSUES
+from cbw_api_toolbox.__routes__ import ROUTE_SERVERS
+from cbw_api_toolbox.__routes__ import ROUTE_USERS
+from cbw_api_toolbox.cbw_api import CBWBaseApi, CBWPageError
+from cbw_api_toolbox.cbw_auth import CBWAuth
+
+# Errors raised by a request which did not get a response
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class CBWAsyncResponse:
+    """Fully read response of AsyncCBWApi exposing the attributes of a requests response used by the client"""
+
+    def __init__(self, status_code, headers, content, links):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.links = links
+
+    @property
+    def text(self):
+        """Body of the response decoded as UTF-8"""
+        return self.content.decode("utf-8", errors="replace")
+
+
+class AsyncCBWApi(CBWBaseApi): # pylint: disable=R0904
+    """Class used to communicate with the CBW API from an asyncio event loop.
+    It exposes the methods of CBWApi as coroutines, the listing ones also having async iterator
+    counterparts, and keeps at most `max_concurrency` requests in flight over a shared connection pool"""
+
+    def __init__(self, api_url, api_key, secret_key, verify_ssl=False, pool_maxsize=100, limit_per_host=0,
+                 max_concurrency=100, json_backend=None):
+        super().__init__(api_url, json_backend)
+        self.api_key = api_key
+        self.secret_key = secret_key
+
+        self.verify_ssl = verify_ssl
+
+        self.auth = CBWAuth(api_key, secret_key)
+
+        self.pool_maxsize = pool_maxsize
+        self.limit_per_host = limit_per_host
+        self.max_concurrency = max_concurrency
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_session(self):
+        """Create the HTTP session and the concurrency semaphore in the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, limit_per_host=self.limit_per_host,
+                                             ssl=None if self.verify_ssl else False)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Close the connections kept alive by the client"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, verb, payloads, body_params=None):
+        """Send a request, raising the aiohttp.ClientError or asyncio.TimeoutError of a request
+        which did not get a response"""
+        route = self._build_route(payloads)
+
+        if body_params is not None:
+            body_params = json.dumps(body_params)
+
+        url = urlsplit(route)
+        if not url.scheme:
+            self.logger.error("An error occurred, please check your API_URL.")
+            sys.exit(-1)
+        path = url.path + ("?" + url.query if url.query else "")
+
+        session = self._get_session()
+        try:
+            async with self._semaphore:
+                async with session.request(verb, route, data=body_params,
+                                           headers=self.auth.headers(verb, path, body_params)) as response:
+                    content = await response.read()
+                    links = {str(rel): {"url": str(link["url"])} for rel, link in response.links.items()}
+                    return CBWAsyncResponse(response.status, response.headers, content, links)
+
+        except REQUEST_ERRORS:
+            self.logger.exception("An error occurred when requesting {}".format(route))
+            raise
+
+    async def _get_pages(self, verb, route, params, concurrency=None):
+        """ Get one or more pages for a method using api v3 pagination """
+        params = self._page_params(params)
+
+        response = await self._get_page(verb, route, params)
+        if response is None:
+            return None
+        if 'page' in params:
+            return self._cbw_parser(response)
+
+        response_list = self._cbw_parser(response)
+
+        last_page = self._last_page(response)
+        if concurrency is not None and concurrency > 1 and last_page is not None:
+            return await self._get_pages_concurrently(verb, route, params, response_list, last_page, concurrency)
+
+        next_page = self._next_page(response)
+        while next_page is not None:
+            params['page'] = next_page
+            response = await self._get_page(verb, route, params)
+            if response is None:
+                return None
+            response_list.extend(self._cbw_parser(response))
+            next_page = self._next_page(response)
+        if concurrency is not None and concurrency > 1:
+            # sequential fallback of a concurrent crawl, giving the same results
+            return self._merge_pages([response_list])
+        return response_list
+
+    async def _get_page(self, verb, route, params):
+        """Request one page of a paginated route, return None if it could not be fetched"""
+        try:
+            response = await self._request(verb, route, params)
+        except REQUEST_ERRORS:
+            logging.error("Error::no response for page {}".format(params.get('page', 1)))
+            return None
+        if response.status_code != 200:
+            logging.error("Error page {}::{}".format(params.get('page', 1), response.text))
+            return None
+        return response
+
+    async def _get_pages_concurrently(self, verb, route, params, first_page, last_page, concurrency):
+        """Fetch the pages following the first one with at most `concurrency` requests in flight,
+        then reassemble them in page order without the records returned twice"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get_page(page):
+            async with semaphore:
+                response = await self._get_page(verb, route, dict(params, page=str(page)))
+            if response is None:
+                return None
+            return self._cbw_parser(response)
+
+        pages = await asyncio.gather(*[get_page(page) for page in range(2, last_page + 1)])
+
+        if any(page is None for page in pages):
+            return None
+        return self._merge_pages([first_page] + list(pages))
+
+    async def _iter_pages(self, verb, route, params, limit=None):
+        """Yield the records of one or more pages using api v3 pagination, the next page being
+        requested only once the records of the current one have been consumed.
+        Raise CBWPageError when a page could not be fetched"""
+        params = self._page_params(params)
+        single_page = 'page' in params
+        count = 0
+
+        while limit is None or count < limit:
+            response = await self._get_page(verb, route, params)
+            if response is None:
+                raise CBWPageError(self._build_route(route), params.get('page', 1))
+
+            records, more = self._iteration_step(response, params, single_page, count, limit)
+            for record in records:
+                yield record
+            count += len(records)
+            if not more:
+                return
+
+    async def ping(self):
+        """GET request to /api/v3/ping then check uuid value"""
+        response = await self._request("GET", [ROUTE_PING])
+
+        if response.status_code == 200:
+            logging.info("OK")
+            return True
+        logging.error("FAILED")
+        return False
+
+    async def servers(self, params=None, concurrency=None):
+        """GET request to /api/v3/servers to get all servers"""
+        response = await self._get_pages("GET", [ROUTE_SERVERS], params, concurrency)
+
+        return response
+
+    def iter_servers(self, params=None, limit=None):
+        """GET request to /api/v3/servers to iterate over all servers, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_SERVERS], params, limit)
+
+    async def server(self, server_id):
+        """GET request to /api/v3/server/{server_id} to get all informations
+        about a specific server"""
+        response = await self._request("GET", [ROUTE_SERVERS, server_id])
+        return self._parse_response(response, "Error server id::{}")
+
+    async def server_refresh(self, server_id):
+        """PUT request to /api/v3/server/{server_id}/refresh to relaunch analysis
+        script on a specific server"""
+        response = await self._request("PUT", [ROUTE_SERVERS, server_id, 'refresh'])
+        return self._parse_response(response, "Error server id::{}")
+
+    async def update_server(self, server_id, info):
+        """PATCH request to /api/v3/servers/SERVER_ID to update the groups of a server"""
+        if server_id:
+            response = await self._request("PATCH", [ROUTE_SERVERS, server_id], info)
+
+            logging.debug("Update server with: {}".format(info))
+
+            return self.verif_response(response)
+
+        logging.error("No server id for update")
+        return False
+
+    async def server_schedule_updates(self, server_id, params=None):
+        """POST request to /api/v3/server/<server_id>/updates to install fixes"""
+        response = await self._request("POST", [ROUTE_SERVERS, server_id, "updates"], params)
+        return self._parse_response(response)
+
+    async def delete_server(self, server_id):
+        """DELETE request to /api/v3/servers/SERVER_ID to delete a specific server"""
+        if server_id:
+            logging.debug("Deleting {}".format(server_id))
+            response = await self._request("DELETE", [ROUTE_SERVERS, server_id])
+            return self.verif_response(response)
+
+        logging.error("No server id specific for delete")
+        return False
+
+    async def update_server_cve(self, server_id, cve_code, params=None):
+        """PUT request to /api/v3/server/<server_id>/cve_announcements/<cve_code> to update a server cve"""
+        response = await self._request("PUT", [ROUTE_SERVERS, server_id, "cve_announcements", cve_code], params)
+        return self._parse_response(response)
+
+    async def agents(self, params=None, concurrency=None):
+        """GET request to /api/v3/agents to get all agents"""
+        response = await self._get_pages("GET", [ROUTE_AGENTS], params, concurrency)
+        return response
+
+    def iter_agents(self, params=None, limit=None):
+        """GET request to /api/v3/agents to iterate over all agents, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_AGENTS], params, limit)
+
+    async def agent(self, agent_id):
+        """GET request to /api/v3/agents/{agent_id} to get all informations
+        about a specific agent"""
+        response = await self._request("GET", [ROUTE_AGENTS, agent_id])
+        return self._parse_response(response, "Error agent id::{}")
+
+    async def delete_agent(self, agent_id):
+        """DELETE request to /api/v3/agents/{agent_id} to delete a specific agent"""
+        if agent_id:
+            logging.debug("Deleting {}".format(agent_id))
+            response = await self._request("DELETE", [ROUTE_AGENTS, agent_id])
+            return self.verif_response(response)
+
+        logging.error("No agent id specific for delete")
+        return False
+
+    async def remote_accesses(self, params=None, concurrency=None):
+        """GET request to /api/v3/remote_accesses to get all servers"""
+        response = await self._get_pages("GET", [ROUTE_REMOTE_ACCESSES], params, concurrency)
+
+        return response
+
+    def iter_remote_accesses(self, params=None, limit=None):
+        """GET request to /api/v3/remote_accesses to iterate over all remote accesses, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_REMOTE_ACCESSES], params, limit)
+
+    async def create_remote_access(self, info):
+        """"POST request to /api/v3/remote_accesses to create a specific remote access"""
+        if not info:
+            logging.error("Error create connection remote access")
+            return False
+        response = await self._request("POST", [ROUTE_REMOTE_ACCESSES], self._remote_access_body(info))
+        return self._created_remote_access(info, response)
+
+    async def remote_access(self, remote_access_id):
+        """GET request to /api/v3/remote_accesses/{remote_access_id} to get all informations
+        about a specific remote access"""
+        response = await self._request("GET", [ROUTE_REMOTE_ACCESSES, remote_access_id])
+        return self._parse_response(response, "error remote_access_id::{}")
+
+    async def delete_remote_access(self, remote_access_id):
+        """DELETE request to /api/v3/remote_access/{remote_id} to delete a specific remote access"""
+        if remote_access_id:
+            logging.debug("Deleting remote access {}".format(remote_access_id))
+            response = await self._request("DELETE", [ROUTE_REMOTE_ACCESSES, remote_access_id])
+            return self.verif_response(response)
+
+        logging.error("No remote_access_id for delete")
+        return False
+
+    async def update_remote_access(self, remote_access_id, info):
+        """PATCH request to /api/v3/remote_accesses/{remote_id} to update a remote access"""
+        if remote_access_id and info:
+            response = await self._request("PATCH", [ROUTE_REMOTE_ACCESSES, remote_access_id], info)
+            logging.debug("Update remote access::{}".format(response.text))
+            return self._cbw_parser(response)
+
+        logging.error("Error update remote access")
+        return False
+
+    async def cve_announcement(self, cve_code):
+        """GET request to /api/v3/cve_announcements/{cve_code} to get all informations
+        about a specific cve_announcement"""
+        response = await self._request("GET", [ROUTE_CVE_ANNOUNCEMENTS, cve_code])
+        return self._parse_response(response, "Error server id::{}")
+
+    async def cve_announcements(self, params=None, concurrency=None):
+        """GET request to /api/v3/cve_announcements to get a list of cve_announcement"""
+        response = await self._get_pages("GET", [ROUTE_CVE_ANNOUNCEMENTS], params, concurrency)
+
+        return response
+
+    def iter_cve_announcements(self, params=None, limit=None):
+        """GET request to /api/v3/cve_announcements to iterate over a list of cve_announcement, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_CVE_ANNOUNCEMENTS], params, limit)
+
+    async def update_cve_announcement(self, cve_code, params=None):
+        """PUT request to /api/v3/cve_announcements/{cve_code} to update cvss_custom/score_custom informations
+        about a specific cve_announcement"""
+        response = await self._request("PUT", [ROUTE_CVE_ANNOUNCEMENTS, cve_code], params)
+        return self._parse_response(response, "Error server id::{}")
+
+    async def delete_cve_announcement(self, cve_code):
+        """DELETE request to /api/v3/cve_announcements/{cve_code} to delete
+         a cvss_custom/score_custom fields of a cve_announcement"""
+        response = await self._request("DELETE", [ROUTE_CVE_ANNOUNCEMENTS, cve_code])
+        return self._parse_response(response, "Error server id::{}")
+
+    async def groups(self, params=None, concurrency=None):
+        """GET request to /api/v3/groups to get a list of groups"""
+        response = await self._get_pages("GET", [ROUTE_GROUPS], params, concurrency)
+
+        return response
+
+    def iter_groups(self, params=None, limit=None):
+        """GET request to /api/v3/groups to iterate over a list of groups, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_GROUPS], params, limit)
+
+    async def group(self, group_id):
+        """GET request to /api/v3/groups/<group_id> to get a specific group"""
+        response = await self._request("GET", [ROUTE_GROUPS, group_id])
+        return self._parse_response(response)
+
+    async def create_group(self, params):
+        """POST request to /api/v3/groups to create a group"""
+        response = await self._request("POST", [ROUTE_GROUPS], params)
+        return self._parse_response(response, "Error::{}", 201)
+
+    async def update_group(self, group_id, params=None):
+        """PUT request to /api/v3/groups/<group_id> to update a group"""
+        response = await self._request("PUT", [ROUTE_GROUPS, group_id], params)
+        return self._parse_response(response)
+
+    async def delete_group(self, group_id):
+        """DELETE request to /api/v3/groups/<group_id> to delete a group"""
+        response = await self._request("DELETE", [ROUTE_GROUPS, group_id])
+        return self._parse_response(response)
+
+    async def test_deploy_remote_access(self, remote_access_id):
+        """POST request to /api/v3/remote_accesses/:id/test_deploy to test an agentless deployment"""
+        response = await self._request("PUT", [ROUTE_REMOTE_ACCESSES, remote_access_id, 'test_deploy'])
+        return self._parse_response(response)
+
+    async def users(self, params=None, concurrency=None):
+        """GET request to /api/v3/users to get a list of users"""
+        response = await self._get_pages("GET", [ROUTE_USERS], params, concurrency)
+
+        return response
+
+    def iter_users(self, params=None, limit=None):
+        """GET request to /api/v3/users to iterate over a list of users, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_USERS], params, limit)
+
+    async def user(self, user_id):
+        """GET request to /api/v3/users/<id> to get a specific user"""
+        response = await self._request("GET", [ROUTE_USERS, user_id])
+        return self._parse_response(response)
+
+    async def nodes(self, params=None, concurrency=None):
+        """GET request to /api/v3/nodes to get a list of all nodes"""
+        response = await self._get_pages("GET", [ROUTE_NODES], params, concurrency)
+
+        return response
+
+    def iter_nodes(self, params=None, limit=None):
+        """GET request to /api/v3/nodes to iterate over a list of all nodes, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_NODES], params, limit)
+
+    async def node(self, node_id):
+        """GET request to /api/v3/nodes/<node_id> to get a list of all nodes"""
+        response = await self._request("GET", [ROUTE_NODES, node_id])
+        return self._parse_response(response)
+
+    async def delete_node(self, node_id, new_node_id):
+        """DELETE request to /api/v3/nodes/<node_id> to delete a node and transfer the data to another one"""
+        response = await self._request("DELETE", [ROUTE_NODES, node_id], new_node_id)
+        return self._parse_response(response)
+
+    async def hosts(self, params=None, concurrency=None):
+        """GET request to /api/v3/hosts to get a list of all hosts"""
+        response = await self._get_pages("GET", [ROUTE_HOSTS], params, concurrency)
+
+        return response
+
+    def iter_hosts(self, params=None, limit=None):
+        """GET request to /api/v3/hosts to iterate over a list of all hosts, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_HOSTS], params, limit)
+
+    async def host(self, host_id):
+        """GET request to /api/v3/hosts/<host_id> to get a specific host"""
+        response = await self._request("GET", [ROUTE_HOSTS, host_id])
+        return self._parse_response(response)
+
+    async def create_host(self, params):
+        """POST request to /api/v3/hosts to create a host"""
+        response = await self._request("POST", [ROUTE_HOSTS], params)
+        return self._parse_response(response, "Error::{}", 201)
+
+    async def update_host(self, host_id, params=None):
+        """PUT request to /api/v3/hosts/<host_id> to update a host"""
+        response = await self._request("PUT", [ROUTE_HOSTS, host_id], params)
+        return self._parse_response(response)
+
+    async def delete_host(self, host_id):
+        """DELETE request to /api/v3/hosts/<host_id> to delete a host"""
+        response = await self._request("DELETE", [ROUTE_HOSTS, host_id])
+        return self._parse_response(response)
+
+    async def security_issues(self, params=None, concurrency=None):
+        """GET request to /api/v3/security_issues to get a list of all security_issues"""
+        response = await self._get_pages("GET", [ROUTE_SECURITY_ISSUES], params, concurrency)
+
+        return response
+
+    def iter_security_issues(self, params=None, limit=None):
+        """GET request to /api/v3/security_issues to iterate over a list of all security_issues, one page at a time"""
+        return self._iter_pages("GET", [ROUTE_SECURITY_ISSUES], params, limit)
+
+    async def security_issue(self, security_issue_id):
+        """GET request to /api/v3/security_issues/<security_issue_id> to get a specific security_issue"""
+        response = await self._request("GET", [ROUTE_SECURITY_ISSUES, security_issue_id])
+        return self._parse_response(response)
+
+    async def create_security_issue(self, params=None):
+        """POST request to /api/v3/security_issues to create a security_issue"""
+        response = await self._request("POST", [ROUTE_SECURITY_ISSUES], params)
+        return self._parse_response(response, "Error::{}", 201)
+
+    async def update_security_issue(self, security_issue_id, params=None):
+        """PUT request to /api/v3/security_issues/<security_issue_id> to update a security_issue"""
+        response = await self._request("PUT", [ROUTE_SECURITY_ISSUES, security_issue_id], params)
+        return self._parse_response(response)
+
+    async def delete_security_issue(self, security_issue_id):
+        """DELETE request to /api/v3/security_issues/<security_issue_id> to delete a security_issue"""
+        response = await self._request("DELETE", [ROUTE_SECURITY_ISSUES, security_issue_id])
+        return self._parse_response(response)
+
+    async def fetch_importer_scripts(self, params=None):
+        """GET request to /api/v2/cbw_scans/scripts to get a list of all Importer scanning scripts"""
+        response = await self._request("GET", [ROUTE_IMPORTER], params)
+        return self._parse_response(response)
+
+    async def fetch_importer_script(self, script_id):
+        """GET request to /api/v2/cbw_scans/scripts/{SCRIPT_ID} to get a specific Importer scanning script"""
+        response = await self._request("GET", [ROUTE_IMPORTER, script_id])
+        return self._parse_response(response)
+
+    async def upload_importer_results(self, content):
+        """POST request to /api/v2/cbw_scans/scripts to upload scanning script result"""
+        response = await self._request("POST", [ROUTE_IMPORTER], content)
+        if response.status_code != 204:
+            logging.error("Error::{}".format(response.text))
+            return None
+
+        return response
@@ -0,0 +1,79 @@
+"""Module used to run one API call per item with a bounded number of threads"""
+
+import logging
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Outcome of the call made for items[index], error being None when it succeeded
+CBWBulkResult = namedtuple('CBWBulkResult', ['index', 'item', 'result', 'error'])
+
+
+class CBWBulkReport:
+    """Outcome of a bulk operation, the results being kept in the order of the items"""
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.results = [None] * len(self.items)
+        self.errors = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, bulk_result):
+        """Record the outcome of the call made for one item"""
+        self.results[bulk_result.index] = bulk_result.result
+        if bulk_result.error is not None:
+            self.errors[bulk_result.index] = bulk_result.error
+
+    @property
+    def succeeded(self):
+        """List of (item, result) for the calls which succeeded, in the order of the items"""
+        return [(item, result) for index, (item, result) in enumerate(zip(self.items, self.results))
+                if index not in self.errors]
+
+    @property
+    def failed(self):
+        """List of (item, error) for the calls which failed, in the order of the items"""
+        return [(self.items[index], self.errors[index]) for index in sorted(self.errors)]
+
+
+def _call(function, index, item):
+    """Call function for an item, None and False results being reported as failures"""
+    try:
+        result = function(item)
+    except Exception as error:  # pylint: disable=broad-except
+        logging.exception("An error occurred for {}".format(item))
+        return CBWBulkResult(index, item, None, repr(error))
+
+    if result is None or result is False:
+        return CBWBulkResult(index, item, result, "No result")
+    return CBWBulkResult(index, item, result, None)
+
+
+def iter_bulk(function, items, workers=10):
+    """Call function for each item with at most `workers` calls in flight and yield a CBWBulkResult
+    as soon as each call completes. Items are submitted progressively so that large inputs
+    are never all queued at once"""
+    items = iter(items)
+    pending = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, item in enumerate(items):
+            pending.add(executor.submit(_call, function, index, item))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def run_bulk(function, items, workers=10):
+    """Call function for each item with at most `workers` calls in flight and return a CBWBulkReport"""
+    report = CBWBulkReport(items)
+    for bulk_result in iter_bulk(function, report.items, workers):
+        report.add(bulk_result)
+    return report
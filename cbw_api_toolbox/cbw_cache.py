@@ -0,0 +1,234 @@
+"""Module used to cache the entities returned by the CBW API"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Returned by CBWEntityCache.get when the entity is not cached
+MISSING = object()
+
+
+class CBWEntityCache:
+    """Size-bounded LRU cache of the entities returned by the single-item getters of CBWApi.
+    Entities expire after `ttl` seconds, or after the time given for their type in `ttls`
+    (e.g. {'servers': 60, 'cve_announcements': 3600}). The cache is safe to share between threads"""
+
+    def __init__(self, maxsize=10000, ttl=300, ttls=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, entity_type, entity_id):
+        """Return the cached entity, MISSING if it is not cached or has expired"""
+        key = (entity_type, str(entity_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, entity_type, entity_id, entity):
+        """Cache an entity, evicting the least recently used ones once the cache is full"""
+        key = (entity_type, str(entity_id))
+        expires_at = self.clock() + self.ttls.get(entity_type, self.ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, entity)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, entity_type, entity_id=None):
+        """Remove an entity from the cache, or every entity of a type when entity_id is None"""
+        with self._lock:
+            if entity_id is not None:
+                self._entries.pop((entity_type, str(entity_id)), None)
+                return
+            for key in [key for key in self._entries if key[0] == entity_type]:
+                del self._entries[key]
+
+    def clear(self):
+        """Remove every entity from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the hits, misses and evictions counters and the number of cached entities"""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+
+class CBWConditionalCache:
+    """Size-bounded LRU cache of the validators (ETag, Last-Modified) and the parsed entities of the
+    single-item GET responses. The requests of a cached entity carry If-None-Match and If-Modified-Since,
+    the cached entity being reused when the API answers 304 Not Modified"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+
+        self.revalidations = 0
+        self.downloads = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def headers(self, url):
+        """Return the conditional headers of a request to url, empty when nothing is cached for it"""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry[0] is not None:
+            headers["If-None-Match"] = entry[0]
+        if entry[1] is not None:
+            headers["If-Modified-Since"] = entry[1]
+        return headers
+
+    def revalidated(self, url):
+        """Return the cached entity of url after a 304 response, MISSING if it is not cached anymore"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return MISSING
+            self._entries.move_to_end(url)
+            self.revalidations += 1
+            return entry[2]
+
+    def store(self, url, response, entity):
+        """Count a full download and cache the entity when the response carries validators"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            self.downloads += 1
+            if etag is None and last_modified is None:
+                self._entries.pop(url, None)
+                return
+            self._entries[url] = (etag, last_modified, entity)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return the revalidations and downloads counters and the number of cached entities"""
+        return {"revalidations": self.revalidations, "downloads": self.downloads, "size": len(self._entries)}
+
+
+class CBWResponseCache:
+    """Persistent cache of the responses to the GET requests, kept in a SQLite database in WAL mode so
+    that several scripts of the same host can share it. Only the routes whose entity type has a time
+    to live in `ttls` are cached (e.g. {'cve_announcements': 86400, 'scripts': 86400, 'groups': 3600}),
+    responses older than that time being requested again"""
+
+    SCHEMA = """CREATE TABLE IF NOT EXISTS responses (
+        api_key TEXT NOT NULL,
+        url TEXT NOT NULL,
+        params TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        headers TEXT NOT NULL,
+        content BLOB NOT NULL,
+        stored_at REAL NOT NULL,
+        PRIMARY KEY (api_key, url, params))"""
+
+    def __init__(self, path, ttls=None, clock=time.time):
+        self.path = path
+        self.ttls = ttls or {}
+        self.clock = clock
+
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(self.SCHEMA)
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_entity_type ON responses (entity_type)")
+
+    def _connection(self):
+        """Return the connection of the current thread, SQLite connections can not be shared between threads"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close the connection of the current thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def caches(self, entity_type):
+        """Check if the responses of an entity type are cached"""
+        return entity_type in self.ttls
+
+    def get(self, api_key, url, params, entity_type):
+        """Return the cached response to a GET request, None if it is not cached or has expired"""
+        row = self._connection().execute(
+            "SELECT headers, content FROM responses WHERE api_key = ? AND url = ? AND params = ? AND stored_at > ?",
+            (api_key, url, params or "", self.clock() - self.ttls.get(entity_type, 0))).fetchone()
+        if row is None:
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(row[0]))
+        response._content = bytes(row[1])  # pylint: disable=protected-access
+        return response
+
+    def set(self, api_key, url, params, entity_type, response):
+        """Store the response to a GET request"""
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (api_key, url, params or "", entity_type, json.dumps(dict(response.headers)),
+                                response.content, self.clock()))
+
+    def invalidate(self, entity_type):
+        """Remove the responses of an entity type, e.g. after a write request on that type"""
+        self.purge(entity_type)
+
+    def purge(self, entity_type=None, older_than=None):
+        """Remove the responses of an entity type, or of every type when entity_type is None, which were
+        stored more than `older_than` seconds ago when given. Return the number of responses removed"""
+        query = "DELETE FROM responses WHERE 1"
+        values = []
+        if entity_type is not None:
+            query += " AND entity_type = ?"
+            values.append(entity_type)
+        if older_than is not None:
+            query += " AND stored_at <= ?"
+            values.append(self.clock() - older_than)
+
+        with self._connection() as connection:
+            return connection.execute(query, values).rowcount
+
+    def entries(self):
+        """Return the (entity_type, url, params, size, stored_at) of the cached responses"""
+        return self._connection().execute(
+            "SELECT entity_type, url, params, length(content), stored_at FROM responses "
+            "ORDER BY entity_type, url, params").fetchall()
@@ -0,0 +1,99 @@
+"""Command line interface used to inspect, warm and purge a CBWResponseCache
+
+    python -m cbw_api_toolbox.cbw_cache_cli inspect cache.sqlite
+    python -m cbw_api_toolbox.cbw_cache_cli warm cache.sqlite --conf api.conf groups nodes scripts
+    python -m cbw_api_toolbox.cbw_cache_cli purge cache.sqlite --type groups --older-than 3600
+"""
+
+import argparse
+import datetime
+import sys
+from configparser import ConfigParser
+
+from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_cache import CBWResponseCache
+
+# Methods of CBWApi warming the cache of each entity type
+WARM_METHODS = {
+    "cve_announcements": "cve_announcements",
+    "groups": "groups",
+    "hosts": "hosts",
+    "nodes": "nodes",
+    "scripts": "fetch_importer_scripts",
+    "security_issues": "security_issues",
+    "users": "users",
+}
+
+
+def inspect(args):
+    """Print the cached responses"""
+    entries = CBWResponseCache(args.path).entries()
+    for entity_type, url, params, size, stored_at in entries:
+        print("{}\t{}\t{}\t{}\t{}".format(entity_type, url, params or "-", size,
+                                          datetime.datetime.fromtimestamp(stored_at).isoformat(timespec="seconds")))
+    print("{} responses, {} bytes".format(len(entries), sum(entry[3] for entry in entries)))
+    return 0
+
+
+def warm(args):
+    """Request the lists of the entity types given, and the CVE announcements given, to cache their responses.
+    The responses are downloaded again even when the cache holds fresh ones"""
+    conf = ConfigParser()
+    conf.read(args.conf)
+
+    types = set(args.types) | ({"cve_announcements"} if args.cve else set())
+    client = CBWApi(conf.get('cyberwatch', 'url'), conf.get('cyberwatch', 'api_key'),
+                    conf.get('cyberwatch', 'secret_key'),
+                    response_cache=CBWResponseCache(args.path, {entity_type: 0 for entity_type in types}))
+
+    status = 0
+    for entity_type in args.types:
+        if getattr(client, WARM_METHODS[entity_type])() is None:
+            print("Failed to warm {}".format(entity_type), file=sys.stderr)
+            status = 1
+    for cve_code in args.cve:
+        if client.cve_announcement(cve_code) is None:
+            print("Failed to warm {}".format(cve_code), file=sys.stderr)
+            status = 1
+    return status
+
+
+def purge(args):
+    """Remove cached responses"""
+    count = CBWResponseCache(args.path).purge(args.type, args.older_than)
+    print("{} responses removed".format(count))
+    return 0
+
+
+def main(argv=None):
+    """Entry point of the command line interface"""
+    parser = argparse.ArgumentParser(prog="cbw-cache", description="Manage a Cyberwatch API response cache")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    inspect_parser = commands.add_parser("inspect", help="list the cached responses")
+    inspect_parser.add_argument("path", help="SQLite file of the cache")
+    inspect_parser.set_defaults(function=inspect)
+
+    warm_parser = commands.add_parser("warm", help="cache the responses of entity types")
+    warm_parser.add_argument("path", help="SQLite file of the cache")
+    warm_parser.add_argument("types", nargs="*", metavar="type",
+                             help="entity type to cache, among {}".format(", ".join(sorted(WARM_METHODS))))
+    warm_parser.add_argument("--conf", default="api.conf", help="configuration file with a [cyberwatch] section")
+    warm_parser.add_argument("--cve", action="append", default=[], help="code of a CVE announcement to cache")
+    warm_parser.set_defaults(function=warm)
+
+    purge_parser = commands.add_parser("purge", help="remove cached responses")
+    purge_parser.add_argument("path", help="SQLite file of the cache")
+    purge_parser.add_argument("--type", help="only remove the responses of this entity type")
+    purge_parser.add_argument("--older-than", type=float, help="only remove the responses older than these seconds")
+    purge_parser.set_defaults(function=purge)
+
+    args = parser.parse_args(argv)
+    if args.command == "warm" and not set(args.types) <= set(WARM_METHODS):
+        parser.error("unknown entity type {}".format(", ".join(sorted(set(args.types) - set(WARM_METHODS)))))
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
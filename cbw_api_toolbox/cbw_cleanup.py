@@ -0,0 +1,128 @@
+"""Module used to find the duplicated and stale servers and to delete them"""
+
+import datetime
+import logging
+from collections import namedtuple
+
+from cbw_api_toolbox.cbw_bulk import CBWBulkReport, iter_bulk
+from cbw_api_toolbox.cbw_parser import parse_date
+
+# Reasons of the deletion of a server
+DUPLICATE = 'duplicate'
+STALE_AGENT = 'stale_agent'
+STALE_AGENTLESS = 'stale_agentless'
+
+INIT_STATUS = 'server_update_init'
+
+# Server to delete and why, kept being the server kept in its place for a duplicate
+CBWDeletion = namedtuple('CBWDeletion', ['server', 'reason', 'kept'])
+
+
+def normalize_hostname(hostname, case_sensitive=False, short_names=False):
+    """Return the hostname compared to find the duplicates, None for servers without hostname.
+    With short_names, a FQDN and its short name are the same host"""
+    if not hostname:
+        return None
+    hostname = hostname.strip().rstrip('.')
+    if short_names:
+        hostname = hostname.split('.', 1)[0]
+    return hostname if case_sensitive else hostname.lower()
+
+
+def months_ago(now, months):
+    """Return the date `months` months before now, the day being clamped to the end of the month"""
+    month_index = now.year * 12 + now.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    next_month = datetime.date(year + month // 12, month % 12 + 1, 1)
+    last_day = (next_month - datetime.timedelta(days=1)).day
+    return now.replace(year=year, month=month, day=min(now.day, last_day))
+
+
+class CBWCleanupPlan:
+    """Servers to delete, each server appearing once"""
+
+    def __init__(self, deletions):
+        self.deletions = list(deletions)
+
+    def __len__(self):
+        return len(self.deletions)
+
+    def __iter__(self):
+        return iter(self.deletions)
+
+    def by_reason(self, reason):
+        """Return the deletions of a reason"""
+        return [deletion for deletion in self.deletions if deletion.reason == reason]
+
+    def execute(self, client, reasons=None, workers=5, progress=None, journal=None):
+        """Delete the servers of the plan, only those of the reasons given when given, with at most `workers`
+        requests in flight. progress is called with (completed, total, CBWBulkResult) after each deletion.
+        With a CBWJournal, the servers whose deletion it confirmed are skipped.
+        Return a CBWBulkReport whose items are the deletions"""
+        deletions = [deletion for deletion in self.deletions if reasons is None or deletion.reason in reasons]
+
+        def delete(deletion):
+            return client.delete_server(str(deletion.server.id))
+
+        if journal is not None:
+            return journal.run(delete, deletions, lambda deletion: deletion.server.id, workers, progress=progress)
+
+        report = CBWBulkReport(deletions)
+        for completed, bulk_result in enumerate(iter_bulk(delete, deletions, workers), 1):
+            report.add(bulk_result)
+            if progress is not None:
+                progress(completed, len(deletions), bulk_result)
+        return report
+
+
+class CBWServerCleanup:
+    """Find in one pass over the servers the duplicates, servers sharing a hostname with a server which
+    communicated more recently, and the stale servers, still initializing `agents_months` months after
+    their creation for the agents and `agentless_months` months for the agentless connections"""
+
+    def __init__(self, agents_months=3, agentless_months=6, case_sensitive=False, short_names=False, now=None):
+        self.agents_months = agents_months
+        self.agentless_months = agentless_months
+        self.case_sensitive = case_sensitive
+        self.short_names = short_names
+        self.now = now
+
+    def plan(self, servers, agent_server_ids=()):
+        """Return the CBWCleanupPlan of the servers, those whose id is in agent_server_ids having an agent,
+        e.g. the server_id of CBWApi.agents(), and the others an agentless connection"""
+        now = self.now or datetime.datetime.now(datetime.timezone.utc)
+        agents_limit = months_ago(now, self.agents_months)
+        agentless_limit = months_ago(now, self.agentless_months)
+        agent_server_ids = set(agent_server_ids)
+
+        hostnames = {}
+        stale = []
+        for server in servers:
+            hostname = normalize_hostname(server.hostname, self.case_sensitive, self.short_names)
+            if hostname is not None:
+                hostnames.setdefault(hostname, []).append((parse_date(server.last_communication), server))
+
+            created_at = parse_date(server.created_at)
+            if created_at is None:
+                logging.warning("created_at is None for {} -- {}".format(server.id, server.hostname))
+            elif (server.status or '').lower() == INIT_STATUS:
+                if server.id in agent_server_ids:
+                    if created_at < agents_limit:
+                        stale.append(CBWDeletion(server, STALE_AGENT, None))
+                elif created_at < agentless_limit:
+                    stale.append(CBWDeletion(server, STALE_AGENTLESS, None))
+
+        deletions = []
+        duplicated_ids = set()
+        for group in hostnames.values():
+            if len(group) < 2:
+                continue
+            kept = max(group, key=lambda entry: (entry[0] is not None, entry[0] or now, entry[1].id))[1]
+            for _, server in group:
+                if server is not kept:
+                    deletions.append(CBWDeletion(server, DUPLICATE, kept))
+                    duplicated_ids.add(server.id)
+
+        deletions.extend(deletion for deletion in stale if deletion.server.id not in duplicated_ids)
+        return CBWCleanupPlan(deletions)
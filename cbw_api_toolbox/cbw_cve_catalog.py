@@ -0,0 +1,98 @@
+"""Module used to look up the CVE announcements by code and by attribute"""
+
+from collections import defaultdict
+
+from cbw_api_toolbox.cbw_cve_index import AFFECTED
+
+ACCESS_VECTORS = ('access_vector_network', 'access_vector_local', 'access_vector_adjacent_network',
+                  'access_vector_physical')
+
+
+def _access_vector(cve):
+    """Return the CVSS v3 access vector of a CVE announcement, None if it has no CVSS v3 metrics"""
+    return getattr(getattr(cve, 'cvss_v3', None), 'access_vector', None)
+
+
+class CBWCveCatalog:
+    """CVE announcements indexed by cve_code, with secondary indexes by level, exploit code maturity
+    and CVSS v3 access vector"""
+
+    def __init__(self, cves=()):
+        self._cves = {}
+        self._levels = defaultdict(set)
+        self._maturities = defaultdict(set)
+        self._access_vectors = defaultdict(set)
+        for cve in cves:
+            self.add(cve)
+
+    def __len__(self):
+        return len(self._cves)
+
+    def __contains__(self, cve_code):
+        return cve_code in self._cves
+
+    def __iter__(self):
+        return iter(self._cves.values())
+
+    def __getitem__(self, cve_code):
+        return self._cves[cve_code]
+
+    @classmethod
+    def from_client(cls, client, params=None, concurrency=None):
+        """Build the catalog of the CVE announcements returned by CBWApi.cve_announcements(params),
+        None if they could not be downloaded"""
+        cves = client.cve_announcements(params, concurrency)
+        if cves is None:
+            return None
+        return cls(cves)
+
+    def add(self, cve):
+        """Add a CVE announcement to the catalog, replacing the one with the same code"""
+        self.remove(cve.cve_code)
+        self._cves[cve.cve_code] = cve
+        self._levels[getattr(cve, 'level', None)].add(cve.cve_code)
+        self._maturities[getattr(cve, 'exploit_code_maturity', None)].add(cve.cve_code)
+        self._access_vectors[_access_vector(cve)].add(cve.cve_code)
+
+    def remove(self, cve_code):
+        """Remove a CVE announcement from the catalog"""
+        cve = self._cves.pop(cve_code, None)
+        if cve is None:
+            return
+        self._levels[getattr(cve, 'level', None)].discard(cve_code)
+        self._maturities[getattr(cve, 'exploit_code_maturity', None)].discard(cve_code)
+        self._access_vectors[_access_vector(cve)].discard(cve_code)
+
+    def get(self, cve_code, default=None):
+        """Return the CVE announcement of a code, default if it is not in the catalog"""
+        return self._cves.get(cve_code, default)
+
+    def codes(self, level=None, exploit_code_maturity=None, access_vector=None):
+        """Return the set of the codes of the CVE announcements matching every criterion given"""
+        selections = []
+        if level is not None:
+            selections.append(self._levels.get(level, set()))
+        if exploit_code_maturity is not None:
+            selections.append(self._maturities.get(exploit_code_maturity, set()))
+        if access_vector is not None:
+            selections.append(self._access_vectors.get(access_vector, set()))
+
+        if not selections:
+            return set(self._cves)
+        selections.sort(key=len)
+        return selections[0].intersection(*selections[1:])
+
+    def find(self, level=None, exploit_code_maturity=None, access_vector=None):
+        """Return the CVE announcements matching every criterion given, sorted by code"""
+        return [self._cves[cve_code] for cve_code in sorted(self.codes(level, exploit_code_maturity, access_vector))]
+
+    def count_by_access_vector(self, cve_index, state=AFFECTED):
+        """Return the number of (server, CVE announcement) pairs of a CBWCveIndex, in a state on the server,
+        by CVSS v3 access vector of the CVE announcements of the catalog. Each CVE announcement is
+        counted once with its number of servers instead of walking the CVE announcements of every server"""
+        server_counts = cve_index.server_counts(state)
+        counts = dict.fromkeys(ACCESS_VECTORS, 0)
+        for access_vector, cve_codes in self._access_vectors.items():
+            if access_vector is not None:
+                counts[access_vector] = sum(server_counts.get(cve_code, 0) for cve_code in cve_codes)
+        return counts
@@ -0,0 +1,159 @@
+"""Module used to index the CVE announcements of the servers"""
+
+import json
+from array import array
+
+# States of a CVE announcement on a server
+AFFECTED = 0
+IGNORED = 1
+FIXED = 2
+
+
+def _state(cve):
+    """Return the state of a CVE announcement of a server detail"""
+    if getattr(cve, 'fixed_at', None) is not None:
+        return FIXED
+    if getattr(cve, 'ignored', False):
+        return IGNORED
+    return AFFECTED
+
+
+def update_for_cve(server, cve_code):
+    """Return the first update of a server detail fixing a CVE and having a target product and version,
+    None if there is none. The CVE announcements of the updates may be records or CVE codes"""
+    for update in getattr(server, 'updates', None) or []:
+        cve_codes = {getattr(cve, 'cve_code', cve) for cve in update.cve_announcements or []}
+        if cve_code in cve_codes and update.target is not None and update.target.product is not None \
+                and update.target.version is not None:
+            return update
+    return None
+
+
+class CBWCveIndex:
+    """Inverted index of the CVE announcements of the servers, built in one pass over the server
+    details: cve_code -> ids of the servers affected, ignoring it or fixed, and server id -> cve codes.
+    The CVE codes are numbered and both mappings hold arrays of integers"""
+
+    def __init__(self):
+        self.cve_codes = []
+        self._cve_ids = {}
+        self._cves = {}
+        self._servers = {}
+
+    def __len__(self):
+        return len(self._cves)
+
+    def __contains__(self, cve_code):
+        return cve_code in self._cve_ids
+
+    @classmethod
+    def from_servers(cls, servers):
+        """Build the index of server details, e.g. the results of CBWApi.servers_details"""
+        index = cls()
+        for server in servers:
+            index.add_server(server)
+        return index
+
+    @classmethod
+    def from_client(cls, client, workers=10):
+        """Build the index of every server, their details being requested by `workers` threads.
+        Return None if the servers could not be listed"""
+        servers = client.servers()
+        if servers is None:
+            return None
+        details = client.iter_servers_details([server.id for server in servers], workers)
+        return cls.from_servers(result.result for result in details if result.error is None)
+
+    def _cve_id(self, cve_code):
+        """Return the number of a CVE code, numbering it on its first use"""
+        cve_id = self._cve_ids.get(cve_code)
+        if cve_id is None:
+            cve_id = self._cve_ids[cve_code] = len(self.cve_codes)
+            self.cve_codes.append(cve_code)
+        return cve_id
+
+    def add_server(self, server):
+        """Index the CVE announcements of a server detail, replacing those indexed before for it"""
+        self.remove_server(server.id)
+
+        server_cves = self._servers[server.id] = (array('i'), array('i'), array('i'))
+        for cve in server.cve_announcements or []:
+            cve_id = self._cve_id(cve.cve_code)
+            state = _state(cve)
+            server_cves[state].append(cve_id)
+            if cve_id not in self._cves:
+                self._cves[cve_id] = (array('i'), array('i'), array('i'))
+            self._cves[cve_id][state].append(server.id)
+
+    def remove_server(self, server_id):
+        """Remove a server from the index"""
+        server_cves = self._servers.pop(server_id, None)
+        if server_cves is None:
+            return
+
+        for state, cve_ids in enumerate(server_cves):
+            for cve_id in cve_ids:
+                self._cves[cve_id][state].remove(server_id)
+
+    def _servers_of(self, cve_code, state):
+        """Return the ids of the servers on which a CVE announcement is in a state"""
+        cve_id = self._cve_ids.get(cve_code)
+        if cve_id is None or cve_id not in self._cves:
+            return []
+        return self._cves[cve_id][state].tolist()
+
+    def affected_servers(self, cve_code):
+        """Return the ids of the servers affected by a CVE announcement"""
+        return self._servers_of(cve_code, AFFECTED)
+
+    def ignored_servers(self, cve_code):
+        """Return the ids of the servers on which a CVE announcement is ignored"""
+        return self._servers_of(cve_code, IGNORED)
+
+    def fixed_servers(self, cve_code):
+        """Return the ids of the servers on which a CVE announcement was fixed"""
+        return self._servers_of(cve_code, FIXED)
+
+    def server_cves(self, server_id, state=AFFECTED):
+        """Return the codes of the CVE announcements of a server in a state, those affecting it by default"""
+        server_cves = self._servers.get(server_id)
+        if server_cves is None:
+            return []
+        return [self.cve_codes[cve_id] for cve_id in server_cves[state]]
+
+    def server_counts(self, state=AFFECTED):
+        """Return the number of servers on which each CVE announcement is in a state, by cve_code"""
+        return {self.cve_codes[cve_id]: len(servers[state]) for cve_id, servers in self._cves.items()
+                if servers[state]}
+
+    def server_ids(self):
+        """Return the ids of the servers indexed"""
+        return list(self._servers)
+
+    def save(self, path):
+        """Write the index to a file"""
+        with open(path, 'w') as index_file:
+            json.dump({
+                'cve_codes': self.cve_codes,
+                'servers': {str(server_id): [cve_ids.tolist() for cve_ids in server_cves]
+                            for server_id, server_cves in self._servers.items()},
+            }, index_file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save"""
+        with open(path) as index_file:
+            content = json.load(index_file)
+
+        index = cls()
+        index.cve_codes = content['cve_codes']
+        index._cve_ids = {cve_code: cve_id for cve_id, cve_code in enumerate(index.cve_codes)}
+        for server_id, server_cves in content['servers'].items():
+            server_id = int(server_id)
+            index._servers[server_id] = tuple(array('i', cve_ids) for cve_ids in server_cves)
+            for state, cve_ids in enumerate(server_cves):
+                for cve_id in cve_ids:
+                    if cve_id not in index._cves:
+                        index._cves[cve_id] = (array('i'), array('i'), array('i'))
+                    index._cves[cve_id][state].append(server_id)
+        return index
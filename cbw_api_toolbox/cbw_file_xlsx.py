@@ -1,11 +1,80 @@
 """Module used to import export file xlsx remote acesses"""
 
+import csv
 import datetime
 import logging
+import os
+from collections import namedtuple
+
 import xlrd
 import xlsxwriter
 
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_bulk import iter_bulk
+
+# Titles of the columns of the fields of a remote access
+REMOTE_ACCESS_HEADERS = {
+    "address": "HOST",
+    "port": "PORT",
+    "type": "TYPE",
+    "login": "USERNAME",
+    "password": "PASSWORD",
+    "key": "KEY",
+    "node_id": "NODE_ID",
+    "server_groups": "SERVER_GROUPS",
+}
+OPTIONAL_FIELDS = ("password", "key", "server_groups")
+
+# Status of an imported row
+CREATED = "created"
+SKIPPED = "skipped"
+INVALID = "invalid"
+FAILED = "failed"
+
+# Outcome of the import of a row of a file, line being its line number in the file
+CBWImportResult = namedtuple('CBWImportResult', ['line', 'info', 'status', 'remote_access', 'error'])
+
+
+def read_rows(path):
+    """Yield the rows of a csv file, read line by line, or of the first sheet of an xlsx file, which xlrd
+    loads in memory at once, as lists of values"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as csv_file:
+            yield from csv.reader(csv_file)
+    else:
+        book = xlrd.open_workbook(path, on_demand=True)
+        try:
+            for row in book.sheet_by_index(0).get_rows():
+                yield [cell.value for cell in row]
+        finally:
+            book.release_resources()
+
+
+def header_columns(titles, header_map):
+    """Return the column of each field of header_map found in titles, raise ValueError if a required one is missing"""
+    titles = [str(title).strip() for title in titles]
+    columns = {field: titles.index(title) for field, title in header_map.items() if title in titles}
+    missing = [title for field, title in header_map.items() if field not in columns and field not in OPTIONAL_FIELDS]
+    if missing:
+        raise ValueError("missing columns {}".format(", ".join(missing)))
+    return columns
+
+
+def _cell(value):
+    """Return the value of a cell, the integers read as floats in xlsx files being converted back"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _key_value(value):
+    """Return a cell value as compared to find duplicates, the cells 22.0 and '22' being equal"""
+    return str(_cell(value)).strip().lower()
+
+
+def remote_access_key(address, port, node_id):
+    """Return the key identifying a remote access among the imported ones"""
+    return _key_value(address), _key_value(port), _key_value(node_id)
 
 
 class CBWXlsx:
@@ -14,7 +83,7 @@ class CBWXlsx:
     def __init__(self, api_url, api_key, secret_key):
         self.client = CBWApi(api_url, api_key, secret_key)
 
-    def import_remote_accesses_xlsx(self, file_xlsx):
+    def import_remote_accesses_xlsx(self, file_xlsx, workers=1):
         """method to import remote accesses from an xlsx file"""
         if not file_xlsx:
             logging.fatal("No Files xlsx")
@@ -24,38 +93,86 @@ class CBWXlsx:
             logging.fatal("Extension not valid")
             return None
 
-        imported = xlrd.open_workbook(file_xlsx)
-        lines = imported.sheet_by_index(0)
-        response = []
-        titles = lines.row_values(0)
-
-        for line in range(1, lines.nrows):
-            text = lines.row_values(line)
-            address = lines.row_values(line)[0]
-            logging.debug("Creating remote access {}".format(address))
-
-            try:
-                info = {
-                    "address": text[titles.index("HOST")],
-                    "port": text[titles.index("PORT")],
-                    "type": text[titles.index("TYPE")],
-                    "login": text[titles.index("USERNAME")],
-                    "password": text[titles.index("PASSWORD")],
-                    "key": text[titles.index("KEY")],
-                    "node_id": text[titles.index("NODE_ID")],
-                    "server_groups" : text[titles.index("SERVER_GROUPS")]
-                }
-
-                remote_access = self.client.create_remote_access(info)
-                response.append(remote_access)
-                logging.debug("Done")
-
-            except ValueError:
-                logging.fatal("Error format file xlsx::"
-                              "HOST, PORT, TYPE, USERNAME,"
-                              "PASSWORD, KEY, NODE_ID, SERVER_GROUPS")
+        results = self._import_rows(file_xlsx, workers, dedupe=False)
+        if results is None:
+            return None
+        return [result.remote_access if result.status in (CREATED, FAILED) else False for result in results]
+
+    def import_remote_accesses(self, path, workers=10, dedupe=True, header_map=None, report_path=None):
+        """Import the remote accesses of an xlsx or csv file with `workers` creations in flight, the rows
+        being read as the creations go. With dedupe, the rows matching an existing remote access, or a previous
+        row, by (address, port, node_id) are skipped. header_map maps the fields of REMOTE_ACCESS_HEADERS to
+        the titles of the columns. The outcome of each row is written as csv to report_path, by default next to
+        the file. Return the list of the CBWImportResult of the rows, None if the file could not be imported"""
+        if not path or not path.endswith((".xlsx", ".csv")):
+            logging.fatal("Extension not valid")
+            return None
+
+        results = self._import_rows(path, workers, dedupe, header_map)
+        if results is None:
+            return None
+
+        report_path = report_path or "{}_report.csv".format(os.path.splitext(path)[0])
+        with open(report_path, "w", newline="", encoding="utf-8") as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(["LINE", "HOST", "PORT", "NODE_ID", "STATUS", "ID", "ERROR"])
+            for result in results:
+                info = result.info or {}
+                writer.writerow([result.line, info.get("address", ""), _cell(info.get("port", "")),
+                                 _cell(info.get("node_id", "")), result.status, getattr(result.remote_access, "id", ""),
+                                 result.error or ""])
+        return results
+
+    def _import_rows(self, path, workers, dedupe, header_map=None):
+        """Create the remote accesses of the rows of a file and return the CBWImportResult of the rows"""
+        rows = read_rows(path)
+        try:
+            columns = header_columns(next(rows, []), header_map or REMOTE_ACCESS_HEADERS)
+        except ValueError as error:
+            logging.fatal("Error format file::{}".format(error))
+            return None
+
+        existing = set()
+        if dedupe:
+            remote_accesses = self.client.remote_accesses()
+            if remote_accesses is None:
+                logging.fatal("Failed to list the remote accesses")
                 return None
-        return response
+            existing = {remote_access_key(remote_access.address, remote_access.port, remote_access.node_id)
+                        for remote_access in remote_accesses}
+
+        results = []
+
+        def to_create():
+            """Yield the index in results of the rows to create, recording the other rows"""
+            for line, row in enumerate(rows, 2):
+                if not any(str(value).strip() for value in row):
+                    continue
+                info = {field: row[index] if index < len(row) else "" for field, index in columns.items()}
+                for field in OPTIONAL_FIELDS:
+                    info.setdefault(field, "")
+
+                if not str(info["address"]).strip():
+                    results.append(CBWImportResult(line, info, INVALID, None, "No address"))
+                    continue
+                if dedupe:
+                    key = remote_access_key(info["address"], info["port"], info["node_id"])
+                    if key in existing:
+                        results.append(CBWImportResult(line, info, SKIPPED, None, None))
+                        continue
+                    existing.add(key)
+
+                logging.debug("Creating remote access {}".format(info["address"]))
+                results.append(CBWImportResult(line, info, None, None, None))
+                yield len(results) - 1
+
+        for bulk_result in iter_bulk(lambda index: self.client.create_remote_access(results[index].info),
+                                     to_create(), workers):
+            status = CREATED if bulk_result.error is None else FAILED
+            results[bulk_result.item] = results[bulk_result.item]._replace(
+                status=status, remote_access=bulk_result.result, error=bulk_result.error)
+        logging.debug("Done")
+        return results
 
     def export_remote_accesses_xlsx(self,
                                     file_xlsx="export_remote_accesses_"+str(
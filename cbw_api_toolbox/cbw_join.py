@@ -0,0 +1,61 @@
+"""Module used to index, group and join collections of records, e.g. hosts with nodes,
+remote accesses with servers or servers with groups, in linear time"""
+
+from operator import attrgetter
+
+
+def _key_function(key):
+    """Return a function reading the key of a record, key being an attribute name, e.g. 'node_id' or
+    'node.id', or a function"""
+    return attrgetter(key) if isinstance(key, str) else key
+
+
+def index_by(records, key):
+    """Return the records by their key, the last one winning when keys repeat. Records whose key is None
+    are skipped"""
+    key = _key_function(key)
+    index = {}
+    for record in records:
+        value = key(record)
+        if value is not None:
+            index[value] = record
+    return index
+
+
+def group_by(records, key, many=False):
+    """Return the lists of records by key, in the order of the records. With many, key returns several keys
+    per record, e.g. lambda server: [group.name for group in server.groups], and the record is in each of
+    their lists. Records whose key is None are skipped. The lists hold the records themselves, not copies"""
+    key = _key_function(key)
+    groups = {}
+    for record in records:
+        values = key(record)
+        if not many:
+            values = (values,)
+        for value in values or ():
+            if value is not None:
+                groups.setdefault(value, []).append(record)
+    return groups
+
+
+def join(left, right, left_key, right_key, outer=False):
+    """Yield (left record, right record) for each pair of records with equal keys, right being hashed once.
+    With outer, the left records without a match are yielded with None"""
+    right_groups = group_by(right, right_key)
+    left_key = _key_function(left_key)
+    for record in left:
+        matches = right_groups.get(left_key(record))
+        if matches:
+            for match in matches:
+                yield record, match
+        elif outer:
+            yield record, None
+
+
+def anti_join(left, right, left_key, right_key):
+    """Yield the left records whose key matches no right record"""
+    right_keys = set(index_by(right, right_key))
+    left_key = _key_function(left_key)
+    for record in left:
+        if left_key(record) not in right_keys:
+            yield record
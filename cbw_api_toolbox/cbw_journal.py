@@ -0,0 +1,126 @@
+"""Module used to journal the writes of bulk operations so that an interrupted operation can be resumed"""
+
+import json
+import os
+import threading
+
+from cbw_api_toolbox.cbw_bulk import CBWBulkReport, iter_bulk
+
+# States of an item in the journal
+PLANNED = 'planned'
+ATTEMPTED = 'attempted'
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+
+
+class CBWJournal:
+    """Append-only file recording the state of each item of a bulk operation, one JSON line per change,
+    each line being synced to disk before the operation goes on. Reopening the journal after a crash
+    gives back the last state of each item: the confirmed items are not written again, the attempted
+    ones are in doubt as the crash may have happened before or after their write reached the API.
+    Use one journal per operation"""
+
+    def __init__(self, path):
+        self.path = path
+        self._states = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, 'rb') as journal_file:
+                content = journal_file.read()
+            for line in content.splitlines():
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # Last line cut by a crash
+                    continue
+                self._states[entry['key']] = entry['state']
+                if entry.get('error') is not None:
+                    self._errors[entry['key']] = entry['error']
+            truncated = bool(content) and not content.endswith(b'\n')
+        else:
+            truncated = False
+
+        self._file = open(path, 'a')  # pylint: disable=consider-using-with
+        if truncated:
+            self._file.write('\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._states)
+
+    def close(self):
+        """Close the journal file"""
+        self._file.close()
+
+    def state(self, key):
+        """Return the last state of an item, None if it is not in the journal"""
+        return self._states.get(str(key))
+
+    def error(self, key):
+        """Return the error of the last failure of an item, None if it never failed"""
+        return self._errors.get(str(key))
+
+    def _append(self, entries):
+        """Append (key, state, error) entries to the journal, syncing them to disk at once"""
+        with self._lock:
+            for key, state, error in entries:
+                self._file.write(json.dumps({'key': key, 'state': state, 'error': error}, separators=(',', ':')))
+                self._file.write('\n')
+                self._states[key] = state
+                if error is not None:
+                    self._errors[key] = error
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record(self, key, state, error=None):
+        """Append the new state of an item to the journal and sync it to disk"""
+        self._append([(str(key), state, error)])
+
+    def plan(self, keys):
+        """Record the items not yet in the journal as planned"""
+        keys = {str(key): None for key in keys}
+        self._append([(key, PLANNED, None) for key in keys if key not in self._states])
+
+    def keys(self, state):
+        """Return the keys of the items whose last state is state"""
+        return [key for key, item_state in self._states.items() if item_state == state]
+
+    def counts(self):
+        """Return the number of items in each state"""
+        counts = {PLANNED: 0, ATTEMPTED: 0, CONFIRMED: 0, FAILED: 0}
+        for state in self._states.values():
+            counts[state] += 1
+        return counts
+
+    def run(self, function, items, key=str, workers=10, retry_in_doubt=True, progress=None):
+        """Call function for each item not confirmed in the journal, with at most `workers` calls in flight,
+        recording each item as attempted before its call and as confirmed or failed after it. key(item) is
+        the key of an item in the journal. The items in doubt are called again if retry_in_doubt is set,
+        which suits idempotent writes such as PATCH and DELETE. progress is called with
+        (completed, total, CBWBulkResult) after each call. Return a CBWBulkReport of the items called"""
+        items = list(items)
+        self.plan(key(item) for item in items)
+        skipped = (CONFIRMED,) if retry_in_doubt else (CONFIRMED, ATTEMPTED)
+        todo = [item for item in items if self.state(key(item)) not in skipped]
+
+        def journaled(item):
+            self.record(key(item), ATTEMPTED)
+            return function(item)
+
+        report = CBWBulkReport(todo)
+        for completed, bulk_result in enumerate(iter_bulk(journaled, todo, workers), 1):
+            report.add(bulk_result)
+            if bulk_result.error is None:
+                self.record(key(bulk_result.item), CONFIRMED)
+            else:
+                self.record(key(bulk_result.item), FAILED, bulk_result.error)
+            if progress is not None:
+                progress(completed, len(todo), bulk_result)
+        return report
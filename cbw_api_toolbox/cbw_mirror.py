@@ -0,0 +1,367 @@
+"""Module used to mirror the Cyberwatch inventory in a local SQLite database"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from cbw_api_toolbox.cbw_parser import get_json_backend, parse_date, to_dict
+
+
+def _field(name):
+    """Return the function extracting a field from a record"""
+    return lambda record: getattr(record, name, None)
+
+
+def _os_key(record):
+    """Return the key of the OS of a server"""
+    os_record = getattr(record, 'os', None)
+    return getattr(os_record, 'key', None)
+
+
+# Mirrored collections: the field identifying their records and the columns indexed,
+# with the function extracting the value of each column from a record
+COLLECTIONS = {
+    'servers': ('id', {'hostname': _field('hostname'), 'status': _field('status'), 'os': _os_key,
+                       'category': _field('category')}),
+    'hosts': ('id', {'hostname': _field('hostname'), 'status': _field('status'), 'target': _field('target'),
+                     'node_id': _field('node_id'), 'server_id': _field('server_id')}),
+    'agents': ('id', {'node_id': _field('node_id'), 'server_id': _field('server_id')}),
+    'remote_accesses': ('id', {'address': _field('address'), 'node_id': _field('node_id'),
+                               'server_id': _field('server_id')}),
+    'groups': ('id', {'name': _field('name')}),
+    'nodes': ('id', {'name': _field('name')}),
+    'cve_announcements': ('cve_code', {'level': _field('level'), 'score': _field('score')}),
+}
+
+# Field holding the last modification date of the records of the collections synced incrementally.
+# The changes which do not update this field, e.g. a host moved to another server or a CVE announcement
+# of a node, are only seen by a full sync
+DELTA_FIELDS = {
+    'hosts': 'updated_at',
+    'nodes': 'updated_at',
+    'cve_announcements': 'updated_at',
+}
+
+# Collections without a modification date, listed in full by each sync of the changes
+RELISTED_COLLECTIONS = ('servers',)
+
+# Keys of the records added, changed and removed by the sync of a collection
+CBWDelta = namedtuple('CBWDelta', ['added', 'changed', 'removed'])
+
+
+def _newest(records, field, watermark=None):
+    """Return the most recent value of a date field among records and the watermark"""
+    newest, newest_date = watermark, parse_date(watermark)
+    for record in records:
+        value = getattr(record, field, None)
+        date = parse_date(value)
+        if date is not None and (newest_date is None or date > newest_date):
+            newest, newest_date = value, date
+    return newest
+
+
+class CBWMirror:
+    """Local copy of the Cyberwatch inventory kept in a SQLite database. `sync` downloads the
+    collections with a CBWApi client, `query` answers from the database with the same records
+    as CBWApi. Besides the columns of COLLECTIONS, the records can be filtered on the groups
+    (id or name) of the servers and on the cve_code of the CVE announcements of the records"""
+
+    def __init__(self, path, json_backend=None):
+        self.path = path
+        self.json_backend = get_json_backend(json_backend)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._connection:
+            self._create_tables()
+
+    def _create_tables(self):
+        """Create the tables and the indexes of the mirror"""
+        for collection, (_, columns) in COLLECTIONS.items():
+            self._connection.execute("CREATE TABLE IF NOT EXISTS {} (key PRIMARY KEY, data TEXT NOT NULL, {})".format(
+                collection, ", ".join(columns)))
+            for column in columns:
+                self._connection.execute("CREATE INDEX IF NOT EXISTS {0}_{1} ON {0} ({1})".format(collection, column))
+
+        self._connection.execute("CREATE TABLE IF NOT EXISTS record_groups "
+                                 "(collection TEXT, key, group_id INTEGER, group_name TEXT)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS record_groups_key ON record_groups (collection, key)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS record_groups_id ON record_groups (group_id)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS record_groups_name ON record_groups (group_name)")
+
+        self._connection.execute("CREATE TABLE IF NOT EXISTS record_cves (collection TEXT, key, cve_code TEXT)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS record_cves_key ON record_cves (collection, key)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS record_cves_code ON record_cves (cve_code)")
+
+        self._connection.execute("CREATE TABLE IF NOT EXISTS sync_state "
+                                 "(collection TEXT PRIMARY KEY, synced_at REAL, count INTEGER, watermark TEXT)")
+
+    def close(self):
+        """Close the database"""
+        self._connection.close()
+
+    def sync(self, client, collections=None, concurrency=None):
+        """Download the collections given, every collection by default, and replace their copy.
+        Return the number of records stored per collection, a collection which could not be
+        downloaded keeping its previous copy"""
+        counts = {}
+        for collection in collections or COLLECTIONS:
+            records = getattr(client, collection)(concurrency=concurrency)
+            if records is None:
+                logging.error("Failed to download the {}, the mirror keeps its previous copy".format(collection))
+                continue
+            self.store(collection, records, replace=True)
+            counts[collection] = len(records)
+        return counts
+
+    def store(self, collection, records, replace=False):
+        """Store records of a collection, e.g. the servers returned by servers_details to index their
+        CVE announcements. With replace, the records stored before are removed"""
+        records = list(records)
+        key_field, columns = COLLECTIONS[collection]
+        rows = []
+        links = []
+        cves = []
+        for record in records:
+            key = getattr(record, key_field)
+            rows.append([key, json.dumps(to_dict(record))] + [extract(record) for extract in columns.values()])
+            for group in getattr(record, 'groups', None) or []:
+                links.append((collection, key, group.id, group.name))
+            for cve in getattr(record, 'cve_announcements', None) or []:
+                cves.append((collection, key, cve.cve_code))
+
+        with self._lock, self._connection:
+            if replace:
+                self._connection.execute("DELETE FROM {}".format(collection))
+                self._connection.execute("DELETE FROM record_groups WHERE collection = ?", (collection,))
+                self._connection.execute("DELETE FROM record_cves WHERE collection = ?", (collection,))
+                self._set_state(collection, len(rows), _newest(records, DELTA_FIELDS.get(collection, '')))
+            else:
+                self._delete_links(collection, [row[0] for row in rows])
+
+            self._connection.executemany("INSERT OR REPLACE INTO {} VALUES ({})".format(
+                collection, ", ".join("?" * (len(columns) + 2))), rows)
+            self._connection.executemany("INSERT INTO record_groups VALUES (?, ?, ?, ?)", links)
+            self._connection.executemany("INSERT INTO record_cves VALUES (?, ?, ?)", cves)
+
+    def _set_state(self, collection, count, watermark):
+        """Record the sync of a collection, watermark being the date of its most recent change"""
+        self._connection.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                                 (collection, time.time(), count, watermark))
+
+    def delete(self, collection, keys):
+        """Remove records of a collection"""
+        keys = list(keys)
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM {} WHERE key = ?".format(collection), [(key,) for key in keys])
+            self._delete_links(collection, keys)
+
+    def _delete_links(self, collection, keys):
+        """Remove the groups and CVE announcements of records"""
+        values = [(collection, key) for key in keys]
+        self._connection.executemany("DELETE FROM record_groups WHERE collection = ? AND key = ?", values)
+        self._connection.executemany("DELETE FROM record_cves WHERE collection = ? AND key = ?", values)
+
+    def query(self, collection, where=None, params=(), group=None, cve_code=None, **filters):
+        """Return the records of a collection matching the filters, in the order of their key.
+        Each filter is an indexed column of the collection and a value, or a list of values.
+        group is the id or the name of a group, cve_code the code of a CVE announcement.
+        where is an additional SQL condition on the indexed columns, e.g. "os LIKE 'debian%'",
+        whose values are given in params"""
+        _, columns = COLLECTIONS[collection]
+        conditions = []
+        values = []
+
+        for column, value in filters.items():
+            if column not in columns:
+                raise ValueError("{} can not be filtered on {}, expected one of {}".format(
+                    collection, column, ", ".join(columns)))
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                conditions.append("{} IN ({})".format(column, ", ".join("?" * len(value))))
+                values.extend(value)
+            else:
+                conditions.append("{} = ?".format(column))
+                values.append(value)
+
+        if group is not None:
+            conditions.append("key IN (SELECT key FROM record_groups WHERE collection = ? AND {} = ?)".format(
+                "group_id" if isinstance(group, int) else "group_name"))
+            values.extend([collection, group])
+
+        if cve_code is not None:
+            conditions.append("key IN (SELECT key FROM record_cves WHERE collection = ? AND cve_code = ?)")
+            values.extend([collection, cve_code])
+
+        if where is not None:
+            conditions.append("({})".format(where))
+            values.extend(params)
+
+        query = "SELECT data FROM {}".format(collection)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY key"
+
+        with self._lock:
+            rows = self._connection.execute(query, values).fetchall()
+        return self.json_backend.loads("[{}]".format(",".join(row[0] for row in rows)))
+
+    def get(self, collection, key):
+        """Return the record of a collection with the given key, None if it is not mirrored"""
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM {} WHERE key = ?".format(collection), (key,)).fetchone()
+        return self.json_backend.loads(row[0]) if row is not None else None
+
+    def synced_at(self, collection):
+        """Return the timestamp of the last sync of a collection, None if it was never synced"""
+        with self._lock:
+            row = self._connection.execute("SELECT synced_at FROM sync_state WHERE collection = ?",
+                                           (collection,)).fetchone()
+        return row[0] if row is not None else None
+
+    def watermark(self, collection):
+        """Return the date of the most recent change synced for a collection, None if it was never synced"""
+        with self._lock:
+            row = self._connection.execute("SELECT watermark FROM sync_state WHERE collection = ?",
+                                           (collection,)).fetchone()
+        return row[0] if row is not None else None
+
+    def count(self, collection):
+        """Return the number of records of a collection in the mirror"""
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM {}".format(collection)).fetchone()[0]
+
+    def keys(self, collection):
+        """Return the keys of the records of a collection in the mirror"""
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT key FROM {}".format(collection))]
+
+    def sync_changes(self, client, collections=None, per_page=100, concurrency=None):
+        """Apply the changes made since the last sync of the collections given, the servers and every
+        collection of DELTA_FIELDS by default, and return a CBWDelta per collection synced.
+        The records changed since the watermark of a collection are requested newest first, the crawl
+        stopping after the first page reaching older records. When the number of records of the API then
+        differs from the mirror's, the collection is listed again to find the deleted keys. The servers,
+        whose last_communication does not change with their status, groups or OS, and the collections
+        never synced are listed in full, with `concurrency` parallel requests"""
+        deltas = {}
+        for collection in collections or RELISTED_COLLECTIONS + tuple(DELTA_FIELDS):
+            delta = self._sync_changes(client, collection, per_page, concurrency)
+            if delta is not None:
+                deltas[collection] = delta
+        return deltas
+
+    def _sync_changes(self, client, collection, per_page, concurrency):
+        """Apply the changes of one collection, None if they could not be downloaded"""
+        field = DELTA_FIELDS.get(collection)
+        watermark = self.watermark(collection)
+        if field is None or watermark is None:
+            relisted = self._relist(client, collection, concurrency)
+            if relisted is None:
+                return None
+            records, delta = relisted
+            count = self.count(collection)
+            with self._lock, self._connection:
+                self._set_state(collection, count, _newest(records, field) if field is not None else None)
+            return delta
+
+        records = self._changed_records(client, collection, field, parse_date(watermark), per_page)
+        if records is None:
+            logging.error("Failed to download the changes of the {}".format(collection))
+            return None
+        added, changed = self._upsert(collection, records)
+        removed = []
+
+        if client.count(collection) != self.count(collection):
+            relisted = self._relist(client, collection, concurrency)
+            if relisted is None:
+                return CBWDelta(added, changed, removed)
+            # the records missed by the crawl of the changes are stored as well
+            all_records, delta = relisted
+            added.extend(delta.added)
+            changed.extend(delta.changed)
+            removed = delta.removed
+            records.extend(all_records)
+
+        count = self.count(collection)
+        with self._lock, self._connection:
+            self._set_state(collection, count, _newest(records, field, watermark))
+        return CBWDelta(added, changed, removed)
+
+    def _relist(self, client, collection, concurrency):
+        """List a collection in full, store the records which differ from their copy and remove the
+        records the API no longer returns. Return the records and their CBWDelta, None if they could not
+        be downloaded, the mirror being left as it was"""
+        records = getattr(client, collection)(concurrency=concurrency)
+        if records is None:
+            logging.error("Failed to download the {}, the mirror keeps its previous copy".format(collection))
+            return None
+        added, changed = self._upsert(collection, records)
+        keys = set(getattr(record, COLLECTIONS[collection][0]) for record in records)
+        removed = [key for key in self.keys(collection) if key not in keys]
+        self.delete(collection, removed)
+        return records, CBWDelta(added, changed, removed)
+
+    @staticmethod
+    def _changed_records(client, collection, field, since, per_page):
+        """Return the records changed since a date, None if a page could not be fetched.
+        The pages are requested newest first and the crawl stops after the first page holding older
+        records, unless the records seen so far show that the API did not sort them"""
+        records = []
+        previous = None
+        ordered = True
+        page = 1
+        while True:
+            batch = getattr(client, collection)({'page': str(page), 'per_page': per_page,
+                                                 'sort_by': field, 'order': 'desc'})
+            if batch is None:
+                return None
+
+            older = False
+            for record in batch:
+                date = parse_date(getattr(record, field, None))
+                if date is None:
+                    records.append(record)
+                    continue
+                if previous is not None and date > previous:
+                    ordered = False
+                previous = date
+                if date >= since:
+                    records.append(record)
+                else:
+                    older = True
+
+            if len(batch) < per_page or (older and ordered):
+                return records
+            page += 1
+
+    def _upsert(self, collection, records):
+        """Store the records which are new or differ from their copy, return the keys of the records
+        added and of the records changed"""
+        key_field = COLLECTIONS[collection][0]
+        stored = {}
+        keys = [getattr(record, key_field) for record in records]
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                stored.update(self._connection.execute("SELECT key, data FROM {} WHERE key IN ({})".format(
+                    collection, ", ".join("?" * len(chunk))), chunk).fetchall())
+
+        added = []
+        changed = []
+        updated = []
+        for key, record in zip(keys, records):
+            data = stored.get(key)
+            if data is not None and json.loads(data) == to_dict(record):
+                continue
+            (changed if data is not None else added).append(key)
+            updated.append(record)
+            stored[key] = json.dumps(to_dict(record))
+
+        self.store(collection, updated)
+        return added, changed
@@ -0,0 +1,150 @@
+"""Module used to build the objects returned by the CBW API"""
+
+import datetime
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+RECORD_TYPE_NAME = 'cbw_object'
+
+JSON_BACKENDS = ('json', 'orjson', 'msgspec', 'ujson')
+
+# Some backends decode the integers over 64 bits as floats
+INT64_LIMIT = float(2 ** 63)
+
+
+class CBWRecordTypes:
+    """Bounded registry of the record classes, the JSON objects having the same field names
+    sharing a single namedtuple class instead of compiling a new one for each object"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._types = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._types)
+
+    def get(self, fields):
+        """Return the record class for a tuple of field names, the least recently used class
+        being evicted once the registry is full"""
+        with self._lock:
+            record_type = self._types.get(fields)
+            if record_type is not None:
+                self._types.move_to_end(fields)
+                return record_type
+
+        record_type = namedtuple(RECORD_TYPE_NAME, fields)
+
+        with self._lock:
+            self._types[fields] = record_type
+            if len(self._types) > self.maxsize:
+                self._types.popitem(last=False)
+        return record_type
+
+    def object_hook(self, dictionary):
+        """json object_hook building a record from a decoded JSON object"""
+        return self.get(tuple(dictionary))(*dictionary.values())
+
+
+RECORD_TYPES = CBWRecordTypes()
+
+
+def _to_records(value, object_hook):
+    """Convert in place the dicts of a decoded JSON document into records, innermost objects
+    first like the json object_hook"""
+    value_type = type(value)
+    if value_type is dict:
+        items = value.items()
+    elif value_type is list:
+        items = enumerate(value)
+    else:
+        return value
+
+    for key, item in items:
+        item_type = type(item)
+        if item_type is dict or item_type is list:
+            value[key] = _to_records(item, object_hook)
+        elif item_type is float and item.is_integer() and abs(item) >= INT64_LIMIT:
+            raise ValueError("Integer possibly decoded as a float")
+
+    return object_hook(value) if value_type is dict else value
+
+
+def to_dict(value):
+    """Convert a record, and the records nested in it, back into the dicts of the JSON document"""
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return {field: to_dict(item) for field, item in zip(value._fields, value)}
+    if isinstance(value, list):
+        return [to_dict(item) for item in value]
+    return value
+
+
+def parse_date(value):
+    """Parse a date of the API, e.g. 2020-07-28T15:02:08.000+02:00, None if it is not a date"""
+    if not isinstance(value, str):
+        return None
+    if value.endswith('Z'):
+        value = value[:-1] + '+0000'
+    elif len(value) > 6 and value[-3] == ':' and value[-6] in '+-':
+        value = value[:-3] + value[-2:]
+
+    for date_format in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z'):
+        try:
+            return datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def _import_decoder(name):
+    """Return the function decoding JSON bytes of an optional backend"""
+    # pylint: disable=import-outside-toplevel,import-error,no-member
+    if name == 'orjson':
+        import orjson
+        return orjson.loads
+    if name == 'msgspec':
+        import msgspec
+        return msgspec.json.Decoder().decode
+    import ujson
+    return ujson.loads
+
+
+class CBWJsonBackend:
+    """Decoder turning the raw UTF-8 bytes of a response body into records"""
+
+    def __init__(self, name, decode=None, record_types=RECORD_TYPES):
+        self.name = name
+        self.record_types = record_types
+        self._decode = decode
+
+    def __repr__(self):
+        return "CBWJsonBackend({})".format(self.name)
+
+    def loads(self, content):
+        """Parse a response body, falling back to the json module for the documents the optional
+        backend refuses or may have altered (integers over 64 bits) so that every backend returns
+        the same objects"""
+        if self._decode is not None:
+            try:
+                return _to_records(self._decode(content), self.record_types.object_hook)
+            except ValueError:
+                pass
+
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return json.loads(content, object_hook=self.record_types.object_hook)
+
+
+def get_json_backend(name=None):
+    """Return the JSON backend called `name` ('json', 'orjson', 'msgspec' or 'ujson'), the json
+    module being used when `name` is None. Raise ImportError if the backend is not installed"""
+    if name is None:
+        name = 'json'
+
+    if name not in JSON_BACKENDS:
+        raise ValueError("Unknown JSON backend {}, expected one of {}".format(name, ', '.join(JSON_BACKENDS)))
+
+    if name == 'json':
+        return CBWJsonBackend(name)
+    return CBWJsonBackend(name, _import_decoder(name))
@@ -0,0 +1,123 @@
+"""Module used to limit the rate of the requests sent to the CBW API"""
+
+import contextlib
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class CBWRateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts of `burst` requests, and at most
+    `max_in_flight` requests at the same time. Both limits are optional.
+
+    One instance is shared by the threads using it. When `path` is given, the bucket and the
+    in-flight slots are kept in files locked with fcntl next to `path`, so that every limiter
+    created with the same path, in any process of the host, shares the same limits"""
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None, path=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate or 1)
+        self.max_in_flight = max_in_flight
+        self.path = path
+
+        if path is not None and fcntl is None:
+            raise ValueError("Sharing a rate limiter between processes requires fcntl")
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight and path is None else None
+
+    @contextlib.contextmanager
+    def limit(self):
+        """Context manager wrapping one request"""
+        self.wait_for_token()
+        slot = self.acquire_slot()
+        try:
+            yield
+        finally:
+            self.release_slot(slot)
+
+    def wait_for_token(self):
+        """Block until the bucket holds a token and take it"""
+        if not self.rate:
+            return
+
+        while True:
+            if self.path is None:
+                with self._lock:
+                    delay = self._take_token(time.monotonic())
+            else:
+                delay = self._take_shared_token()
+
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _take_token(self, now):
+        """Refill the bucket then take a token, return the delay before a token is available if empty"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def _take_shared_token(self):
+        """Same as _take_token with the bucket stored in a file shared between processes"""
+        with open(self.path + ".bucket", "a+") as bucket:
+            fcntl.flock(bucket, fcntl.LOCK_EX)
+            try:
+                bucket.seek(0)
+                state = bucket.read().split()
+                now = time.time()
+                if len(state) == 2:
+                    self._tokens, self._updated_at = float(state[0]), float(state[1])
+                else:
+                    self._tokens, self._updated_at = self.burst, now
+
+                delay = self._take_token(now)
+
+                bucket.seek(0)
+                bucket.truncate()
+                bucket.write("{!r} {!r}".format(self._tokens, self._updated_at))
+                bucket.flush()
+            finally:
+                fcntl.flock(bucket, fcntl.LOCK_UN)
+        return delay
+
+    def acquire_slot(self):
+        """Block until less than max_in_flight requests are in flight, return the slot taken"""
+        if not self.max_in_flight:
+            return None
+
+        if self.path is None:
+            self._in_flight.acquire()  # pylint: disable=consider-using-with
+            return None
+
+        while True:
+            for index in range(self.max_in_flight):
+                slot = os.open("{}.slot{}".format(self.path, index), os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return slot
+                except OSError:
+                    os.close(slot)
+            time.sleep(0.005)
+
+    def release_slot(self, slot):
+        """Release a slot taken by acquire_slot"""
+        if not self.max_in_flight:
+            return
+
+        if slot is None:
+            self._in_flight.release()
+            return
+
+        fcntl.flock(slot, fcntl.LOCK_UN)
+        os.close(slot)
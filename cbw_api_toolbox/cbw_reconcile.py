@@ -0,0 +1,96 @@
+"""Module used to bring the groups of the servers to the membership declared by a rule"""
+
+from collections import namedtuple
+
+from cbw_api_toolbox.cbw_bulk import CBWBulkReport, iter_bulk
+
+# Server whose groups must change, current and desired being sorted tuples of group ids
+CBWGroupChange = namedtuple('CBWGroupChange', ['server', 'current', 'desired'])
+
+
+class CBWGroupPlan:
+    """Changes needed to bring the servers to their desired groups, the servers already in them excluded"""
+
+    def __init__(self, changes, unchanged):
+        self.changes = list(changes)
+        self.unchanged = unchanged
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def apply(self, client, workers=5, progress=None):
+        """Update the groups of the servers with one PATCH per change and at most `workers` requests in flight,
+        the client's write_limiter limiting their rate. progress is called with (completed, total, CBWBulkResult)
+        after each update. Return a CBWBulkReport whose items are the changes"""
+        report = CBWBulkReport(self.changes)
+        updates = iter_bulk(lambda change: client.update_server(str(change.server.id),
+                                                                {'groups': list(change.desired) or [None]}),
+                            self.changes, workers)
+        for completed, bulk_result in enumerate(updates, 1):
+            report.add(bulk_result)
+            if progress is not None:
+                progress(completed, len(self.changes), bulk_result)
+        return report
+
+    def summary(self, report=None):
+        """Return the number of servers unchanged, updated and failed, the changes counting as updated
+        when the plan was not applied"""
+        if report is None:
+            return {"unchanged": self.unchanged, "updated": len(self.changes), "failed": 0}
+        return {"unchanged": self.unchanged, "updated": len(report.succeeded), "failed": len(report.failed)}
+
+
+class CBWGroupReconciler:
+    """Compare the groups of the servers with those a rule declares for them, e.g. a group per OS type.
+    rule(server) returns the ids of the groups the server must be in, or None to leave the server as it is.
+    The groups returned by the rule for any server are the managed ones: a server leaves the managed groups
+    its rule does not return and, unless exclusive is set, stays in the other groups"""
+
+    def __init__(self, rule, managed=None, exclusive=False):
+        self.rule = rule
+        self.managed = set(managed) if managed is not None else None
+        self.exclusive = exclusive
+
+    def plan(self, servers):
+        """Return the CBWGroupPlan of servers listed with their groups, e.g. the results of CBWApi.servers.
+        Without managed groups, only the groups the rule returns for at least one of these servers are managed:
+        a server stays in a group the rule no longer returns for any server"""
+        wanted = []
+        managed = set()
+        for server in servers:
+            groups = self.rule(server)
+            if groups is not None:
+                groups = frozenset(groups)
+                managed |= groups
+            wanted.append((server, groups))
+        if self.managed is not None:
+            managed = self.managed
+
+        changes = []
+        unchanged = 0
+        for server, groups in wanted:
+            current = frozenset(group.id for group in server.groups or [])
+            if groups is None:
+                desired = current
+            elif self.exclusive:
+                desired = groups
+            else:
+                desired = (current - managed) | groups
+
+            if desired == current:
+                unchanged += 1
+            else:
+                changes.append(CBWGroupChange(server, tuple(sorted(current)), tuple(sorted(desired))))
+        return CBWGroupPlan(changes, unchanged)
+
+    def reconcile(self, client, workers=5, progress=None):
+        """Plan the changes of the servers listed in one crawl and apply them.
+        Return the plan and the CBWBulkReport of its application, None for both if the servers could not be listed"""
+        servers = client.servers()
+        if servers is None:
+            return None, None
+        plan = self.plan(servers)
+        return plan, plan.apply(client, workers, progress)
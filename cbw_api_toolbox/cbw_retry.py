@@ -0,0 +1,78 @@
+"""Module used to retry the API requests which failed because of a transient error"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class CBWRetryBudget:
+    """Number of retries shared by all the requests of a crawl, safe to use from several threads"""
+
+    def __init__(self, total):
+        self.total = total
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self):
+        """Take one retry from the budget, return False once the budget is exhausted"""
+        with self._lock:
+            if self.total is not None and self.used >= self.total:
+                return False
+            self.used += 1
+            return True
+
+
+class CBWRetryPolicy:
+    """Retry policy of the API requests: exponential backoff with jitter, honoring the Retry-After
+    header, applied to idempotent methods only.
+    max_retries is the number of retries of one request, max_crawl_retries the number of retries
+    shared by all the pages of a crawl (None for no limit)"""
+
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+    RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+    def __init__(self, max_retries=3, max_crawl_retries=50, backoff_factor=0.5, backoff_max=60, jitter=0.5,
+                 retry_after_max=300, methods=IDEMPOTENT_METHODS, statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.max_crawl_retries = max_crawl_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_after_max = retry_after_max
+        self.methods = frozenset(method.upper() for method in methods)
+        self.statuses = frozenset(statuses)
+
+    def crawl_budget(self):
+        """Return the budget shared by the requests of a crawl"""
+        return CBWRetryBudget(self.max_crawl_retries)
+
+    def can_retry(self, verb, attempt, budget=None):
+        """Check if the request can be sent again after its attempt number `attempt` (0 for the first one)"""
+        if verb.upper() not in self.methods or attempt >= self.max_retries:
+            return False
+        return budget is None or budget.consume()
+
+    def delay(self, attempt, response=None):
+        """Return the number of seconds to wait before the retry following the attempt number `attempt`"""
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return retry_after
+
+        backoff = min(self.backoff_max, self.backoff_factor * 2 ** attempt)
+        return backoff + random.uniform(0, backoff * self.jitter)
+
+    def retry_after(self, response):
+        """Return the delay in seconds requested by the Retry-After header of a response, None if absent"""
+        if response is None or 'Retry-After' not in response.headers:
+            return None
+
+        value = response.headers['Retry-After'].strip()
+        if value.isdigit():
+            seconds = int(value)
+        else:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError, IndexError):
+                return None
+        return min(max(seconds, 0), self.retry_after_max)
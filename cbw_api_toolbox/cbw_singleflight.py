@@ -0,0 +1,57 @@
+"""Module used to share one call between the threads making the same call at the same time"""
+
+import threading
+
+
+class _CBWCall:
+    """Call in flight, the threads waiting for it are woken up once it completes"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CBWSingleFlight:
+    """Run at most one call per key at a time: the threads asking for a key whose call is in flight
+    wait for it and receive the same result, or the same exception"""
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args):
+        """Call function(*args) unless a call for key is in flight, and return the result of the call"""
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = self._in_flight[key] = _CBWCall()
+                self.calls += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Return the number of calls made and of calls shared with a call in flight"""
+        return {"calls": self.calls, "shared": self.shared}
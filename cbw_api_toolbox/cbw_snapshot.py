@@ -0,0 +1,101 @@
+"""Module used to take snapshots of the servers and to find what changed between two snapshots"""
+
+import json
+import logging
+import time
+from collections import namedtuple
+
+from cbw_api_toolbox.cbw_api import CBWPageError
+
+# State of a server kept in a snapshot
+CBWServerState = namedtuple('CBWServerState', ['status', 'last_communication', 'cve_announcements_count'])
+
+
+class CBWSnapshotDiff:
+    """Differences between two snapshots, as sets of server ids: added and removed servers,
+    and servers whose state changed"""
+
+    def __init__(self, before, after):
+        self.before = before
+        self.after = after
+        self.added = after.ids() - before.ids()
+        self.removed = before.ids() - after.ids()
+        self.changed = {server_id for server_id, state in after.states.items()
+                        if server_id in before.states and before.states[server_id] != state}
+
+    def entered(self, status):
+        """Return the ids of the servers having a status which did not have it, new servers included"""
+        return self.after.with_status(status) - self.before.with_status(status)
+
+    def left(self, status):
+        """Return the ids of the servers which had a status and have another one, removed servers excluded"""
+        return self.before.with_status(status) - self.after.with_status(status) - self.removed
+
+
+class CBWSnapshot:
+    """Compact state of the servers at a point in time, by server id"""
+
+    def __init__(self, states=None, taken_at=None):
+        self.states = states if states is not None else {}
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self._statuses = None
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, server_id):
+        return server_id in self.states
+
+    def get(self, server_id):
+        """Return the CBWServerState of a server, None if it is not in the snapshot"""
+        return self.states.get(server_id)
+
+    @classmethod
+    def from_servers(cls, servers, taken_at=None):
+        """Take the snapshot of servers, e.g. the results of CBWApi.iter_servers"""
+        return cls({server.id: CBWServerState(server.status, getattr(server, 'last_communication', None),
+                                              getattr(server, 'cve_announcements_count', None))
+                    for server in servers}, taken_at)
+
+    @classmethod
+    def from_client(cls, client, params=None):
+        """Take the snapshot of the servers listed by a client, crawling them once.
+        Return None if the listing did not complete, so that a partial snapshot never makes the missing
+        servers look removed"""
+        try:
+            return cls.from_servers(client.iter_servers(params))
+        except CBWPageError as error:
+            logging.error("Error::{}".format(error))
+            return None
+
+    def ids(self):
+        """Return the set of the server ids"""
+        return self.states.keys()
+
+    def with_status(self, status):
+        """Return the set of the ids of the servers having a status"""
+        if self._statuses is None:
+            self._statuses = {}
+            for server_id, state in self.states.items():
+                self._statuses.setdefault(state.status, set()).add(server_id)
+        return self._statuses.get(status, set())
+
+    def diff(self, after):
+        """Return the CBWSnapshotDiff from this snapshot to a later one"""
+        return CBWSnapshotDiff(self, after)
+
+    def save(self, path):
+        """Write the snapshot to a file"""
+        with open(path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump({
+                'taken_at': self.taken_at,
+                'servers': {str(server_id): list(state) for server_id, state in self.states.items()},
+            }, snapshot_file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by save"""
+        with open(path, encoding='utf-8') as snapshot_file:
+            content = json.load(snapshot_file)
+        return cls({int(server_id): CBWServerState(*state) for server_id, state in content['servers'].items()},
+                   content['taken_at'])
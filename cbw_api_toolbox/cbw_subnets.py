@@ -0,0 +1,109 @@
+"""Module used to match IPv4 and IPv6 addresses, such as the targets of the hosts, with subnets"""
+
+import ipaddress
+from bisect import bisect_right
+from operator import attrgetter
+
+_BITS = {4: 32, 6: 128}
+_NETWORKS = {4: ipaddress.IPv4Network, 6: ipaddress.IPv6Network}
+
+
+def parse_address(address):
+    """Return (version, integer) of an IP address, None for a hostname or an invalid address"""
+    try:
+        address = ipaddress.ip_address(address.strip())
+    except (AttributeError, ValueError):
+        return None
+    return address.version, int(address)
+
+
+class CBWSubnetIndex:
+    """Subnets split into sorted integer ranges, each range knowing the subnets covering it, so that an address
+    is matched with a binary search whatever the number of subnets. Subnets may overlap"""
+
+    def __init__(self, subnets=()):
+        self.subnets = []
+        self._ranges = None
+        for subnet in subnets:
+            self.add(subnet)
+
+    def __len__(self):
+        return len(self.subnets)
+
+    def __contains__(self, address):
+        return bool(self.lookup(address))
+
+    def add(self, subnet):
+        """Add a subnet, e.g. '10.10.0.0/24', and return it as an ip_network. Raise ValueError if it is invalid"""
+        network = ipaddress.ip_network(subnet, strict=False)
+        self.subnets.append(network)
+        self._ranges = None
+        return network
+
+    def _build(self):
+        """Split the subnets of each IP version into ranges starting at a subnet boundary, in one sweep over
+        the sorted boundaries. Subnets being either nested or disjoint, the subnets covering the current range
+        form a stack, from the least to the most specific"""
+        self._ranges = {}
+        for version in _BITS:
+            networks = sorted(((int(network.network_address), int(network.broadcast_address), network)
+                               for network in self.subnets if network.version == version),
+                              key=lambda entry: (entry[0], -entry[1]))
+            starts = sorted({first for first, _, _ in networks} | {last + 1 for _, last, _ in networks})
+            covering = []
+            stack = []
+            position = 0
+            for start in starts:
+                while stack and stack[-1][1] < start:
+                    stack.pop()
+                while position < len(networks) and networks[position][0] == start:
+                    stack.append(networks[position])
+                    position += 1
+                covering.append(tuple(network for _, _, network in reversed(stack)))
+            self._ranges[version] = (starts, covering)
+
+    def lookup(self, address):
+        """Return the subnets containing an address, the most specific first, empty for a hostname"""
+        parsed = parse_address(address)
+        if parsed is None:
+            return ()
+        if self._ranges is None:
+            self._build()
+
+        starts, covering = self._ranges[parsed[0]]
+        position = bisect_right(starts, parsed[1]) - 1
+        return covering[position] if position >= 0 else ()
+
+    def select(self, items, key=attrgetter('target')):
+        """Yield the items whose address, key(item), is in a subnet, e.g. the hosts of CBWApi.iter_hosts"""
+        for item in items:
+            if self.lookup(key(item)):
+                yield item
+
+    def group(self, items, key=attrgetter('target')):
+        """Return the items whose address is in a subnet by the most specific subnet containing it"""
+        groups = {}
+        for item in items:
+            subnets = self.lookup(key(item))
+            if subnets:
+                groups.setdefault(subnets[0], []).append(item)
+        return groups
+
+
+def subnets_by_node(hosts, prefixlen=24, ipv6_prefixlen=64):
+    """Return the subnets of `prefixlen` bits (`ipv6_prefixlen` for IPv6) of the targets of the hosts,
+    by node_id, in one pass over the hosts. Hosts whose target is a hostname are skipped"""
+    buckets = {}
+    nodes = {}
+    for host in hosts:
+        parsed = parse_address(host.target)
+        if parsed is None:
+            continue
+        version, value = parsed
+        length = prefixlen if version == 4 else ipv6_prefixlen
+        key = (version, value >> (_BITS[version] - length))
+        network = buckets.get(key)
+        if network is None:
+            network = buckets[key] = _NETWORKS[version]((key[1] << (_BITS[version] - length), length))
+        nodes.setdefault(host.node_id, set()).add(network)
+    return nodes
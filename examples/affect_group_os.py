@@ -3,11 +3,14 @@
 import os
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_ratelimit import CBWRateLimiter
+from cbw_api_toolbox.cbw_reconcile import CBWGroupReconciler
 
 CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
 CLIENT = CBWApi(CONF.get('cyberwatch', 'url'), CONF.get(
-    'cyberwatch', 'api_key'), CONF.get('cyberwatch', 'secret_key'))
+    'cyberwatch', 'api_key'), CONF.get('cyberwatch', 'secret_key'),
+                write_limiter=CBWRateLimiter(rate=5, max_in_flight=5))
 
 LINUX_OS = ['Amazon', 'ArchLinux', 'Centos', 'Debian', 'Manjaro', 'Oracle', 'Ubuntu', 'Redhat', 'Suse']
 WINDOWS_OS = ['Windows']
@@ -19,24 +22,24 @@ WINDOWS_GROUP_ID = ''
 OTHER_GROUP_ID = ''
 
 
-def build_groups_list(server_id, system_os):
-    """Create list with system_os + other groups of server"""
-    server = CLIENT.server(str(server_id))
-    server_groups = [system_os]
-    if server.groups:
-        for group in server.groups:
-            server_groups.append(group.name)
-    return server_groups
-
-for server_item in CLIENT.servers():
-    if server_item.os is not None:
-        if server_item.os.type[4:] in LINUX_OS:
-            GROUP_ID = LINUX_GROUP_ID
-        elif server_item.os.type[4:] in WINDOWS_OS:
-            GROUP_ID = WINDOWS_GROUP_ID
-        elif server_item.os.type[4:] in MAC_OS:
-            GROUP_ID = MAC_GROUP_ID
-        else:
-            GROUP_ID = OTHER_GROUP_ID
-
-    CLIENT.update_server(str(server_item.id), {'groups': [GROUP_ID]})
+def os_group(server):
+    """Return the group of the OS of a server, None to leave a server without OS as it is"""
+    if server.os is None:
+        return None
+    if server.os.type[4:] in LINUX_OS:
+        return [int(LINUX_GROUP_ID)]
+    if server.os.type[4:] in WINDOWS_OS:
+        return [int(WINDOWS_GROUP_ID)]
+    if server.os.type[4:] in MAC_OS:
+        return [int(MAC_GROUP_ID)]
+    return [int(OTHER_GROUP_ID)]
+
+
+# Only the servers out of the group of their OS are updated, their other groups being kept. The OS groups
+# are all managed, so that a server leaves an OS group no other server is mapped to
+OS_GROUP_IDS = [int(LINUX_GROUP_ID), int(WINDOWS_GROUP_ID), int(MAC_GROUP_ID), int(OTHER_GROUP_ID)]
+PLAN, REPORT = CBWGroupReconciler(os_group, managed=OS_GROUP_IDS).reconcile(CLIENT, workers=5)
+if PLAN is not None:
+    for change, error in REPORT.failed:
+        print("Failed to update server {}: {}".format(change.server.id, error))
+    print(PLAN.summary(REPORT))
@@ -20,6 +20,7 @@ from configparser import ConfigParser
 from libcloud.compute.types import Provider
 from libcloud.compute.providers import get_driver
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_join import anti_join
 
 SSH_KEY_SERVERS = open(os.path.expanduser('id_rsa')).read()
 SERVER_LOGIN = ""
@@ -113,25 +114,24 @@ def port_checker(ip, port):
 def check_add_server(servers, cloud_servers, node_id):
     '''Find cloud servers not monitored in Cyberwatch to import'''
     to_add = []
-    for cloud_server in cloud_servers:
+    for cloud_server in anti_join(cloud_servers, servers, lambda cloud_server: cloud_server.public_ips[0], 'address'):
         cloud_server_ip = cloud_server.public_ips[0]
-        if not any(server.address == cloud_server_ip for server in servers):
-            info = {}
-            # Add server information
-            info.update({"login": SERVER_LOGIN, "address": cloud_server_ip,
-                         "node_id": node_id, "server_groups": cloud_server.extra['server_groups']})
-            # Check port and add connection type
-            if port_checker(cloud_server_ip, 5985):
-                info.update({"type": "CbwRam::RemoteAccess::WinRm::WithNegotiate",
-                             "port": 5985})
-                info.update({"password": WINRM_PASSWORD_SERVERS})
-                to_add.append(info)
-            elif port_checker(cloud_server_ip, 22):
-                info.update({"type": "CbwRam::RemoteAccess::Ssh::WithKey", "port": 22,
-                             "key": SSH_KEY_SERVERS})
-                to_add.append(info)
-            else:
-                print('The server ' + cloud_server_ip + ' has no default port exposed (SSH/22 or WINRM/5985) so an agentless connection with Cyberwatch is not possible')
+        info = {}
+        # Add server information
+        info.update({"login": SERVER_LOGIN, "address": cloud_server_ip,
+                     "node_id": node_id, "server_groups": cloud_server.extra['server_groups']})
+        # Check port and add connection type
+        if port_checker(cloud_server_ip, 5985):
+            info.update({"type": "CbwRam::RemoteAccess::WinRm::WithNegotiate",
+                         "port": 5985})
+            info.update({"password": WINRM_PASSWORD_SERVERS})
+            to_add.append(info)
+        elif port_checker(cloud_server_ip, 22):
+            info.update({"type": "CbwRam::RemoteAccess::Ssh::WithKey", "port": 22,
+                         "key": SSH_KEY_SERVERS})
+            to_add.append(info)
+        else:
+            print('The server ' + cloud_server_ip + ' has no default port exposed (SSH/22 or WINRM/5985) so an agentless connection with Cyberwatch is not possible')
     return to_add
 
 
@@ -139,11 +139,10 @@ def check_delete_server(cloud_servers):
     '''Find not imported cloud servers to delete'''
     to_delete = []
     servers = API.servers()
-    for server in servers:
-        if not any(cloud_server.public_ips[0] == server.remote_ip for cloud_server in cloud_servers):
-            for group in server.groups:
-                if group.name == "cloud_crawling":
-                    to_delete.append(server)
+    for server in anti_join(servers, cloud_servers, 'remote_ip', lambda cloud_server: cloud_server.public_ips[0]):
+        for group in server.groups:
+            if group.name == "cloud_crawling":
+                to_delete.append(server)
     return to_delete
 
 
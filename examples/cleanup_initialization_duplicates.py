@@ -1,14 +1,13 @@
-"""Script used to delete duplicates and computers in initialization
-To use the script, please install python-dateutil : pip3 install python-dateutil"""
+"""Script used to delete duplicates and computers in initialization"""
 
 import argparse
 import sys
 import os
 
 from configparser import ConfigParser
-from datetime import datetime
-from dateutil.relativedelta import relativedelta  # pylint: disable=import-error
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_cleanup import DUPLICATE, STALE_AGENT, STALE_AGENTLESS, CBWServerCleanup
+from cbw_api_toolbox.cbw_journal import CBWJournal
 
 def connect_api():
     '''Connect ot the API'''
@@ -21,125 +20,54 @@ def connect_api():
     API.ping()
 
 
-def find_duplicates(servers):
-    '''Find duplicated servers'''
-    duplicate = servers[0]
-    duplicates = []
-
-    for server in sorted(servers, key=lambda x: (x.hostname is None, x.hostname)):
-        if server.hostname == duplicate.hostname and server.hostname is not None:
-            if server.last_communication is None or duplicate.last_communication > server.last_communication:
-                duplicates.append(server)
-            else:
-                duplicates.append(duplicate)
-                duplicate = server
-        else:
-            duplicate = server
-
-    return duplicates
-
-
-def find_agents(servers, when):
-    '''Find server with agent in initialization status.'''
-    agents = []
-
-    agents_date = (datetime.today() - relativedelta(months=+when))
-    for server in sorted(servers, key=lambda x: (x.hostname is None, x.hostname)):
-        if server.created_at is not None and server.created_at != '':
-            if server.status.lower() == 'server_update_init' \
-                    and datetime.strptime(server.created_at[:10], '%Y-%m-%d') < agents_date:
-                agents.append(server)
-        else:
-            print('created_at is None for {} -- {}'.format(server.id, server.hostname))
-
-    return agents
-
-
-def find_agentless(servers, when):
-    '''Find agentless server in initialization status.'''
-    agentless = []
-
-    agentless_date = (datetime.today() - relativedelta(months=+when))
-    for server in sorted(servers, key=lambda x: (x.hostname is None, x.hostname)):
-        if server.created_at is not None and server.created_at != '':
-            if server.status.lower() == 'server_update_init' \
-                    and datetime.strptime(server.created_at[:10], '%Y-%m-%d') < agentless_date:
-                agentless.append(server)
-        else:
-            print('created_at is None for {} -- {}'.format(server.id, server.hostname))
-
-    return agentless
-
-def find_all(servers, agents_time, agentless_time):
-    '''Find all servers'''
-    duplicate = servers[0]
-    duplicates = []
-    agentless = []
-    agents = []
-
-    for server in sorted(servers, key=lambda x: (x.hostname is None, x.hostname)):
-        # Find duplicates
-        if server.hostname == duplicate.hostname and server.hostname is not None:
-            if server.last_communication is None or duplicate.last_communication > server.last_communication:
-                duplicates.append(server)
-            else:
-                duplicates.append(duplicate)
-                duplicate = server
-        else:
-            duplicate = server
-
-        if server.created_at is not None and server.created_at != '':
-            agentless_date = (datetime.today() - relativedelta(months=+agentless_time))
-            # Find agentless in initialization for more than X months
-            if server.status.lower() == 'server_update_init' \
-                    and datetime.strptime(server.created_at[:10], '%Y-%m-%d') < agentless_date:
-                agentless.append(server)
-
-            agents_date = (datetime.today() - relativedelta(months=+agents_time))
-            # Find agents in initialization for more than X months
-            if server.status.lower() == 'server_update_init'\
-                    and datetime.strptime(server.created_at[:10], '%Y-%m-%d') < agents_date:
-                agents.append(server)
-
-        else:
-            print('created_at is None for {} -- {}'.format(server.id, server.hostname))
-
-    return duplicates, agentless, agents
-
-def display_and_delete(delete_list, what, delete=False):
-    '''Display servers then delete them'''
-    print('\n\n================= Total of {} {} to delete (delete={}) ================='.format(len(delete_list),
+def display(plan, reason, what, delete=False):
+    '''Display the servers to delete for a reason'''
+    deletions = plan.by_reason(reason)
+    print('\n\n================= Total of {} {} to delete (delete={}) ================='.format(len(deletions),
                                                                                                 what,
                                                                                                 delete))
-    for delete_server in delete_list:
-        print('{} --- {} --- {} --- {}'.format(delete_server.id, delete_server.hostname, \
-                    delete_server.cve_announcements_count, delete_server.created_at))
+    for deletion in deletions:
+        print('{} --- {} --- {} --- {}'.format(deletion.server.id, deletion.server.hostname, \
+                    deletion.server.cve_announcements_count, deletion.server.created_at))
 
-        if delete is True:
-            API.delete_server(str(delete_server.id))
+def progress(completed, total, result):
+    '''Display the deletion of a server'''
+    print('[{}/{}] {} {}'.format(completed, total, result.item.server.id, result.error or 'deleted'))
 
 def launch_script(parsed_args):
     '''Launch script'''
     connect_api()
     servers = API.servers()
+    agents = API.agents()
+    if servers is None or agents is None:
+        # without the agents, every agent server would be judged as an agentless connection
+        sys.exit('ERROR: The servers and the agents could not be listed, nothing is deleted')
 
-    if parsed_args.duplicates_only:
-        duplicates = find_duplicates(servers)
-        display_and_delete(duplicates, 'duplicates', parsed_args.duplicates_only)
+    cleanup = CBWServerCleanup(parsed_args.agents_time, parsed_args.agentless_time,
+                               case_sensitive=parsed_args.case_sensitive, short_names=parsed_args.short_names)
+    plan = cleanup.plan(servers, agent_server_ids=[agent.server_id for agent in agents])
 
+    if parsed_args.duplicates_only:
+        reasons = [DUPLICATE]
     elif parsed_args.agents_only:
-        agents = find_agents(servers, parsed_args.agents_time)
-        display_and_delete(agents, 'agents', parsed_args.agents_only)
-
+        reasons = [STALE_AGENT]
     elif parsed_args.agentless_only:
-        agentless = find_agentless(servers, parsed_args.agentless_time)
-        display_and_delete(agentless, 'agentless connections', parsed_args.agentless_only)
-
+        reasons = [STALE_AGENTLESS]
     else:
-        duplicates, agentless, agents = find_all(servers, parsed_args.agents_time, parsed_args.agentless_time)
-        display_and_delete(duplicates, 'duplicates', parsed_args.delete_all)
-        display_and_delete(agentless, 'agentless connections', parsed_args.delete_all)
-        display_and_delete(agents, 'agents', parsed_args.delete_all)
+        reasons = [DUPLICATE, STALE_AGENTLESS, STALE_AGENT]
+    delete = parsed_args.delete_all or len(reasons) == 1
+
+    names = {DUPLICATE: 'duplicates', STALE_AGENTLESS: 'agentless connections', STALE_AGENT: 'agents'}
+    for reason in reasons:
+        display(plan, reason, names[reason], delete)
+
+    if delete and parsed_args.journal:
+        with CBWJournal(parsed_args.journal) as journal:
+            report = plan.execute(API, reasons, parsed_args.workers, progress, journal)
+        print('\n{} servers deleted, {} failures'.format(len(report.succeeded), len(report.failed)))
+    elif delete:
+        report = plan.execute(API, reasons, parsed_args.workers, progress)
+        print('\n{} servers deleted, {} failures'.format(len(report.succeeded), len(report.failed)))
 
 def main(args=None):
     '''Main function'''
@@ -172,6 +100,21 @@ def main(args=None):
         '-alt', '--agentless_time',
         help='Specify the time in months an agentless connection has to be on initialisation before deleting it.',
         default=6, type=int)
+    parser.add_argument(
+        '-cs', '--case_sensitive',
+        help='Compare the hostnames with their case to find the duplicates.',
+        action='store_true')
+    parser.add_argument(
+        '-sn', '--short_names',
+        help='Consider a FQDN and its short name as duplicates.',
+        action='store_true')
+    parser.add_argument(
+        '-w', '--workers',
+        help='Specify the number of deletions made at the same time.',
+        default=5, type=int)
+    parser.add_argument(
+        '-j', '--journal',
+        help='Record the deletions in this file so that an interrupted run can be resumed without deleting twice.')
 
     args = parser.parse_args(args)
 
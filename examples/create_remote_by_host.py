@@ -1,10 +1,10 @@
 """Get all linux hosts with port 22 open in specified subnets and create an agentless connection if not supervised """
 
 import os
-import ipaddress
 import argparse
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_subnets import CBWSubnetIndex
 
 
 def connect_api():
@@ -57,16 +57,14 @@ def add_hosts_all_subnets(client, parsed_args):
                 create_agentless(host, client, parsed_args)
 
 
-def add_hosts_specific_subnet(client, parsed_args):
+def add_hosts_specific_subnet(client, subnets, parsed_args):
     """Get all linux hosts with port 22 open, check if hosts are in specified subnets and add them if importing"""
-    for host in client.hosts():
-        if host.category == "linux":
-            for subnet in parsed_args.subnet:
-                if ipaddress.IPv4Address(host.target) in ipaddress.IPv4Network(subnet):
-                    if host.server_id:
-                        EXISTING.append(host)
-                    if host.server_id is None:
-                        create_agentless(host, client, parsed_args)
+    linux_hosts = (host for host in client.iter_hosts() if host.category == "linux")
+    for host in subnets.select(linux_hosts):
+        if host.server_id:
+            EXISTING.append(host)
+        if host.server_id is None:
+            create_agentless(host, client, parsed_args)
 
 
 def display(already_supervised, new_connections, error_list, parsed_args):
@@ -100,17 +98,15 @@ def display(already_supervised, new_connections, error_list, parsed_args):
 
 def launch_script(parsed_args):
     '''Launch script'''
-    if parsed_args.subnet != []:
-        try:
-            for subnet in parsed_args.subnet:
-                ipaddress.ip_network(subnet, strict=False)
-        except ValueError:
-            raise ValueError("Please provide valid subnet")
+    try:
+        subnets = CBWSubnetIndex(parsed_args.subnet)
+    except ValueError:
+        raise ValueError("Please provide valid subnet")
     client = connect_api()
     if parsed_args.subnet == []:
         add_hosts_all_subnets(client, parsed_args)
     else:
-        add_hosts_specific_subnet(client, parsed_args)
+        add_hosts_specific_subnet(client, subnets, parsed_args)
     display(EXISTING, NEW, ERRORS, parsed_args)
 
 
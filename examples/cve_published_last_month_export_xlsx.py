@@ -5,6 +5,7 @@ import datetime
 from configparser import ConfigParser
 import xlsxwriter
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_cve_index import CBWCveIndex, update_for_cve
 
 CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
@@ -31,18 +32,18 @@ def parse_cyberwatch_date(cbwdate):
     """Convert a date retrieved from Cyberwatch API to a datetime object"""
     return datetime.datetime.strptime(cbwdate.split('T')[0], "%Y-%m-%d").date()
 
-def get_updates(server):
-    """Retrieves affected technology for a given CVE on a server object"""
-    targeted_technology = ""
-    targeted_version = ""
+def get_servers_details():
+    """Returns the details of every server by id"""
+    servers = CLIENT.servers()
+    report = CLIENT.servers_details([server.id for server in servers])
+    return {server.id: server for _, server in report.succeeded}
 
-    for update in server.updates:
-        if(update.target is not None and update.target.product is not None
-           and update.target.version is not None):
-            targeted_technology = update.target.product
-            targeted_version = update.target.version
-            break
-    return targeted_technology, targeted_version
+def get_updates(server, cve_code):
+    """Retrieves affected technology for a given CVE on a server object"""
+    update = update_for_cve(server, cve_code)
+    if update is None:
+        return "", ""
+    return update.target.product, update.target.version
 
 def instantiate_export(filename):
     """Instatiate the XLSX export"""
@@ -69,8 +70,9 @@ def instantiate_export(filename):
 
     return xls_export
 
-def export_xls(cve_list, xls_export):
-    """Export a list of CVEs to an XLS file"""
+def export_xls(cve_list, servers, xls_export):
+    """Export a list of CVEs to an XLS file, the affected computers being found in the details of the servers"""
+    index = CBWCveIndex.from_servers(servers.values())
     row_unique_cve = 1
     row_computer_cve = 1
     cve_len = len(cve_list)
@@ -80,19 +82,16 @@ def export_xls(cve_list, xls_export):
 
     try:
         for cve in cve_list:
-            cve = CLIENT.cve_announcement(cve.cve_code)
             print("Progress : {}/{} -- {}".format(row_unique_cve, cve_len, cve.cve_code), end="\r")
 
-            count_affected_computers = 0
-            count_fixed_computers = 0
+            # The CVE is active on the servers affected or ignoring it
+            active_servers = index.affected_servers(cve.cve_code) + index.ignored_servers(cve.cve_code)
+            count_affected_computers = len(active_servers)
+            count_fixed_computers = len(index.fixed_servers(cve.cve_code))
 
-            for server in cve.servers:
-                # Skip if the CVE is not active on the server
-                if server.active is not True:
-                    count_fixed_computers += 1
-                    continue
-                count_affected_computers += 1
-                targeted_technology, targeted_version = get_updates(server)
+            for server_id in active_servers:
+                server = servers[server_id]
+                targeted_technology, targeted_version = get_updates(server, cve.cve_code)
 
                 tab_computer_cve.write(row_computer_cve, 0, cve.cve_code)
                 tab_computer_cve.write(row_computer_cve, 1, cve.score_v3)
@@ -125,5 +124,5 @@ firstDayOfLastMonth = (today.replace(day=1) - datetime.timedelta(days=1)).replac
 firstDayOfCurrentMonth = today.replace(day=1)
 
 print("Exporting vulnerabilities published between {} and {}.".format(firstDayOfLastMonth, firstDayOfCurrentMonth))
-export_xls(get_cyberwatch_cves(firstDayOfLastMonth, firstDayOfCurrentMonth),
+export_xls(get_cyberwatch_cves(firstDayOfLastMonth, firstDayOfCurrentMonth), get_servers_details(),
            instantiate_export("active_CVEs_{}_to_{}_export.xlsx".format(firstDayOfLastMonth, firstDayOfCurrentMonth)))
@@ -1,10 +1,10 @@
 """Find all active /24 subnets present in Cyberwatch and arrange them by nodes"""
 
 import os
-import ipaddress
 import argparse
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_subnets import subnets_by_node
 
 
 def connect_api():
@@ -19,31 +19,17 @@ def connect_api():
     return client
 
 
-def ip_per_node(client):
-    """Rearrange each ip address with it's specific node"""
-    ip_in_nodes = {}
-    hosts = client.hosts()
+def get_all_subnets(client):
+    """Find the /24 subnet of each host, clean duplicates and rearrange each subnet with his node,
+    the nodes without hosts having no subnet"""
+    node_subnets = subnets_by_node(client.iter_hosts())
 
-    for node in client.nodes():
-        my_list = [x.target for x in hosts if x.node_id == node.id]
-        ip_in_nodes[node.name] = my_list
-    return ip_in_nodes
-
-
-def get_all_subnets(ip_in_nodes):
-    """Find each ip's subnet, clean duplicates and rearrange each subnet with his node"""
     node_with_subnets = {}
     all_unique_subnets = set()
-
-    for node in ip_in_nodes:
-        subnets_list = set()
-        for address in ip_in_nodes[node]:
-            data = '{}/255.255.255.0'.format(address)
-            address = ipaddress.ip_network(
-                data, strict=False).__str__()
-            all_unique_subnets.add(address)
-            subnets_list.add(address)
-        node_with_subnets[node] = subnets_list
+    for node in client.nodes():
+        subnets = {str(subnet) for subnet in node_subnets.get(node.id, ())}
+        all_unique_subnets |= subnets
+        node_with_subnets[node.name] = subnets
 
     print("\nUnique subnets:")
     print(all_unique_subnets)
@@ -53,8 +39,7 @@ def get_all_subnets(ip_in_nodes):
 def launch_script():
     '''Launch script'''
     client = connect_api()
-    ip_in_nodes = ip_per_node(client)
-    node_with_subnets = get_all_subnets(ip_in_nodes)
+    node_with_subnets = get_all_subnets(client)
     print("\nNodes with subnets:")
     print(node_with_subnets)
 
@@ -8,15 +8,18 @@ CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
 XLSX = CBWXlsx(CONF.get('cyberwatch', 'url'), CONF.get('cyberwatch', 'api_key'), CONF.get('cyberwatch', 'secret_key'))
 
+# An xlsx or csv file, the outcome of each row being written to import_file_report.csv
 FILE_XLSX = 'import_file.xlsx'
 
-RESPONSE = XLSX.import_remote_accesses_xlsx(FILE_XLSX)
+RESPONSE = XLSX.import_remote_accesses(FILE_XLSX, workers=10)
 
-if RESPONSE:
-    for remote_access in RESPONSE:
-        if remote_access:
-            print("remote access created, id=>>>>>{}".format(remote_access.id))
+if RESPONSE is not None:
+    for result in RESPONSE:
+        if result.status == 'created':
+            print("remote access created, id=>>>>>{}".format(result.remote_access.id))
+        elif result.status == 'skipped':
+            print("line {}: remote access {} already exists".format(result.line, result.info["address"]))
         else:
-            print("An error occurred, import_remote_accesses_xlsx failed")
+            print("line {}: An error occurred, {}".format(result.line, result.error))
 else:
-    print("Error format file xlsx::HOST, PORT, TYPE, USERNAME, PASSWORD, KEY, NODE, SERVER_GROUPS")
+    print("Error format file xlsx::HOST, PORT, TYPE, USERNAME, PASSWORD, KEY, NODE_ID, SERVER_GROUPS")
@@ -2,7 +2,6 @@
 
 import argparse
 import os
-import json
 import smtplib
 import ssl
 from email.mime.multipart import MIMEMultipart
@@ -10,6 +9,7 @@ from email.mime.text import MIMEText
 from datetime import datetime, date
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_snapshot import CBWSnapshot
 
 EMAIL_RECEIVERS = ["", ""]
 
@@ -43,51 +43,23 @@ def setup_smtp():
     return smtp
 
 
-def replace_file(servers):
-    """Replace server list in file with recent one"""
-    print("INFO: Replacing server list in file with recent one...")
-    if os.path.exists(os.path.dirname(__file__) + '/communication_failure_list.txt'):
-        try:
-            os.remove(os.path.dirname(__file__) +
-                      '/communication_failure_list.txt')
-        except OSError as error:
-            print("Error: %s - %s." % (error.filename, error.strerror))
-    find_communication_failure_servers(servers)
+def snapshot_path():
+    """Path of the file holding the snapshot of the servers taken by the last run"""
+    return os.path.join(os.path.dirname(__file__), 'servers_snapshot.json')
 
 
-def find_communication_failure_servers(servers):
-    """Find servers with status "Communication failure" and save them to a file"""
-    print('INFO: Finding servers with "Communication failure" status and saving result in file')
-    with open(os.path.dirname(__file__) + '/communication_failure_list.txt', 'w+') as file:
-        for server in servers:
-            if server.status == "server_update_comm_fail":
-                json.dump({"id": server.id}, file)
-                file.write(os.linesep)
-
-
-def find_recovered_servers(client):
-    """Compare list of servers in file with current ones to find recovered servers"""
-    print("INFO: Determining recovered servers by comparing current servers with list in file...")
-    current_servers_list = []
-    for server in client.servers():
-        if server.status == "server_update_comm_fail":
-            current_servers_list.append({"id": server.id})
-
-    with open(os.path.dirname(__file__) + '/communication_failure_list.txt') as file:
-        server_list = [json.loads(line) for line in file]
-
-    diff = [i for i in current_servers_list +
-            server_list if i not in current_servers_list or i not in server_list]
-
-    return diff
+def find_recovered_servers(previous, current):
+    """Compare the previous snapshot of the servers with the current one to find recovered servers"""
+    print("INFO: Determining recovered servers by comparing current servers with the previous snapshot...")
+    return sorted(previous.diff(current).left("server_update_comm_fail"))
 
 
 def build_server_list(client, diff):
     """Fetch each server that recovered to help build the email report"""
     print("INFO: Fetching each server not in 'Communication failure' anymore...")
     servers = []
-    for server in diff:
-        servers.append(client.server(str(server.id)))
+    for server_id in diff:
+        servers.append(client.server(str(server_id)))
     return servers
 
 
@@ -103,7 +75,7 @@ def create_body_html(client, server_list):
     return servers_html
 
 
-def send_email(client, smtp, server_list):
+def send_email(client, smtp, server_list, since):
     """Sends an email using smtp configuration specified in the file smtp.conf"""
     content = create_body_html(client, server_list)
 
@@ -114,9 +86,8 @@ def send_email(client, smtp, server_list):
     message["From"] = smtp["sender"]
     message["To"] = ", ".join(EMAIL_RECEIVERS)
 
-    # Get Period start date with "Last Modified" time of file
-    start_date = datetime.fromtimestamp(os.path.getmtime(os.path.dirname(
-        __file__) + '/communication_failure_list.txt')).strftime("%d/%m/%Y, %H:%M")
+    # Get Period start date with the time of the previous snapshot
+    start_date = datetime.fromtimestamp(since).strftime("%d/%m/%Y, %H:%M")
 
     email_body = f"""\
     <p>Greetings,</p>
@@ -154,13 +125,17 @@ def launch_script():
     client = connect_api()
     smtp = setup_smtp()
     print("INFO: Getting server list...")
-    servers = client.servers()
-    if os.path.exists(os.path.dirname(__file__) + '/communication_failure_list.txt') is False:
-        find_communication_failure_servers(servers)
-    diff = find_recovered_servers(client)
-    server_list = build_server_list(client, diff)
-    send_email(client, smtp, server_list)
-    replace_file(servers)
+    current = CBWSnapshot.from_client(client)
+    if current is None:
+        print("ERROR: The servers could not all be listed, the previous snapshot is kept")
+        return
+    if os.path.exists(snapshot_path()):
+        previous = CBWSnapshot.load(snapshot_path())
+        diff = find_recovered_servers(previous, current)
+        server_list = build_server_list(client, diff)
+        send_email(client, smtp, server_list, previous.taken_at)
+    print("INFO: Saving the snapshot of the servers for the next run...")
+    current.save(snapshot_path())
 
 
 def main(args=None):
@@ -3,6 +3,7 @@
 import os
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_journal import CBWJournal
 
 CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
@@ -15,5 +16,14 @@ INFO = {
     "ignoring_policy": ""
 }
 
-for server_item in CLIENT.servers():
-    CLIENT.update_server(str(server_item.id), INFO)
+# The servers updated are recorded in the journal: if the script is interrupted, running it again only updates
+# the remaining servers. Remove the journal file to update all the servers again.
+JOURNAL_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'server_affect_ignoring_policy.jsonl')
+
+with CBWJournal(JOURNAL_PATH) as JOURNAL:
+    REPORT = JOURNAL.run(lambda server: CLIENT.update_server(str(server.id), INFO), CLIENT.servers(),
+                         key=lambda server: server.id, workers=5)
+
+for server_item, error in REPORT.failed:
+    print("Failed to update server {}: {}".format(server_item.id, error))
+print(JOURNAL.counts())
@@ -54,9 +54,8 @@ def post_qradar(server, code_list):
     return res.status_code
 
 
-def cve_code_list(server_id, client):
+def cve_code_list(server):
     '''Build CVE Code list'''
-    server = client.server(str(server_id))
     return list(map(lambda x: x.cve_code, server.cve_announcements))
 
 
@@ -64,8 +63,9 @@ def launch_script():
     '''Launch script'''
     client = connect_api()
     servers = client.servers()
-    for server in servers:
-        post_qradar(server, cve_code_list(server.id, client))
+    for result in client.iter_servers_details([server.id for server in servers]):
+        if result.result is not None:
+            post_qradar(result.result, cve_code_list(result.result))
 
 
 def main(args=None):
@@ -3,6 +3,7 @@
 import os
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_join import group_by
 
 CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
@@ -12,22 +13,13 @@ CLIENT.ping()
 
 SERVERS = CLIENT.servers()
 
-CATEGORY_BY_GROUPS = {}
+# the details are kept in the order of the servers, those which could not be fetched being skipped
+DETAILS = [server for server in CLIENT.servers_details([server.id for server in SERVERS]).results if server]
 
-# append each server to a group by category dict
-for server in SERVERS:
-    server = CLIENT.server(str(server.id))
-
-    for group in server.groups:
-        if group.name not in CATEGORY_BY_GROUPS:
-            CATEGORY_BY_GROUPS[group.name] = {}
-
-        concerned_group = CATEGORY_BY_GROUPS[group.name]
-
-        if server.category not in concerned_group:
-            concerned_group[server.category] = []
-
-        concerned_group[server.category].append(server)
+# group the servers by group, then by category
+CATEGORY_BY_GROUPS = {group: group_by(servers, 'category')
+                      for group, servers in group_by(DETAILS, lambda server: [group.name for group in server.groups],
+                                                     many=True).items()}
 
 for group in CATEGORY_BY_GROUPS:
     print("--- GROUP : {0} ---".format(group))
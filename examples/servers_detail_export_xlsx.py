@@ -4,10 +4,12 @@ import os
 from configparser import ConfigParser
 import xlsxwriter  # pylint: disable=import-error
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_cache import CBWEntityCache
 
 CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
-CLIENT = CBWApi(CONF.get('cyberwatch', 'url'), CONF.get('cyberwatch', 'api_key'), CONF.get('cyberwatch', 'secret_key'))
+CLIENT = CBWApi(CONF.get('cyberwatch', 'url'), CONF.get('cyberwatch', 'api_key'), CONF.get('cyberwatch', 'secret_key'),
+                cache=CBWEntityCache())
 
 CLIENT.ping()
 
@@ -21,11 +23,8 @@ VULNERABILITIES = EXPORTED.add_worksheet("Vulnerabilities")
 SECURITY = EXPORTED.add_worksheet("Security Advisories")
 RECOMMENDED = EXPORTED.add_worksheet("Recommended Actions")
 
-# Build a list with each server and it's details
-SERVERS_LIST = []
-for server in SERVERS:
-    server = CLIENT.server(str(server.id))
-    SERVERS_LIST.append(server)
+# Build a list with each server and it's details, fetching 10 servers at a time
+SERVERS_LIST = [server for server in CLIENT.servers_details([server.id for server in SERVERS]).results if server]
 
 ROW = 0
 COL = 0
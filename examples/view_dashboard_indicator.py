@@ -4,32 +4,18 @@ from collections import Counter
 import os
 from configparser import ConfigParser
 from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_cve_catalog import CBWCveCatalog
+from cbw_api_toolbox.cbw_cve_index import CBWCveIndex
 
 CONF = ConfigParser()
 CONF.read(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'api.conf'))
 CLIENT = CBWApi(CONF.get('cyberwatch', 'url'), CONF.get('cyberwatch', 'api_key'), CONF.get('cyberwatch', 'secret_key'))
 
-def cve_lists(server_list):
+def cve_lists(index):
     """Return count of CVE based on access vector"""
-    servers = server_list
-    cves = CLIENT.cve_announcements({"exploitable": "true", "active": "true"})
-    server_cves = {
-        'access_vector_network': 0,
-        'access_vector_local': 0,
-        'access_vector_adjacent': 0,
-        'access_vector_physical': 0
-    }
-
-    for server in servers:
-        server_show = CLIENT.server(str(server.id))
-        for cve in server_show.cve_announcements:
-            if not(cve.ignored) and cve.fixed_at is None:
-                cve_details = next((cve_exploitable for cve_exploitable in
-                                    cves if cve_exploitable.cve_code == cve.cve_code), None)
-
-                if cve_details is not None and cve_details.cvss_v3 is not None:
-                    server_cves[cve_details.cvss_v3.access_vector] += 1
-    return server_cves
+    catalog = CBWCveCatalog.from_client(CLIENT, {"exploitable": "true", "active": "true"})
+    # CVE announcements neither ignored nor fixed on the servers
+    return catalog.count_by_access_vector(index)
 
 def server_outdated_system(servers):
     """Return count of servers which os is not supported by Cyberwatch"""
@@ -42,7 +28,9 @@ def server_reboot_required():
 def print_results():
     """Presents formatted results"""
     servers = CLIENT.servers()
-    cve = cve_lists(servers)
+    index = CBWCveIndex.from_servers(server for _, server in
+                                     CLIENT.servers_details([server.id for server in servers]).succeeded)
+    cve = cve_lists(index)
     reboot_required = server_reboot_required()
     outdated_system = server_outdated_system(servers)
 
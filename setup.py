@@ -21,5 +21,13 @@ setup(
         "requests>=2.20.1",
         "XlsxWriter>=1.2.1",
         "xlrd>=1.2.0"
-    ]
+    ],
+    extras_require={
+        "fast_json": ["orjson>=3.0"],
+        "async": ["aiohttp>=3.6"],
+        "benchmarks": ["PyYAML>=5.1"]
+    },
+    entry_points={
+        "console_scripts": ["cbw-cache = cbw_api_toolbox.cbw_cache_cli:main"]
+    }
 )
@@ -1,8 +1,15 @@
 """Test file for cbw_api.py"""
 
+import threading
+import time
+
+import requests
 import vcr  # pylint: disable=import-error
 import pytest  # pylint: disable=import-error
-from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_api import CBWApi, CBWPageError
+from cbw_api_toolbox.cbw_cache import CBWConditionalCache, CBWEntityCache, CBWResponseCache
+from cbw_api_toolbox.cbw_ratelimit import CBWRateLimiter
+from cbw_api_toolbox.cbw_retry import CBWRetryPolicy
 
 # To generate a new vcr cassette:
 # - DO NOT CHANGE THE API_URL
@@ -39,6 +46,160 @@ class TestCBWApi:
             CBWApi('', API_KEY, SECRET_KEY).ping()
         assert exc.value.code == -1
 
+    @staticmethod
+    def test_session():
+        """Tests for the connection pool shared by the client"""
+
+        with CBWApi(API_URL, API_KEY, SECRET_KEY, pool_maxsize=4, pool_block=True) as client:
+            adapter = client.session.get_adapter(API_URL)
+            assert adapter._pool_maxsize == 4  # pylint: disable=protected-access
+            assert adapter._pool_block is True  # pylint: disable=protected-access
+
+            with vcr.use_cassette('spec/fixtures/vcr_cassettes/ping_ok.yaml', allow_playback_repeats=True):
+                assert client.ping() is True
+                assert client.ping() is True
+                assert len(adapter.poolmanager.pools) == 1
+
+        assert len(adapter.poolmanager.pools) == 0
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY, keep_alive=False)
+        assert client.session.headers['Connection'] == 'close'
+
+    @staticmethod
+    def test_retry():
+        """Tests for the retries of the requests"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY, retry_policy=CBWRetryPolicy(backoff_factor=0))
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/retry_ping.yaml') as cassette:
+            assert client.ping() is True
+            assert cassette.play_count == 3
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/retry_create_group.yaml') as cassette:
+            assert client.create_group({'name': 'production'}) is None
+            assert cassette.play_count == 1
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/retry_servers_pages.yaml',
+                              match_on=['method', 'uri', 'body']) as cassette:
+            assert [server.id for server in client.servers()] == [1, 2, 3]
+            assert cassette.all_played
+
+        client = CBWApi('http://127.0.0.1:1', API_KEY, SECRET_KEY,
+                        retry_policy=CBWRetryPolicy(max_retries=2, backoff_factor=0))
+        assert client.servers() is None
+        with pytest.raises(requests.ConnectionError):
+            client.ping()
+        with pytest.raises(requests.ConnectionError):
+            client.server('1')
+        with pytest.raises(requests.ConnectionError):
+            client.update_server('1', {})
+
+    @staticmethod
+    def test_rate_limit():
+        """Tests that the reads go through the read limiter only"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY, read_limiter=CBWRateLimiter(rate=20, burst=1),
+                        write_limiter=CBWRateLimiter(max_in_flight=1))
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/ping_ok.yaml', allow_playback_repeats=True):
+            start = time.monotonic()
+            for _ in range(4):
+                assert client.ping() is True
+            assert time.monotonic() - start >= 0.14
+
+    @staticmethod
+    def test_cache():
+        """Tests that the getters are served from the cache until a write invalidates the entity"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY, cache=CBWEntityCache())
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/group.yaml') as cassette:
+            assert client.group('12').name == 'production'
+            assert client.group(12).name == 'production'
+            assert cassette.play_count == 1
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/update_group.yaml'):
+            assert client.update_group('12', {"name": "test_change"}).name == "test_change"
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/group.yaml') as cassette:
+            assert client.group('12').name == 'production'
+            assert cassette.play_count == 1
+
+        assert client.cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 1}
+
+    @staticmethod
+    def test_response_cache(tmp_path):
+        """Tests that the responses of the cached routes are shared by the clients until a write on their type"""
+
+        path = str(tmp_path / "cache.sqlite")
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/groups.yaml') as cassette:
+            client = CBWApi(API_URL, API_KEY, SECRET_KEY, response_cache=CBWResponseCache(path, {'groups': 3600}))
+            assert client.groups()[0].name == 'production'
+
+            other_client = CBWApi(API_URL, API_KEY, SECRET_KEY, response_cache=CBWResponseCache(path, {'groups': 3600}))
+            assert other_client.groups()[0].name == 'production'
+            assert cassette.play_count == 1
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/create_group.yaml'):
+            assert client.create_group({"name": "test", "description": "test description"}).name == "test"
+
+        assert other_client.response_cache.entries() == []
+
+    @staticmethod
+    def test_conditional_cache():
+        """Tests that the entities are revalidated with their ETag and Last-Modified validators"""
+
+        def validators(request, recorded):
+            assert request.headers.get('If-None-Match') == recorded.headers.get('If-None-Match')
+            assert request.headers.get('If-Modified-Since') == recorded.headers.get('If-Modified-Since')
+
+        conditional_vcr = vcr.VCR(match_on=['method', 'uri', 'validators'])
+        conditional_vcr.register_matcher('validators', validators)
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY, conditional_cache=CBWConditionalCache())
+
+        with conditional_vcr.use_cassette('spec/fixtures/vcr_cassettes/conditional_server.yaml') as cassette:
+            server = client.server('3')
+            assert server.hostname == 'cyberwatch-server'
+            assert client.server('3') is server
+            assert client.server('3').hostname == 'cyberwatch-server-renamed'
+            assert cassette.all_played
+
+        assert client.conditional_cache.stats() == {"revalidations": 1, "downloads": 2, "size": 1}
+
+    @staticmethod
+    def test_coalesce_requests():
+        """Tests that the threads asking for the same server share one request"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY, coalesce_requests=True)
+        send = client._send  # pylint: disable=protected-access
+        release = threading.Event()
+
+        def blocked_send(*args):
+            release.wait()
+            return send(*args)
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/ping_ok.yaml'):
+            # open the connection pool before the worker threads use it
+            assert client.ping() is True
+
+        client._send = blocked_send  # pylint: disable=protected-access
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/server_ok.yaml') as cassette:
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(client.server('3'))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            while client.single_flight.shared < 3:
+                time.sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+            assert cassette.play_count == 1
+            assert results[0].category == 'server'
+            assert all(result is results[0] for result in results)
+
     @staticmethod
     def test_servers():
         """Tests for servers method"""
@@ -58,6 +219,50 @@ availability_requirement='availability_requirement_medium'), groups=[], complian
             assert isinstance(response, list) is True
             assert str(response[0]) == validate_server
 
+    @staticmethod
+    def test_servers_concurrency():
+        """Tests for servers method with concurrent pagination"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY)
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_pages.yaml',
+                              match_on=['method', 'uri', 'body']):
+            response = client.servers(concurrency=2)
+            assert [server.id for server in response] == [1, 2, 3, 4, 5]
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_pages_without_last.yaml',
+                              match_on=['method', 'uri', 'body']) as cassette:
+            response = client.servers(concurrency=2)
+            assert [server.id for server in response] == [1, 2, 3, 4, 5]
+            assert cassette.all_played
+
+    @staticmethod
+    def test_iter_servers():
+        """Tests for iter_servers method"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY)
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_pages_without_last.yaml',
+                              match_on=['method', 'uri', 'body']):
+            response = client.iter_servers()
+            assert not isinstance(response, list)
+            assert [server.id for server in response] == [1, 2, 3, 4, 4, 5]
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_pages_without_last.yaml',
+                              match_on=['method', 'uri', 'body']) as cassette:
+            response = client.iter_servers(limit=3)
+            assert [server.id for server in response] == [1, 2, 3]
+            assert cassette.play_count == 2
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_page_failed.yaml',
+                              match_on=['method', 'uri', 'body']):
+            servers = []
+            with pytest.raises(CBWPageError) as error:
+                for server in client.iter_servers():
+                    servers.append(server.id)
+            assert servers == [1, 2]
+            assert error.value.page == '2'
+
     @staticmethod
     def test_server():
         """Tests for server method"""
@@ -71,6 +276,24 @@ availability_requirement='availability_requirement_medium'), groups=[], complian
             response = CBWApi(API_URL, API_KEY, SECRET_KEY).server('wrong_id')
             assert response is None
 
+    @staticmethod
+    def test_servers_details():
+        """Tests for servers_details method"""
+
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY)
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_details.yaml', allow_playback_repeats=True):
+            # open the connection pool before the worker threads use it
+            assert client.server('1').id == 1
+
+            report = client.servers_details([3, 'wrong_id', 1, 2], workers=2)
+            assert [server.id for server in report.results if server] == [3, 1, 2]
+            assert report.failed == [('wrong_id', 'No result')]
+            assert report.results[2].groups[0].name == 'production'
+
+            response = client.iter_servers_details([1, 2, 3], workers=3)
+            assert sorted(result.result.id for result in response) == [1, 2, 3]
+
     @staticmethod
     def test_delete_server():
         """Tests for method delete_server"""
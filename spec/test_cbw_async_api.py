@@ -0,0 +1,136 @@
+"""Test file for cbw_async_api.py"""
+
+import asyncio
+import json
+
+import pytest  # pylint: disable=import-error
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web  # pylint: disable=import-error,wrong-import-position
+from aiohttp.test_utils import TestServer  # pylint: disable=import-error,wrong-import-position
+from cbw_api_toolbox.cbw_api import CBWPageError  # pylint: disable=wrong-import-position
+from cbw_api_toolbox.cbw_async_api import AsyncCBWApi  # pylint: disable=wrong-import-position
+from cbw_api_toolbox.cbw_auth import CBWAuth  # pylint: disable=wrong-import-position
+
+API_KEY = 'api_key'
+SECRET_KEY = 'secret_key'
+
+PAGES = {
+    1: [{"id": 1, "hostname": "server01"}, {"id": 2, "hostname": "server02"}],
+    2: [{"id": 3, "hostname": "server03"}, {"id": 4, "hostname": "server04"}],
+    3: [{"id": 4, "hostname": "server04"}, {"id": 5, "hostname": "server05"}],
+}
+
+
+def signed(handler):
+    """Answer 401 to the requests whose signature is not valid"""
+    async def check(request):
+        body = await request.text()
+        expected = CBWAuth(API_KEY, SECRET_KEY)._sign(  # pylint: disable=protected-access
+            request.method, request.headers.get('Content-Type', '') if body else '', request.headers['Date'],
+            request.path_qs)
+        if request.headers['Authorization'].split(':')[-1] != expected:
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return await handler(request, json.loads(body) if body else {})
+    return check
+
+
+@signed
+async def servers(request, params):
+    """Paginated servers, announcing the last page"""
+    page = int(params.get('page', 1))
+    url = 'http://{}{}'.format(request.host, request.path)
+    links = '<{0}?page=3>; rel="last"'.format(url)
+    if page < 3:
+        links += ', <{0}?page={1}>; rel="next"'.format(url, page + 1)
+    return web.json_response(PAGES[page], headers={'Link': links})
+
+
+@signed
+async def nodes(request, params):
+    """Nodes whose second page fails, without announcing the last page"""
+    if int(params.get('page', 1)) == 2:
+        return web.json_response({"error": "Internal Server Error"}, status=500)
+    url = 'http://{}{}'.format(request.host, request.path)
+    return web.json_response([{"id": 1, "name": "master"}], headers={'Link': '<{}?page=2>; rel="next"'.format(url)})
+
+
+@signed
+async def server(request, _params):
+    """Details of a server"""
+    if request.match_info['server_id'] == 'wrong_id':
+        return web.json_response({"error": "not found"}, status=404)
+    return web.json_response({"id": int(request.match_info['server_id']), "category": "server",
+                              "os": {"key": "debian_10_64"}})
+
+
+@signed
+async def update_server(_request, params):
+    """Update of a server"""
+    return web.json_response({"groups": params['groups']})
+
+
+def run(scenario):
+    """Run a scenario against a local stand-in of the API"""
+    async def main():
+        app = web.Application()
+        app.router.add_get('/api/v3/servers', servers)
+        app.router.add_get('/api/v3/servers/{server_id}', server)
+        app.router.add_get('/api/v3/nodes', nodes)
+        app.router.add_patch('/api/v3/servers/{server_id}', update_server)
+        async with TestServer(app) as test_server:
+            api_url = str(test_server.make_url('')).rstrip('/')
+            async with AsyncCBWApi(api_url, API_KEY, SECRET_KEY, max_concurrency=2) as client:
+                await scenario(client)
+    asyncio.new_event_loop().run_until_complete(main())
+
+
+class TestAsyncCBWApi:
+
+    """Test for class AsyncCBWApi"""
+
+    @staticmethod
+    def test_server():
+        """Tests for server and update_server methods"""
+        async def scenario(client):
+            response = await client.server('3')
+            assert str(response) == "cbw_object(id=3, category='server', os=cbw_object(key='debian_10_64'))"
+            assert await client.server('wrong_id') is None
+            assert await client.update_server('3', {'groups': [1, 2]}) is True
+
+            responses = await asyncio.gather(*[client.server(str(server_id)) for server_id in range(20)])
+            assert [response.id for response in responses] == list(range(20))
+        run(scenario)
+
+    @staticmethod
+    def test_servers():
+        """Tests for servers and iter_servers methods"""
+        async def scenario(client):
+            response = await client.servers()
+            assert [server.id for server in response] == [1, 2, 3, 4, 4, 5]
+
+            response = await client.servers(concurrency=2)
+            assert [server.id for server in response] == [1, 2, 3, 4, 5]
+
+            response = [server.id async for server in client.iter_servers(limit=3)]
+            assert response == [1, 2, 3]
+        run(scenario)
+
+    @staticmethod
+    def test_failures():
+        """Tests that a failed page and a request without response are reported"""
+        async def scenario(client):
+            assert await client.nodes() is None
+            assert await client.create_remote_access({}) is False
+
+            response = []
+            with pytest.raises(CBWPageError):
+                async for node in client.iter_nodes():
+                    response.append(node.id)
+            assert response == [1]
+
+            async with AsyncCBWApi('http://127.0.0.1:1', API_KEY, SECRET_KEY) as unreachable:
+                assert await unreachable.servers() is None
+                with pytest.raises(aiohttp.ClientError):
+                    await unreachable.server('1')
+        run(scenario)
@@ -0,0 +1,55 @@
+"""Test file for cbw_auth.py"""
+
+import base64
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+
+import requests
+from cbw_api_toolbox.cbw_auth import CBWAuth
+
+API_KEY = 'api_key'
+SECRET_KEY = 'secret_key'
+API_URL = 'https://localhost'
+
+
+def expected_signature(request):
+    """Signature computed from scratch for a signed request"""
+    content_type = request.headers.get('Content-Type', '')
+    message = ",".join([request.method, content_type, "", request.path_url, request.headers['Date']])
+    digest = hmac.new(bytes(SECRET_KEY, "utf8"), bytes(message, "utf8"), sha256).digest()
+    return "CyberWatch APIAuth-HMAC-SHA256 {}:{}".format(API_KEY, base64.b64encode(digest).decode("utf-8"))
+
+
+class TestCBWAuth:
+
+    """Test for class CBWAuth"""
+
+    @staticmethod
+    def test_sign():
+        """Tests the headers of a signed request"""
+        auth = CBWAuth(API_KEY, SECRET_KEY)
+
+        request = auth(requests.Request('GET', API_URL + '/api/v3/servers/1').prepare())
+        assert request.headers['Authorization'] == expected_signature(request)
+        assert request.headers['Date'].endswith(' GMT')
+        assert 'Content-Type' not in request.headers
+
+        request = auth(requests.Request('PATCH', API_URL + '/api/v3/servers/1', data='{"groups": [1]}').prepare())
+        assert request.headers['Content-Type'] == 'application/json'
+        assert request.headers['Authorization'] == expected_signature(request)
+
+    @staticmethod
+    def test_shared_between_threads():
+        """Tests that one instance signs the requests of several threads"""
+        auth = CBWAuth(API_KEY, SECRET_KEY)
+
+        def sign(index):
+            body = '{"id": %d}' % index if index % 2 else None
+            request = requests.Request('POST' if body else 'GET', API_URL + '/api/v3/servers/{}'.format(index),
+                                       data=body).prepare()
+            auth(request)
+            return request.headers['Authorization'] == expected_signature(request)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            assert all(executor.map(sign, range(4000)))
@@ -0,0 +1,50 @@
+"""Test file for cbw_bulk.py"""
+
+import threading
+import time
+
+from cbw_api_toolbox.cbw_bulk import iter_bulk, run_bulk
+
+
+def square(value):
+    """Square a positive number after a delay making the calls finish out of order"""
+    if value < 0:
+        raise ValueError("negative value")
+    time.sleep(0.001 * (value % 3))
+    return value * value if value else None
+
+
+class TestCBWBulk:
+
+    """Test for the bulk helpers"""
+
+    @staticmethod
+    def test_run_bulk():
+        """Tests that the results keep the order of the items and the failures are isolated"""
+        report = run_bulk(square, [3, -1, 2, 0, 5], workers=3)
+
+        assert report.results == [9, None, 4, None, 25]
+        assert report.succeeded == [(3, 9), (2, 4), (5, 25)]
+        assert report.failed == [(-1, "ValueError('negative value')"), (0, "No result")]
+
+    @staticmethod
+    def test_iter_bulk():
+        """Tests that the calls are bounded by the number of workers"""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def track(value):
+            with lock:
+                running.append(value)
+                peak.append(len(running))
+            time.sleep(0.002)
+            with lock:
+                running.remove(value)
+            return value
+
+        results = list(iter_bulk(track, range(50), workers=4))
+
+        assert sorted(result.item for result in results) == list(range(50))
+        assert all(result.error is None for result in results)
+        assert max(peak) <= 4
@@ -0,0 +1,180 @@
+"""Test file for cbw_cache.py"""
+
+import requests
+import vcr  # pylint: disable=import-error
+from cbw_api_toolbox.cbw_cache import CBWConditionalCache, CBWEntityCache, CBWResponseCache, MISSING
+from cbw_api_toolbox.cbw_cache_cli import main
+
+
+class FakeClock:
+    """Clock moved forward by the tests"""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCBWEntityCache:
+
+    """Test for class CBWEntityCache"""
+
+    @staticmethod
+    def test_lru():
+        """Tests that the least recently used entities are evicted first"""
+        cache = CBWEntityCache(maxsize=2)
+
+        cache.set('servers', 1, 'server 1')
+        cache.set('servers', 2, 'server 2')
+        assert cache.get('servers', '1') == 'server 1'
+
+        cache.set('servers', 3, 'server 3')
+        assert cache.get('servers', 2) is MISSING
+        assert cache.get('servers', 1) == 'server 1'
+        assert cache.get('servers', 3) == 'server 3'
+        assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "size": 2}
+
+    @staticmethod
+    def test_ttl():
+        """Tests that the entities expire after the time to live of their type"""
+        clock = FakeClock()
+        cache = CBWEntityCache(ttl=10, ttls={'cve_announcements': 100}, clock=clock)
+
+        cache.set('servers', 1, 'server 1')
+        cache.set('cve_announcements', 'CVE-2019-14869', 'cve')
+
+        clock.now = 10
+        assert cache.get('servers', 1) is MISSING
+        assert cache.get('cve_announcements', 'CVE-2019-14869') == 'cve'
+        assert len(cache) == 1
+
+    @staticmethod
+    def test_invalidate():
+        """Tests the invalidation of one entity and of every entity of a type"""
+        cache = CBWEntityCache()
+
+        cache.set('servers', 1, 'server 1')
+        cache.set('servers', 2, 'server 2')
+        cache.set('groups', 1, 'group 1')
+
+        cache.invalidate('servers', '1')
+        assert cache.get('servers', 1) is MISSING
+        assert cache.get('servers', 2) == 'server 2'
+
+        cache.invalidate('servers')
+        assert cache.get('servers', 2) is MISSING
+        assert cache.get('groups', 1) == 'group 1'
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+def response_with(content, headers=None):
+    """Build a response with the given content and a pagination header"""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update({'Link': '<https://localhost/api/v3/groups?page=2>; rel="next"'})
+    response.headers.update(headers or {})
+    response._content = content  # pylint: disable=protected-access
+    return response
+
+
+class TestCBWConditionalCache:
+
+    """Test for class CBWConditionalCache"""
+
+    @staticmethod
+    def test_headers():
+        """Tests that the conditional headers are built from the validators of the last response"""
+        cache = CBWConditionalCache(maxsize=1)
+        url = 'https://localhost/api/v3/servers/3'
+
+        assert not cache.headers(url)
+        cache.store(url, response_with(b'{}', {'ETag': 'W/"5a1"'}), 'server 3')
+        assert cache.headers(url) == {'If-None-Match': 'W/"5a1"'}
+        assert cache.revalidated(url) == 'server 3'
+
+        cache.store(url, response_with(b'{}'), 'server 3')
+        assert not cache.headers(url)
+        assert cache.revalidated(url) is MISSING
+
+    @staticmethod
+    def test_lru():
+        """Tests that the least recently used entities are evicted first"""
+        cache = CBWConditionalCache(maxsize=1)
+
+        cache.store('servers/1', response_with(b'{}', {'Last-Modified': 'Wed, 04 Dec 2019 15:39:04 GMT'}), 1)
+        cache.store('servers/2', response_with(b'{}', {'Last-Modified': 'Wed, 04 Dec 2019 15:39:04 GMT'}), 2)
+        assert not cache.headers('servers/1')
+        assert cache.headers('servers/2') == {'If-Modified-Since': 'Wed, 04 Dec 2019 15:39:04 GMT'}
+        assert cache.stats() == {"revalidations": 0, "downloads": 2, "size": 1}
+
+
+class TestCBWResponseCache:
+
+    """Test for class CBWResponseCache"""
+
+    @staticmethod
+    def test_get(tmp_path):
+        """Tests that the responses are returned until they expire"""
+        clock = FakeClock()
+        path = str(tmp_path / "cache.sqlite")
+        cache = CBWResponseCache(path, {'groups': 60}, clock=clock)
+
+        assert cache.caches('groups') is True
+        assert cache.caches('servers') is False
+        cache.set('key', 'https://localhost/api/v3/groups', '{"page": 1}', 'groups', response_with(b'[1]'))
+
+        response = CBWResponseCache(path, {'groups': 60}, clock=clock).get(
+            'key', 'https://localhost/api/v3/groups', '{"page": 1}', 'groups')
+        assert response.content == b'[1]'
+        assert response.links['next']['url'] == 'https://localhost/api/v3/groups?page=2'
+
+        assert cache.get('other key', 'https://localhost/api/v3/groups', '{"page": 1}', 'groups') is None
+        assert cache.get('key', 'https://localhost/api/v3/groups', '{"page": 2}', 'groups') is None
+
+        clock.now = 60
+        assert cache.get('key', 'https://localhost/api/v3/groups', '{"page": 1}', 'groups') is None
+
+    @staticmethod
+    def test_purge(tmp_path):
+        """Tests the removal of the responses by type and age"""
+        clock = FakeClock()
+        cache = CBWResponseCache(str(tmp_path / "cache.sqlite"), clock=clock)
+
+        cache.set('key', 'https://localhost/api/v3/groups', None, 'groups', response_with(b'[]'))
+        clock.now = 100
+        cache.set('key', 'https://localhost/api/v3/nodes', None, 'nodes', response_with(b'[]'))
+        cache.set('key', 'https://localhost/api/v3/groups/12', None, 'groups', response_with(b'{}'))
+
+        assert cache.purge(older_than=50) == 1
+        assert cache.purge('nodes') == 1
+        assert [entry[1] for entry in cache.entries()] == ['https://localhost/api/v3/groups/12']
+
+    @staticmethod
+    def test_cli(tmp_path, capsys):
+        """Tests the inspect and purge commands"""
+        path = str(tmp_path / "cache.sqlite")
+        cache = CBWResponseCache(path)
+        cache.set('key', 'https://localhost/api/v3/groups', None, 'groups', response_with(b'[]'))
+        cache.set('key', 'https://localhost/api/v3/nodes', None, 'nodes', response_with(b'[]'))
+
+        assert main(['inspect', path]) == 0
+        assert "2 responses, 4 bytes" in capsys.readouterr().out
+
+        assert main(['purge', path, '--type', 'groups']) == 0
+        assert "1 responses removed" in capsys.readouterr().out
+        assert [entry[0] for entry in cache.entries()] == ['nodes']
+
+    @staticmethod
+    def test_cli_warm(tmp_path):
+        """Tests that the warm command downloads the lists of the types given"""
+        path = str(tmp_path / "cache.sqlite")
+        conf = tmp_path / "api.conf"
+        conf.write_text("[cyberwatch]\nurl = https://localhost\napi_key = \nsecret_key = \n")
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/groups.yaml'):
+            assert main(['warm', path, 'groups', '--conf', str(conf)]) == 0
+        assert [entry[:2] for entry in CBWResponseCache(path).entries()] == [
+            ('groups', 'https://localhost/api/v3/groups')]
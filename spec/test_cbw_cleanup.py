@@ -0,0 +1,102 @@
+"""Test file for cbw_cleanup.py"""
+
+import datetime
+
+from cbw_api_toolbox.cbw_cleanup import (DUPLICATE, STALE_AGENT, STALE_AGENTLESS, CBWServerCleanup, months_ago,
+                                         normalize_hostname)
+from cbw_api_toolbox.cbw_journal import CBWJournal
+from cbw_api_toolbox.cbw_parser import get_json_backend
+
+NOW = datetime.datetime(2021, 12, 31, tzinfo=datetime.timezone.utc)
+
+SERVERS = get_json_backend().loads('''[
+    {"id": 1, "hostname": "web.example.com", "status": "server_update_comm_fail",
+     "last_communication": "2021-12-01T10:00:00.000+01:00", "created_at": "2021-01-01T10:00:00.000+01:00"},
+    {"id": 2, "hostname": "WEB", "status": "server_update_init",
+     "last_communication": null, "created_at": "2020-01-01T10:00:00.000+01:00"},
+    {"id": 3, "hostname": "web.example.com.", "status": "server_update_ok",
+     "last_communication": "2021-12-20T10:00:00.000+01:00", "created_at": "2021-01-01T10:00:00.000+01:00"},
+    {"id": 4, "hostname": "db", "status": "SERVER_UPDATE_INIT",
+     "last_communication": null, "created_at": "2021-08-01T10:00:00.000+01:00"},
+    {"id": 5, "hostname": "mail", "status": "server_update_init",
+     "last_communication": null, "created_at": "2021-08-01T10:00:00.000+01:00"},
+    {"id": 6, "hostname": null, "status": "server_update_init",
+     "last_communication": null, "created_at": null}
+]''')
+
+
+class FakeClient:
+    """Client recording the servers deleted"""
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete_server(self, server_id):
+        """Delete a server, the server 4 failing"""
+        self.deleted.append(server_id)
+        return server_id != '4'
+
+
+class TestCBWCleanup:
+
+    """Test for the cleanup of the servers"""
+
+    @staticmethod
+    def test_normalize_hostname():
+        """Tests the normalisation of the hostnames"""
+        assert normalize_hostname("Web.Example.com.") == "web.example.com"
+        assert normalize_hostname("Web.Example.com", case_sensitive=True) == "Web.Example.com"
+        assert normalize_hostname("Web.Example.com", short_names=True) == "web"
+        assert normalize_hostname("") is None
+
+    @staticmethod
+    def test_months_ago():
+        """Tests that the day is clamped to the end of the month"""
+        assert months_ago(NOW, 10) == datetime.datetime(2021, 2, 28, tzinfo=datetime.timezone.utc)
+        assert months_ago(NOW, 12) == datetime.datetime(2020, 12, 31, tzinfo=datetime.timezone.utc)
+
+    @staticmethod
+    def test_plan():
+        """Tests the duplicates and the stale agents and agentless connections"""
+        plan = CBWServerCleanup(now=NOW).plan(SERVERS, agent_server_ids=[4])
+
+        assert [(deletion.server.id, deletion.kept.id) for deletion in plan.by_reason(DUPLICATE)] == [(1, 3)]
+        assert [deletion.server.id for deletion in plan.by_reason(STALE_AGENT)] == [4]
+        assert [deletion.server.id for deletion in plan.by_reason(STALE_AGENTLESS)] == [2]
+
+        plan = CBWServerCleanup(agentless_months=3, short_names=True, now=NOW).plan(SERVERS, agent_server_ids=[4])
+
+        assert sorted(deletion.server.id for deletion in plan.by_reason(DUPLICATE)) == [1, 2]
+        assert [deletion.server.id for deletion in plan.by_reason(STALE_AGENTLESS)] == [5]
+        assert len(plan) == 4
+
+    @staticmethod
+    def test_execute():
+        """Tests that the deletions of the reasons given are made and reported"""
+        plan = CBWServerCleanup(now=NOW).plan(SERVERS, agent_server_ids=[4])
+        client = FakeClient()
+        progress = []
+
+        report = plan.execute(client, reasons=[STALE_AGENT], workers=2,
+                              progress=lambda completed, total, result: progress.append((completed, total)))
+
+        assert client.deleted == ['4']
+        assert progress == [(1, 1)]
+        assert [(deletion.server.id, error) for deletion, error in report.failed] == [(4, "No result")]
+
+        report = plan.execute(client)
+
+        assert [deletion.server.id for deletion, _ in report.succeeded] == [1, 2]
+
+    @staticmethod
+    def test_execute_journal(tmp_path):
+        """Tests that the deletions confirmed by the journal are not made again"""
+        plan = CBWServerCleanup(now=NOW).plan(SERVERS, agent_server_ids=[4])
+        client = FakeClient()
+
+        with CBWJournal(str(tmp_path / "cleanup.jsonl")) as journal:
+            plan.execute(client, workers=1, journal=journal)
+            report = plan.execute(client, workers=1, journal=journal)
+
+        assert client.deleted == ['1', '2', '4', '4']
+        assert [deletion.server.id for deletion, _ in report.failed] == [4]
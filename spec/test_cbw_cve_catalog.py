@@ -0,0 +1,75 @@
+"""Test file for cbw_cve_catalog.py"""
+
+import vcr  # pylint: disable=import-error
+from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_cve_catalog import CBWCveCatalog
+from cbw_api_toolbox.cbw_cve_index import CBWCveIndex
+from cbw_api_toolbox.cbw_parser import get_json_backend
+
+API_KEY = ''
+SECRET_KEY = ''
+API_URL = 'https://localhost'
+
+CVES = get_json_backend().loads('''[
+    {"cve_code": "CVE-2021-44228", "level": "level_critical", "exploit_code_maturity": "high",
+     "cvss_v3": {"access_vector": "access_vector_network"}},
+    {"cve_code": "CVE-2019-14869", "level": "level_high", "exploit_code_maturity": "proof_of_concept",
+     "cvss_v3": {"access_vector": "access_vector_local"}},
+    {"cve_code": "CVE-2020-1472", "level": "level_critical", "exploit_code_maturity": "proof_of_concept",
+     "cvss_v3": {"access_vector": "access_vector_network"}},
+    {"cve_code": "CVE-2015-8158", "level": "level_medium", "exploit_code_maturity": null, "cvss_v3": null},
+    {"cve_code": "CVE-2020-16898", "level": "level_high", "exploit_code_maturity": "proof_of_concept",
+     "cvss_v3": {"access_vector": "access_vector_adjacent_network"}}
+]''')
+
+
+class TestCBWCveCatalog:
+
+    """Test for class CBWCveCatalog"""
+
+    @staticmethod
+    def test_lookups():
+        """Tests the lookups by code and by attribute"""
+        catalog = CBWCveCatalog(CVES)
+
+        assert len(catalog) == 5
+        assert catalog['CVE-2021-44228'] is CVES[0]
+        assert catalog.get('CVE-2000-0001') is None
+        assert 'CVE-2015-8158' in catalog
+        assert catalog.codes(level='level_critical') == {'CVE-2021-44228', 'CVE-2020-1472'}
+        assert catalog.codes(level='level_critical', exploit_code_maturity='proof_of_concept') == {'CVE-2020-1472'}
+        assert catalog.codes(access_vector='access_vector_physical') == set()
+        assert catalog.codes(access_vector='access_vector_adjacent_network') == {'CVE-2020-16898'}
+        assert [cve.cve_code for cve in catalog.find(access_vector='access_vector_network')] == [
+            'CVE-2020-1472', 'CVE-2021-44228']
+
+        catalog.add(CVES[0]._replace(level='level_high'))
+        catalog.remove('CVE-2019-14869')
+        assert catalog.codes(level='level_high') == {'CVE-2021-44228', 'CVE-2020-16898'}
+        assert len(catalog.find()) == 4
+
+    @staticmethod
+    def test_count_by_access_vector():
+        """Tests the dashboard indicators computed from a CVE index"""
+        servers = get_json_backend().loads('''[
+            {"id": 1, "cve_announcements": [{"cve_code": "CVE-2021-44228", "ignored": false, "fixed_at": null},
+                                            {"cve_code": "CVE-2019-14869", "ignored": false, "fixed_at": null},
+                                            {"cve_code": "CVE-2020-16898", "ignored": false, "fixed_at": null}]},
+            {"id": 2, "cve_announcements": [{"cve_code": "CVE-2021-44228", "ignored": true, "fixed_at": null},
+                                            {"cve_code": "CVE-2020-1472", "ignored": false, "fixed_at": null},
+                                            {"cve_code": "CVE-2015-8158", "ignored": false, "fixed_at": null}]}
+        ]''')
+
+        counts = CBWCveCatalog(CVES).count_by_access_vector(CBWCveIndex.from_servers(servers))
+        assert counts == {'access_vector_network': 2, 'access_vector_local': 1,
+                          'access_vector_adjacent_network': 1, 'access_vector_physical': 0}
+
+    @staticmethod
+    def test_from_client():
+        """Tests that the catalog is built from the CVE announcements of the API"""
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/cve_announcements.yaml'):
+            catalog = CBWCveCatalog.from_client(CBWApi(API_URL, API_KEY, SECRET_KEY), {'page': '1'})
+
+        assert len(catalog) == 25
+        assert catalog['CVE-2015-8158'].level == 'level_medium'
+        assert len(catalog.codes(access_vector='access_vector_network')) == 12
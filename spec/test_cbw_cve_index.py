@@ -0,0 +1,84 @@
+"""Test file for cbw_cve_index.py"""
+
+from cbw_api_toolbox.cbw_cve_index import CBWCveIndex, FIXED, IGNORED, update_for_cve
+from cbw_api_toolbox.cbw_parser import get_json_backend
+
+SERVERS = get_json_backend().loads('''[
+    {"id": 1, "cve_announcements": [
+        {"cve_code": "CVE-2021-44228", "ignored": false, "fixed_at": null},
+        {"cve_code": "CVE-2019-14869", "ignored": true, "fixed_at": null}]},
+    {"id": 2, "cve_announcements": [
+        {"cve_code": "CVE-2021-44228", "ignored": false, "fixed_at": "2021-12-20T10:00:00.000+01:00"}]},
+    {"id": 3, "cve_announcements": [
+        {"cve_code": "CVE-2021-44228", "ignored": false, "fixed_at": null}]}
+]''')
+
+SERVER_DETAILS = get_json_backend().loads('''[
+    {"id": 1, "updates": [
+        {"cve_announcements": [{"cve_code": "CVE-2019-14869"}],
+         "target": {"product": "ghostscript", "version": "9.27"}},
+        {"cve_announcements": [{"cve_code": "CVE-2021-44228"}], "target": null},
+        {"cve_announcements": [{"cve_code": "CVE-2021-44228"}, {"cve_code": "CVE-2021-45046"}],
+         "target": {"product": "log4j", "version": "2.17.0"}}]},
+    {"id": 2, "updates": [
+        {"cve_announcements": ["CVE-2021-44228"], "target": {"product": "log4j", "version": "2.16.0"}}]},
+    {"id": 3, "updates": null}
+]''')
+
+
+class TestCBWCveIndex:
+
+    """Test for class CBWCveIndex"""
+
+    @staticmethod
+    def test_from_servers():
+        """Tests both mappings of the index"""
+        index = CBWCveIndex.from_servers(SERVERS)
+
+        assert len(index) == 2
+        assert 'CVE-2021-44228' in index
+        assert index.affected_servers('CVE-2021-44228') == [1, 3]
+        assert index.fixed_servers('CVE-2021-44228') == [2]
+        assert index.ignored_servers('CVE-2019-14869') == [1]
+        assert not index.affected_servers('CVE-2000-0001')
+        assert index.server_cves(1) == ['CVE-2021-44228']
+        assert index.server_cves(1, IGNORED) == ['CVE-2019-14869']
+        assert index.server_cves(2, FIXED) == ['CVE-2021-44228']
+        assert sorted(index.server_ids()) == [1, 2, 3]
+        assert index.server_counts() == {'CVE-2021-44228': 2}
+        assert index.server_counts(FIXED) == {'CVE-2021-44228': 1}
+
+    @staticmethod
+    def test_add_server():
+        """Tests that indexing a server again replaces its CVE announcements"""
+        index = CBWCveIndex.from_servers(SERVERS)
+
+        index.add_server(SERVERS[1]._replace(id=3))
+        assert index.affected_servers('CVE-2021-44228') == [1]
+        assert index.fixed_servers('CVE-2021-44228') == [2, 3]
+
+        index.remove_server(1)
+        assert not index.affected_servers('CVE-2021-44228')
+        assert not index.server_cves(1)
+
+    @staticmethod
+    def test_save(tmp_path):
+        """Tests that a saved index is loaded with the same mappings"""
+        path = str(tmp_path / "index.json")
+        CBWCveIndex.from_servers(SERVERS).save(path)
+
+        index = CBWCveIndex.load(path)
+        assert index.affected_servers('CVE-2021-44228') == [1, 3]
+        assert index.fixed_servers('CVE-2021-44228') == [2]
+        assert index.server_cves(1, IGNORED) == ['CVE-2019-14869']
+
+        index.add_server(SERVERS[0]._replace(id=4))
+        assert index.affected_servers('CVE-2021-44228') == [1, 3, 4]
+
+    @staticmethod
+    def test_update_for_cve():
+        """Tests that the update fixing a CVE is found whether its CVE announcements are records or codes"""
+        assert update_for_cve(SERVER_DETAILS[0], 'CVE-2021-44228').target.version == "2.17.0"
+        assert update_for_cve(SERVER_DETAILS[1], 'CVE-2021-44228').target.version == "2.16.0"
+        assert update_for_cve(SERVER_DETAILS[0], 'CVE-2000-0001') is None
+        assert update_for_cve(SERVER_DETAILS[2], 'CVE-2021-44228') is None
@@ -1,8 +1,12 @@
 """Test file for cbw_files_xlsx.py"""
 
+import csv
+import shutil
+
 import xlrd # pylint: disable=import-error
 import vcr # pylint: disable=import-error
-from cbw_api_toolbox.cbw_file_xlsx import CBWXlsx
+from cbw_api_toolbox.cbw_file_xlsx import CBWXlsx, CREATED, FAILED, INVALID, SKIPPED
+from cbw_api_toolbox.cbw_parser import get_json_backend
 
 # To generate a new vcr cassette:
 # - DO NOT CHANGE THE API_URL
@@ -17,6 +21,26 @@ SECRET_KEY = ''
 API_URL = 'https://localhost'
 
 
+class FakeClient:
+    """Client with one remote access, failing to create the remote accesses of server02.example.com"""
+
+    def __init__(self):
+        self.created = []
+
+    @staticmethod
+    def remote_accesses():
+        """Return the existing remote accesses"""
+        return get_json_backend().loads('[{"id": 1, "address": "10.0.2.15", "port": 22, "node_id": 1}]')
+
+    def create_remote_access(self, info):
+        """Create a remote access"""
+        self.created.append(info["address"])
+        if info["address"] == "server02.example.com":
+            return False
+        return get_json_backend().loads('{{"id": {}, "address": "{}"}}'.format(len(self.created) + 1,
+                                                                                info["address"]))
+
+
 class TestCBWXlsx:
     """Test for class CBWFilsXlsx"""
 
@@ -79,3 +103,38 @@ port=22, is_valid=None, last_error=None, server_id=None, node_id=1)",
                 break
             # The group is not assigned yet
             assert result == ['10.0.2.15', 22, 'CbwRam::RemoteAccess::Ssh::WithPassword', 1, '']
+
+    @staticmethod
+    def test_import_remote_accesses(tmp_path):
+        """Tests the import of xlsx and csv files with the existing remote accesses skipped and a report"""
+        client = CBWXlsx(API_URL, API_KEY, SECRET_KEY)
+        client.client = FakeClient()
+        file_xlsx = str(tmp_path / "batch_import_model.xlsx")
+        shutil.copy("spec/fixtures/xlsx_files/batch_import_model.xlsx", file_xlsx)
+
+        results = client.import_remote_accesses(file_xlsx, workers=2)
+
+        assert [(result.line, result.status) for result in results] == [
+            (2, SKIPPED), (3, FAILED), (4, CREATED)]
+        assert sorted(client.client.created) == ["server01.example.com", "server02.example.com"]
+        with open(str(tmp_path / "batch_import_model_report.csv")) as report_file:
+            report = list(csv.reader(report_file))
+        assert report[0] == ["LINE", "HOST", "PORT", "NODE_ID", "STATUS", "ID", "ERROR"]
+        assert report[3][:6] == ["4", "server01.example.com", "22", "1", "created", "3"]
+
+        file_csv = str(tmp_path / "import.csv")
+        with open(file_csv, "w", newline="", encoding="utf-8-sig") as csv_file:
+            csv.writer(csv_file).writerows([
+                ["ADDRESS", "PORT", "TYPE", "USERNAME", "NODE"],
+                ["10.0.2.15", "22", "CbwRam::RemoteAccess::Ssh::WithPassword", "admin", "1"],
+                ["10.0.2.20", "22", "CbwRam::RemoteAccess::Ssh::WithPassword", "admin", "1"],
+                ["10.0.2.20", "22", "CbwRam::RemoteAccess::Ssh::WithPassword", "admin", "1"],
+                ["", "22", "CbwRam::RemoteAccess::Ssh::WithPassword", "admin", "1"]])
+        header_map = {"address": "ADDRESS", "port": "PORT", "type": "TYPE", "login": "USERNAME", "node_id": "NODE"}
+
+        results = client.import_remote_accesses(file_csv, header_map=header_map,
+                                                report_path=str(tmp_path / "report.csv"))
+
+        assert [result.status for result in results] == [SKIPPED, CREATED, SKIPPED, INVALID]
+        assert results[1].info["password"] == ""
+        assert client.import_remote_accesses(file_csv) is None
@@ -0,0 +1,63 @@
+"""Test file for cbw_join.py"""
+
+from cbw_api_toolbox.cbw_join import anti_join, group_by, index_by, join
+from cbw_api_toolbox.cbw_parser import get_json_backend
+
+NODES = get_json_backend().loads('''[
+    {"id": 1, "name": "master"},
+    {"id": 2, "name": "node-paris"}
+]''')
+
+HOSTS = get_json_backend().loads('''[
+    {"id": 10, "target": "10.0.0.1", "node_id": 1, "server_id": 100},
+    {"id": 11, "target": "10.0.0.2", "node_id": 2, "server_id": null},
+    {"id": 12, "target": "10.0.0.3", "node_id": 1, "server_id": 101},
+    {"id": 13, "target": "10.0.0.4", "node_id": 3, "server_id": null}
+]''')
+
+SERVERS = get_json_backend().loads('''[
+    {"id": 100, "groups": [{"id": 1, "name": "production"}, {"id": 2, "name": "linux"}]},
+    {"id": 101, "groups": [{"id": 2, "name": "linux"}]},
+    {"id": 102, "groups": []}
+]''')
+
+
+class TestCBWJoin:
+
+    """Test for the join helpers"""
+
+    @staticmethod
+    def test_index_by():
+        """Tests that the records are indexed by key, None keys being skipped"""
+        hosts = index_by(HOSTS, 'server_id')
+
+        assert sorted(hosts) == [100, 101]
+        assert hosts[100] is HOSTS[0]
+
+    @staticmethod
+    def test_group_by():
+        """Tests the grouping by one key and by several keys per record"""
+        hosts = group_by(HOSTS, 'node_id')
+        servers = group_by(SERVERS, lambda server: [group.name for group in server.groups], many=True)
+
+        assert {node_id: [host.id for host in hosts] for node_id, hosts in hosts.items()} == {
+            1: [10, 12], 2: [11], 3: [13]}
+        assert hosts[1][0] is HOSTS[0]
+        assert {name: [server.id for server in servers] for name, servers in servers.items()} == {
+            "production": [100], "linux": [100, 101]}
+
+    @staticmethod
+    def test_join():
+        """Tests the inner and outer joins"""
+        pairs = join(HOSTS, NODES, 'node_id', 'id')
+        outer_pairs = join(HOSTS, NODES, 'node_id', 'id', outer=True)
+
+        assert [(host.id, node.name) for host, node in pairs] == [
+            (10, "master"), (11, "node-paris"), (12, "master")]
+        assert [(host.id, node and node.name) for host, node in outer_pairs] == [
+            (10, "master"), (11, "node-paris"), (12, "master"), (13, None)]
+
+    @staticmethod
+    def test_anti_join():
+        """Tests that the records without a match are found"""
+        assert [server.id for server in anti_join(SERVERS, HOSTS, 'id', 'server_id')] == [102]
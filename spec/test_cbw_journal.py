@@ -0,0 +1,77 @@
+"""Test file for cbw_journal.py"""
+
+import pytest
+
+from cbw_api_toolbox.cbw_journal import ATTEMPTED, CONFIRMED, FAILED, PLANNED, CBWJournal
+
+
+def crash_after(count):
+    """Return a function writing `count` items then raising KeyboardInterrupt, as an interrupted process"""
+    calls = []
+
+    def write(item):
+        if len(calls) == count:
+            raise KeyboardInterrupt
+        calls.append(item)
+        return item != 3
+
+    return write, calls
+
+
+class TestCBWJournal:
+
+    """Test for class CBWJournal"""
+
+    @staticmethod
+    def test_run(tmp_path):
+        """Tests that the items are recorded and a rerun only calls the items not confirmed"""
+        path = str(tmp_path / "journal.jsonl")
+        calls = []
+
+        def write(item):
+            calls.append(item)
+            return item != 3
+
+        with CBWJournal(path) as journal:
+            report = journal.run(write, [1, 2, 3, 4], workers=2)
+
+            assert sorted(calls) == [1, 2, 3, 4]
+            assert [item for item, _ in report.failed] == [3]
+            assert journal.counts() == {PLANNED: 0, ATTEMPTED: 0, CONFIRMED: 3, FAILED: 1}
+            assert journal.error(3) == "No result"
+
+        calls.clear()
+        with CBWJournal(path) as journal:
+            report = journal.run(write, [1, 2, 3, 4, 5], workers=2)
+
+            assert sorted(calls) == [3, 5]
+            assert journal.keys(FAILED) == ['3']
+            assert journal.state(5) == CONFIRMED
+
+    @staticmethod
+    def test_resume(tmp_path):
+        """Tests that an interrupted run is resumed, the items in doubt being called again or not"""
+        path = str(tmp_path / "journal.jsonl")
+        write, calls = crash_after(1)
+
+        with CBWJournal(path) as journal:
+            with pytest.raises(KeyboardInterrupt):
+                journal.run(write, [1, 2, 3], workers=1)
+
+            assert calls == [1]
+            assert journal.keys(ATTEMPTED) == ['2', '3']
+        with open(path, 'a') as journal_file:
+            journal_file.write('{"key":"3","sta')
+
+        write, calls = crash_after(10)
+        with CBWJournal(path) as journal:
+            journal.run(write, [1, 2, 3], workers=1, retry_in_doubt=False)
+
+            assert not calls
+            assert journal.state(3) == ATTEMPTED
+
+        with CBWJournal(path) as journal:
+            journal.run(write, [1, 2, 3], workers=1)
+
+            assert calls == [2, 3]
+            assert journal.counts() == {PLANNED: 0, ATTEMPTED: 0, CONFIRMED: 2, FAILED: 1}
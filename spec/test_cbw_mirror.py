@@ -0,0 +1,101 @@
+"""Test file for cbw_mirror.py"""
+
+import pytest  # pylint: disable=import-error
+import vcr  # pylint: disable=import-error
+from cbw_api_toolbox.cbw_api import CBWApi
+from cbw_api_toolbox.cbw_mirror import CBWMirror
+from cbw_api_toolbox.cbw_parser import get_json_backend
+
+API_KEY = ''
+SECRET_KEY = ''
+API_URL = 'https://localhost'
+
+SERVERS = get_json_backend().loads('''[
+    {"id": 1, "hostname": "web-1", "status": "server_update_comm_fail", "os": {"key": "debian_10_64"},
+     "groups": [{"id": 12, "name": "production"}], "cve_announcements": [{"cve_code": "CVE-2021-44228"}]},
+    {"id": 2, "hostname": "web-2", "status": "server_update_init", "os": {"key": "debian_11_64"},
+     "groups": [{"id": 12, "name": "production"}], "cve_announcements": []},
+    {"id": 3, "hostname": "db-1", "status": "server_update_comm_fail", "os": {"key": "centos_8_64"},
+     "groups": [{"id": 13, "name": "Development"}], "cve_announcements": [{"cve_code": "CVE-2021-44228"}]}
+]''')
+
+
+class TestCBWMirror:
+
+    """Test for class CBWMirror"""
+
+    @staticmethod
+    def test_sync(tmp_path):
+        """Tests that the collections downloaded are queried offline with the records of CBWApi"""
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY)
+        mirror = CBWMirror(str(tmp_path / "mirror.sqlite"))
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/hosts.yaml', allow_playback_repeats=True):
+            hosts = client.hosts()
+            assert mirror.sync(client, ['hosts']) == {'hosts': len(hosts)}
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/groups.yaml'):
+            assert mirror.sync(client, ['groups']) == {'groups': 4}
+
+        assert mirror.query('hosts') == hosts
+        assert [group.name for group in mirror.query('groups', name='production')] == ['production']
+        assert mirror.query('hosts', node_id=1, server_id=hosts[0].server_id)[0] == hosts[0]
+        assert mirror.get('groups', 13).name == 'Development'
+        assert mirror.get('groups', 1000) is None
+        assert mirror.synced_at('groups') is not None
+        assert mirror.synced_at('servers') is None
+
+    @staticmethod
+    def test_query(tmp_path):
+        """Tests the filters on the indexed columns, the groups and the CVE announcements"""
+        mirror = CBWMirror(str(tmp_path / "mirror.sqlite"))
+        mirror.store('servers', SERVERS, replace=True)
+
+        def hostnames(records):
+            return [record.hostname for record in records]
+
+        assert hostnames(mirror.query('servers', status='server_update_comm_fail', group='production')) == ['web-1']
+        assert hostnames(mirror.query('servers', group=13)) == ['db-1']
+        assert hostnames(mirror.query('servers', cve_code='CVE-2021-44228')) == ['web-1', 'db-1']
+        assert hostnames(mirror.query('servers', where="os LIKE ?", params=['debian%'])) == ['web-1', 'web-2']
+        assert hostnames(mirror.query('servers', hostname=['web-2', 'db-1'])) == ['web-2', 'db-1']
+        assert mirror.query('servers', group='staging') == []
+
+        with pytest.raises(ValueError):
+            mirror.query('servers', node_id=1)
+
+        mirror.store('servers', SERVERS[2:3])
+        mirror.delete('servers', [1])
+        assert hostnames(mirror.query('servers', cve_code='CVE-2021-44228')) == ['db-1']
+        assert hostnames(mirror.query('servers', group='production')) == ['web-2']
+
+    @staticmethod
+    def test_sync_changes(tmp_path):
+        """Tests that the changes are found from the watermark and the deletions from the number of records"""
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY)
+        mirror = CBWMirror(str(tmp_path / "mirror.sqlite"))
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/nodes_changes.yaml',
+                              match_on=['method', 'uri', 'body']) as cassette:
+            assert mirror.sync_changes(client, ['nodes'], per_page=1) == {'nodes': ([1, 2, 3], [], [])}
+            assert mirror.watermark('nodes') == "2020-01-03T10:00:00.000+01:00"
+
+            assert mirror.sync_changes(client, ['nodes'], per_page=1) == {'nodes': ([4], [3], [1])}
+            assert mirror.watermark('nodes') == "2020-01-05T10:00:00.000+01:00"
+            assert [node.name for node in mirror.query('nodes')] == ['node-2', 'node-3-renamed', 'node-4']
+
+            assert mirror.sync_changes(client, ['nodes'], per_page=1) == {'nodes': ([], [], [])}
+            assert cassette.all_played
+
+    @staticmethod
+    def test_sync_changes_servers(tmp_path):
+        """Tests that the servers are listed in full and the deletions found from their ids"""
+        client = CBWApi(API_URL, API_KEY, SECRET_KEY)
+        mirror = CBWMirror(str(tmp_path / "mirror.sqlite"))
+        mirror.store('servers', SERVERS + get_json_backend().loads('[{"id": 9, "hostname": "old"}]'), replace=True)
+
+        with vcr.use_cassette('spec/fixtures/vcr_cassettes/servers_pages_without_last.yaml',
+                              match_on=['method', 'uri', 'body']):
+            assert mirror.sync_changes(client, ['servers']) == {'servers': ([4, 5], [1, 2, 3], [9])}
+
+        assert sorted(mirror.keys('servers')) == [1, 2, 3, 4, 5]
+        assert mirror.get('servers', 1).hostname == "server01.example.com"
@@ -0,0 +1,79 @@
+"""Test file for cbw_parser.py"""
+
+import json
+
+import pytest  # pylint: disable=import-error
+from cbw_api_toolbox.cbw_parser import CBWRecordTypes, JSON_BACKENDS, get_json_backend, to_dict
+
+
+class TestCBWRecordTypes:
+
+    """Test for class CBWRecordTypes"""
+
+    @staticmethod
+    def test_object_hook():
+        """Tests that the objects with the same fields share one class"""
+        types = CBWRecordTypes()
+        body = '[{"id": 1, "os": {"key": "debian"}}, {"id": 2, "os": {"key": "ubuntu"}}]'
+
+        first, second = json.loads(body, object_hook=types.object_hook)
+
+        assert str(first) == "cbw_object(id=1, os=cbw_object(key='debian'))"
+        assert second.os.key == 'ubuntu'
+        assert type(first) is type(second)  # pylint: disable=unidiomatic-typecheck
+        assert type(first.os) is type(second.os)  # pylint: disable=unidiomatic-typecheck
+        assert len(types) == 2
+
+    @staticmethod
+    def test_eviction():
+        """Tests that the least recently used class is evicted once the registry is full"""
+        types = CBWRecordTypes(maxsize=2)
+
+        first = types.get(('id',))
+        types.get(('hostname',))
+        assert types.get(('id',)) is first
+
+        types.get(('status',))
+        assert len(types) == 2
+        assert types.get(('id',)) is first
+        assert types.get(('hostname',))(hostname='a').hostname == 'a'
+
+    @staticmethod
+    def test_to_dict():
+        """Tests that the records are converted back into the decoded JSON document"""
+        document = [{"id": 1, "os": {"key": "debian"}, "groups": [{"id": 2}], "tags": ["a"], "boot_at": None}]
+
+        records = json.loads(json.dumps(document), object_hook=CBWRecordTypes().object_hook)
+
+        assert to_dict(records) == document
+
+
+class TestCBWJsonBackend:
+
+    """Test for class CBWJsonBackend"""
+
+    @staticmethod
+    def test_backends():
+        """Tests that every installed backend returns the same objects as the json module"""
+        content = '[{"id": 1, "hostname": "s\u00e9rveur", "score": 7.5, "os": {"key": "debian"}, \
+"groups": [{"id": 2, "name": "prod"}], "boot_at": null, "count": 123456789012345678901234567890}]'.encode('utf-8')
+        expected = get_json_backend('json').loads(content)
+
+        for name in JSON_BACKENDS:
+            try:
+                backend = get_json_backend(name)
+            except ImportError:
+                continue
+            assert backend.name == name
+            response = backend.loads(content)
+            assert response == expected
+            assert str(response) == str(expected)
+            assert response[0].groups[0].name == 'prod'
+
+    @staticmethod
+    def test_get_json_backend():
+        """Tests for the backend selection"""
+        assert get_json_backend().name == 'json'
+
+        with pytest.raises(ValueError):
+            get_json_backend('simplejson')
@@ -0,0 +1,61 @@
+"""Test file for cbw_ratelimit.py"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cbw_api_toolbox.cbw_ratelimit import CBWRateLimiter
+
+
+def peak_in_flight(limiters, calls=24):
+    """Run calls spread over the limiters from several threads, return the peak of calls in flight"""
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def call(index):
+        with limiters[index % len(limiters)].limit():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.005)
+            with lock:
+                running[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(call, range(calls)))
+    return peak[0]
+
+
+class TestCBWRateLimiter:
+
+    """Test for class CBWRateLimiter"""
+
+    @staticmethod
+    def test_rate():
+        """Tests that the requests per second are limited after the burst"""
+        limiter = CBWRateLimiter(rate=50, burst=5)
+
+        start = time.monotonic()
+        for _ in range(15):
+            limiter.wait_for_token()
+        assert time.monotonic() - start >= 0.18
+
+    @staticmethod
+    def test_max_in_flight():
+        """Tests that the requests in flight are limited"""
+        assert peak_in_flight([CBWRateLimiter(max_in_flight=2)]) <= 2
+
+    @staticmethod
+    def test_shared(tmpdir):
+        """Tests that the limiters created with the same path share their limits"""
+        path = str(tmpdir.join('cyberwatch'))
+        limiters = [CBWRateLimiter(rate=50, burst=2, max_in_flight=3, path=path) for _ in range(3)]
+
+        assert peak_in_flight(limiters) <= 3
+
+        time.sleep(0.1)
+        start = time.monotonic()
+        for index in range(12):
+            limiters[index % 3].wait_for_token()
+        assert time.monotonic() - start >= 0.18
@@ -0,0 +1,73 @@
+"""Test file for cbw_reconcile.py"""
+
+from cbw_api_toolbox.cbw_parser import get_json_backend
+from cbw_api_toolbox.cbw_reconcile import CBWGroupChange, CBWGroupReconciler
+
+LINUX_GROUP_ID = 1
+WINDOWS_GROUP_ID = 2
+
+SERVERS = get_json_backend().loads('''[
+    {"id": 10, "os": {"type": "Os::Ubuntu"}, "groups": [{"id": 1, "name": "linux"}]},
+    {"id": 11, "os": {"type": "Os::Debian"}, "groups": [{"id": 2, "name": "windows"}, {"id": 5, "name": "prod"}]},
+    {"id": 12, "os": {"type": "Os::Windows"}, "groups": []},
+    {"id": 13, "os": null, "groups": [{"id": 5, "name": "prod"}]}
+]''')
+
+
+def os_rule(server):
+    """Put the servers in the group of their OS type"""
+    if server.os is None:
+        return None
+    return [WINDOWS_GROUP_ID if server.os.type == "Os::Windows" else LINUX_GROUP_ID]
+
+
+class FakeClient:
+    """Client recording the servers updated"""
+
+    def __init__(self):
+        self.updates = []
+
+    def update_server(self, server_id, info):
+        """Update a server, the server 12 failing"""
+        self.updates.append((server_id, info))
+        return server_id != '12'
+
+
+class TestCBWGroupReconciler:
+
+    """Test for class CBWGroupReconciler"""
+
+    @staticmethod
+    def test_plan():
+        """Tests that only the servers out of their desired groups are changed"""
+        plan = CBWGroupReconciler(os_rule).plan(SERVERS)
+
+        assert [(change.server.id, change.current, change.desired) for change in plan] == [
+            (11, (2, 5), (1, 5)), (12, (), (2,))]
+        assert plan.summary() == {"unchanged": 2, "updated": 2, "failed": 0}
+
+        plan = CBWGroupReconciler(os_rule, exclusive=True).plan(SERVERS)
+
+        assert [(change.server.id, change.desired) for change in plan] == [(11, (1,)), (12, (2,))]
+
+    @staticmethod
+    def test_apply():
+        """Tests that one update is sent per change and the failures are reported"""
+        plan = CBWGroupReconciler(os_rule).plan(SERVERS)
+        client = FakeClient()
+
+        report = plan.apply(client, workers=2)
+
+        assert sorted(client.updates) == [('11', {'groups': [1, 5]}), ('12', {'groups': [2]})]
+        assert [change.server.id for change, _ in report.failed] == [12]
+        assert plan.summary(report) == {"unchanged": 2, "updated": 1, "failed": 1}
+
+    @staticmethod
+    def test_empty_groups():
+        """Tests that a server leaving all its groups is sent a list holding None"""
+        plan = CBWGroupReconciler(lambda server: [], managed=[5]).plan(SERVERS[3:])
+        client = FakeClient()
+        plan.apply(client)
+
+        assert list(plan) == [CBWGroupChange(SERVERS[3], (5,), ())]
+        assert client.updates == [('13', {'groups': [None]})]
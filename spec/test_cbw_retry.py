@@ -0,0 +1,48 @@
+"""Test file for cbw_retry.py"""
+
+from email.utils import formatdate
+import time
+
+import requests
+from cbw_api_toolbox.cbw_retry import CBWRetryBudget, CBWRetryPolicy
+
+
+def response_with(headers):
+    """Build a response with the given headers"""
+    response = requests.Response()
+    response.headers.update(headers)
+    return response
+
+
+class TestCBWRetryPolicy:
+
+    """Test for class CBWRetryPolicy"""
+
+    @staticmethod
+    def test_can_retry():
+        """Tests that only idempotent methods are retried within the budgets"""
+        policy = CBWRetryPolicy(max_retries=2)
+
+        assert policy.can_retry('GET', 0) is True
+        assert policy.can_retry('put', 1) is True
+        assert policy.can_retry('GET', 2) is False
+        assert policy.can_retry('POST', 0) is False
+        assert policy.can_retry('PATCH', 0) is False
+
+        budget = CBWRetryBudget(1)
+        assert policy.can_retry('GET', 0, budget) is True
+        assert policy.can_retry('GET', 0, budget) is False
+
+    @staticmethod
+    def test_delay():
+        """Tests the exponential backoff and the Retry-After header"""
+        policy = CBWRetryPolicy(backoff_factor=1, backoff_max=10, jitter=0.5, retry_after_max=120)
+
+        assert 1 <= policy.delay(0) <= 1.5
+        assert 4 <= policy.delay(2) <= 6
+        assert 10 <= policy.delay(8) <= 15
+
+        assert policy.delay(0, response_with({'Retry-After': '7'})) == 7
+        assert policy.delay(0, response_with({'Retry-After': '3600'})) == 120
+        assert 25 <= policy.delay(0, response_with({'Retry-After': formatdate(time.time() + 30, usegmt=True)})) <= 30
+        assert 1 <= policy.delay(0, response_with({'Retry-After': 'soon'})) <= 1.5
@@ -0,0 +1,76 @@
+"""Test file for cbw_singleflight.py"""
+
+import threading
+import time
+
+import pytest  # pylint: disable=import-error
+from cbw_api_toolbox.cbw_singleflight import CBWSingleFlight
+
+
+def wait_until(condition):
+    """Wait until condition() is true, for at most one second"""
+    deadline = time.monotonic() + 1
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestCBWSingleFlight:
+
+    """Test for class CBWSingleFlight"""
+
+    @staticmethod
+    def test_do():
+        """Tests that the concurrent calls of a key share the call in flight"""
+        single_flight = CBWSingleFlight()
+        release = threading.Event()
+        results = []
+
+        def call(value):
+            release.wait()
+            return [value]
+
+        threads = [threading.Thread(target=lambda: results.append(single_flight.do('key', call, 1)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: single_flight.shared == 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 4
+        assert all(result is results[0] for result in results)
+        assert single_flight.stats() == {"calls": 1, "shared": 3}
+
+        assert single_flight.do('key', call, 2) == [2]
+        assert single_flight.stats() == {"calls": 2, "shared": 3}
+
+    @staticmethod
+    def test_error():
+        """Tests that the error of a call is raised to every thread waiting for it"""
+        single_flight = CBWSingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def call():
+            release.wait()
+            raise ValueError("failed")
+
+        def run():
+            try:
+                single_flight.do('key', call)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: single_flight.shared == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+
+        with pytest.raises(ValueError):
+            single_flight.do('key', call)
@@ -0,0 +1,68 @@
+"""Test file for cbw_snapshot.py"""
+
+from cbw_api_toolbox.cbw_api import CBWPageError
+from cbw_api_toolbox.cbw_parser import get_json_backend
+from cbw_api_toolbox.cbw_snapshot import CBWServerState, CBWSnapshot
+
+COMM_FAIL = "server_update_comm_fail"
+
+BEFORE = get_json_backend().loads('''[
+    {"id": 1, "status": "server_update_comm_fail", "last_communication": null, "cve_announcements_count": 3},
+    {"id": 2, "status": "server_update_comm_fail", "last_communication": null, "cve_announcements_count": 0},
+    {"id": 3, "status": "server_update_ok", "last_communication": "2021-12-01T10:00:00.000+01:00",
+     "cve_announcements_count": 5},
+    {"id": 4, "status": "server_update_comm_fail", "last_communication": null, "cve_announcements_count": 1}
+]''')
+
+AFTER = get_json_backend().loads('''[
+    {"id": 1, "status": "server_update_ok", "last_communication": "2021-12-02T10:00:00.000+01:00",
+     "cve_announcements_count": 3},
+    {"id": 2, "status": "server_update_comm_fail", "last_communication": null, "cve_announcements_count": 0},
+    {"id": 3, "status": "server_update_comm_fail", "last_communication": "2021-12-01T10:00:00.000+01:00",
+     "cve_announcements_count": 5},
+    {"id": 5, "status": "server_update_comm_fail", "last_communication": null, "cve_announcements_count": 0}
+]''')
+
+
+class FakeClient:
+    """Client whose listing of the servers fails after the first page"""
+
+    @staticmethod
+    def iter_servers(params=None):  # pylint: disable=unused-argument
+        """Yield the first servers then fail"""
+        yield from BEFORE[:2]
+        raise CBWPageError('https://localhost/api/v3/servers', '2')
+
+
+class TestCBWSnapshot:
+
+    """Test for class CBWSnapshot"""
+
+    @staticmethod
+    def test_diff():
+        """Tests the servers added, removed, changed, entering and leaving a status"""
+        diff = CBWSnapshot.from_servers(BEFORE).diff(CBWSnapshot.from_servers(AFTER))
+
+        assert diff.added == {5}
+        assert diff.removed == {4}
+        assert diff.changed == {1, 3}
+        assert diff.entered(COMM_FAIL) == {3, 5}
+        assert diff.left(COMM_FAIL) == {1}
+        assert diff.left("server_update_init") == set()
+
+    @staticmethod
+    def test_save_load(tmp_path):
+        """Tests that a snapshot is read as it was written"""
+        snapshot = CBWSnapshot.from_servers(BEFORE, taken_at=1638349200.0)
+        snapshot.save(str(tmp_path / "snapshot.json"))
+        loaded = CBWSnapshot.load(str(tmp_path / "snapshot.json"))
+
+        assert loaded.taken_at == 1638349200.0
+        assert loaded.states == snapshot.states
+        assert loaded.get(1) == CBWServerState(COMM_FAIL, None, 3)
+        assert loaded.with_status(COMM_FAIL) == {1, 2, 4}
+
+    @staticmethod
+    def test_from_client_partial():
+        """Tests that no snapshot is taken when the servers could not all be listed"""
+        assert CBWSnapshot.from_client(FakeClient()) is None
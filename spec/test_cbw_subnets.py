@@ -0,0 +1,69 @@
+"""Test file for cbw_subnets.py"""
+
+import ipaddress
+
+import pytest
+
+from cbw_api_toolbox.cbw_parser import get_json_backend
+from cbw_api_toolbox.cbw_subnets import CBWSubnetIndex, parse_address, subnets_by_node
+
+HOSTS = get_json_backend().loads('''[
+    {"id": 1, "target": "10.10.0.12", "node_id": 1},
+    {"id": 2, "target": "10.10.1.200", "node_id": 1},
+    {"id": 3, "target": "10.10.0.13", "node_id": 2},
+    {"id": 4, "target": "192.168.1.1", "node_id": 2},
+    {"id": 5, "target": "2001:db8::1", "node_id": 2},
+    {"id": 6, "target": "web.example.com", "node_id": 2}
+]''')
+
+
+class TestCBWSubnets:
+
+    """Test for the subnet index"""
+
+    @staticmethod
+    def test_parse_address():
+        """Tests the parsing of the addresses and hostnames"""
+        assert parse_address("10.0.0.1") == (4, 167772161)
+        assert parse_address("::1") == (6, 1)
+        assert parse_address("web.example.com") is None
+        assert parse_address(None) is None
+
+    @staticmethod
+    def test_lookup():
+        """Tests the matching of overlapping subnets of both versions"""
+        index = CBWSubnetIndex(["10.10.0.0/16", "10.10.0.0/24", "2001:db8::/32", "172.18.0.1/24", "10.10.2.0/24"])
+
+        assert index.lookup("10.10.0.12") == (ipaddress.ip_network("10.10.0.0/24"),
+                                              ipaddress.ip_network("10.10.0.0/16"))
+        assert index.lookup("10.10.255.255") == (ipaddress.ip_network("10.10.0.0/16"),)
+        assert index.lookup("10.10.1.5") == (ipaddress.ip_network("10.10.0.0/16"),)
+        assert index.lookup("10.10.2.5") == (ipaddress.ip_network("10.10.2.0/24"),
+                                             ipaddress.ip_network("10.10.0.0/16"))
+        assert index.lookup("10.11.0.0") == ()
+        assert index.lookup("9.0.0.0") == ()
+        assert "172.18.0.200" in index
+        assert "2001:db8::1" in index
+        assert "::1" not in index
+        assert "web.example.com" not in index
+
+        with pytest.raises(ValueError):
+            index.add("10.10.0.0/33")
+
+    @staticmethod
+    def test_select_group():
+        """Tests the selection and grouping of the hosts by subnet"""
+        index = CBWSubnetIndex(["10.10.0.0/16", "10.10.0.0/24"])
+
+        assert [host.id for host in index.select(HOSTS)] == [1, 2, 3]
+        assert {str(subnet): [host.id for host in hosts] for subnet, hosts in index.group(HOSTS).items()} == {
+            "10.10.0.0/24": [1, 3], "10.10.0.0/16": [2]}
+
+    @staticmethod
+    def test_subnets_by_node():
+        """Tests the /24 and /64 subnets of the hosts by node"""
+        nodes = subnets_by_node(HOSTS)
+
+        assert {node_id: sorted(str(subnet) for subnet in subnets) for node_id, subnets in nodes.items()} == {
+            1: ["10.10.0.0/24", "10.10.1.0/24"],
+            2: ["10.10.0.0/24", "192.168.1.0/24", "2001:db8::/64"]}